@@ -15,22 +15,36 @@ import os
 import json
 import logging
 import random
-import smtplib
 import string
 import uuid
-import jwt
 import re
 import io
+import base64
+import threading
+import time
+import queue
+import atexit
+import hashlib
+import hmac
+import gzip
+import contextvars
+import bisect
+import tempfile
+import logging.handlers
 import functools  # ✅ FIXED: Added functools import
 from functools import wraps
+from types import MappingProxyType
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
-from email.mime.text import MIMEText
-from PIL import Image
 import mimetypes
-from flask import Flask, request, jsonify
+import importlib.util
+from flask import Flask, Request, request, jsonify, make_response, g, has_app_context, has_request_context
 from flask_cors import CORS
+from flask.json.provider import DefaultJSONProvider
 from werkzeug.security import generate_password_hash, check_password_hash
 from werkzeug.utils import secure_filename
+from imaging import render_profile_images, normalize_receipt_image
 
 # ==================== OPTIONAL IMPORTS ====================
 try:
@@ -39,12 +53,22 @@ try:
 except ImportError:
     pass
 
+# Heavy dependencies (supabase and its HTTP stack, PIL, smtplib, email, jwt,
+# sqlite3, multiprocessing) are imported where first used to keep cold
+# starts short; benchmarks/bench_startup.py guards this.
+SUPABASE_AVAILABLE = importlib.util.find_spec('supabase') is not None
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 try:
-    from supabase import create_client, Client
-    SUPABASE_AVAILABLE = True
+    import brotli
+    BROTLI_AVAILABLE = True
 except ImportError:
-    SUPABASE_AVAILABLE = False
-    create_client = None
+    BROTLI_AVAILABLE = False
 
 
 # ================================================================================
@@ -58,6 +82,18 @@ app.secret_key = os.getenv('FLASK_SECRET_KEY', 'super_secret_key_change_in_produ
 JWT_SECRET = os.getenv('JWT_SECRET', app.secret_key)
 JWT_ALGORITHM = 'HS256'
 JWT_EXPIRATION_HOURS = 720  # 30 days
+TOKEN_CACHE_SIZE = int(os.getenv('TOKEN_CACHE_SIZE', 10000))
+ADMIN_ROLES = ('admin', 'administrator', 'superuser')
+
+# ---------- Password Hashing Configuration ----------
+# Werkzeug method string, e.g. "scrypt:32768:8:1" or "pbkdf2:sha256:600000"
+PASSWORD_HASH_METHOD = os.getenv('PASSWORD_HASH_METHOD', 'scrypt:32768:8:1').strip()
+PASSWORD_SALT_LENGTH = int(os.getenv('PASSWORD_SALT_LENGTH', 16))
+# Per process: preforked workers each run their own pool, so half the cores
+# leaves room for request handling and the other workers' hashing
+PASSWORD_HASH_WORKERS = int(os.getenv('PASSWORD_HASH_WORKERS', max(1, (os.cpu_count() or 2) // 2)))
+PASSWORD_HASH_MAX_PENDING = int(os.getenv('PASSWORD_HASH_MAX_PENDING', PASSWORD_HASH_WORKERS * 8))
+PASSWORD_HASH_QUEUE_TIMEOUT = float(os.getenv('PASSWORD_HASH_QUEUE_TIMEOUT', 2))
 
 # ---------- CORS Configuration ----------
 CORS(app, 
@@ -67,38 +103,175 @@ CORS(app,
      expose_headers=['X-Auth-Token'],
      methods=['GET', 'POST', 'PUT', 'PATCH', 'DELETE', 'OPTIONS'])
 
+# ---------- Response Encoding Configuration ----------
+JSON_FAST_ENCODER = os.getenv('JSON_FAST_ENCODER', '1').lower() in ('true', '1')
+COMPRESS_MIN_BYTES = int(os.getenv('COMPRESS_MIN_BYTES', 1024))
+COMPRESS_GZIP_LEVEL = int(os.getenv('COMPRESS_GZIP_LEVEL', 5))
+COMPRESS_BROTLI_QUALITY = int(os.getenv('COMPRESS_BROTLI_QUALITY', 4))
+COMPRESSIBLE_MIMETYPES = ('application/json', 'text/html', 'text/plain')
+
+# ---------- Metrics Configuration ----------
+METRICS_ENABLED = os.getenv('METRICS_ENABLED', '1').lower() in ('true', '1')
+# Scrapers send it as a bearer token; without it /metrics is admin-only
+METRICS_TOKEN = os.getenv('METRICS_TOKEN', '').strip()
+# Directory where each worker process writes its metrics for /metrics to merge;
+# unset serves the scraped process's own metrics only
+METRICS_MULTIPROC_DIR = os.getenv('METRICS_MULTIPROC_DIR', '').strip()
+METRICS_FLUSH_INTERVAL = float(os.getenv('METRICS_FLUSH_INTERVAL', 5))
+METRICS_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+METRICS_COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 100)
+
 # ---------- Logging Setup ----------
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO').upper()
+LOG_FORMAT = os.getenv('LOG_FORMAT', 'json').strip().lower()
+LOG_QUEUE_SIZE = int(os.getenv('LOG_QUEUE_SIZE', 10000))
+# Fraction of INFO/DEBUG records kept per child logger, e.g. "access=0.1,auth=0.5"
+LOG_SAMPLE_RATES = {
+    name.strip(): float(rate)
+    for name, _, rate in (item.partition('=') for item in os.getenv('LOG_SAMPLE_RATES', '').split(','))
+    if name.strip() and rate.strip()
+}
 logger = logging.getLogger(__name__)
+# Request id, start time and DB call count of the current asgi.py request
+async_request_state = contextvars.ContextVar('async_request_state', default=None)
+auth_logger = logger.getChild('auth')
+access_logger = logger.getChild('access')
+query_logger = logger.getChild('query')
 
 # ---------- File Upload Configuration ----------
 UPLOAD_FOLDER = os.getenv('UPLOAD_FOLDER', os.path.join(os.getcwd(), 'uploads'))
 ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif', 'pdf'}
 MAX_CONTENT_LENGTH = int(os.getenv('MAX_UPLOAD_BYTES', 5 * 1024 * 1024))
 app.config['MAX_CONTENT_LENGTH'] = MAX_CONTENT_LENGTH
+# Uploaded files larger than this are spooled to disk while the request is parsed
+UPLOAD_SPOOL_MEMORY_BYTES = int(os.getenv('UPLOAD_SPOOL_MEMORY_BYTES', 512 * 1024))
+UPLOAD_TMP_DIR = os.getenv('UPLOAD_TMP_DIR') or None
+UPLOAD_DEDUP_CACHE_SIZE = int(os.getenv('UPLOAD_DEDUP_CACHE_SIZE', 10000))
+# Short enough that another worker's orphan cleanup is not masked for long
+UPLOAD_DEDUP_TTL = int(os.getenv('UPLOAD_DEDUP_TTL', 600))
+
+# ---------- Image Processing Configuration ----------
+PROFILE_PICTURE_SIZES = tuple(int(x) for x in os.getenv('PROFILE_PICTURE_SIZES', '800,256,64').split(','))
+IMAGE_MAX_PIXELS = int(os.getenv('IMAGE_MAX_PIXELS', 40_000_000))
+IMAGE_WORKERS = int(os.getenv('IMAGE_WORKERS', max(1, (os.cpu_count() or 2) // 2)))
+IMAGE_MAX_PENDING = int(os.getenv('IMAGE_MAX_PENDING', IMAGE_WORKERS * 4))
+IMAGE_QUEUE_TIMEOUT = float(os.getenv('IMAGE_QUEUE_TIMEOUT', 5))
+IMAGE_TASK_TIMEOUT = float(os.getenv('IMAGE_TASK_TIMEOUT', 30))
+
+# ---------- Receipt Image Configuration ----------
+RECEIPT_NORMALIZE = os.getenv('RECEIPT_NORMALIZE', '1').lower() in ('true', '1')
+RECEIPT_IMAGE_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif'}
+RECEIPT_IMAGE_FORMAT = os.getenv('RECEIPT_IMAGE_FORMAT', 'webp').lower()  # webp or jpeg
+RECEIPT_IMAGE_QUALITY = int(os.getenv('RECEIPT_IMAGE_QUALITY', 80))
+RECEIPT_MAX_EDGE = int(os.getenv('RECEIPT_MAX_EDGE', 1600))
+RECEIPT_PREVIEW_EDGE = int(os.getenv('RECEIPT_PREVIEW_EDGE', 320))
+RECEIPT_WORKERS = int(os.getenv('RECEIPT_WORKERS', 2))
+# Receipt renders admitted to the image pool at once, separate from the
+# IMAGE_MAX_PENDING budget that profile uploads are admitted against
+RECEIPT_IMAGE_MAX_PENDING = int(os.getenv('RECEIPT_IMAGE_MAX_PENDING', max(1, min(RECEIPT_WORKERS, IMAGE_WORKERS))))
+RECEIPT_QUEUE_SIZE = int(os.getenv('RECEIPT_QUEUE_SIZE', 200))
+RECEIPT_MAX_ATTEMPTS = int(os.getenv('RECEIPT_MAX_ATTEMPTS', 3))
+RECEIPT_RETRY_BACKOFF = float(os.getenv('RECEIPT_RETRY_BACKOFF', 2))
 
 # ---------- Supabase Configuration ----------
 SUPABASE_URL = os.getenv('SUPABASE_URL', '').strip()
 SUPABASE_KEY = os.getenv('SUPABASE_KEY', '').strip()
 SUPABASE_RECEIPT_BUCKET = os.getenv('SUPABASE_RECEIPT_BUCKET', 'receipts')
 SUPABASE_PROFILE_BUCKET = os.getenv('SUPABASE_PROFILE_BUCKET', 'profile-pictures')
+# 'shared': one client per process; 'thread': one client (and pool) per worker thread
+SUPABASE_CLIENT_MODE = os.getenv('SUPABASE_CLIENT_MODE', 'shared').lower()
+SUPABASE_MAX_CONNECTIONS = int(os.getenv('SUPABASE_MAX_CONNECTIONS', 20))
+SUPABASE_MAX_KEEPALIVE = int(os.getenv('SUPABASE_MAX_KEEPALIVE', 10))
+SUPABASE_KEEPALIVE_EXPIRY = float(os.getenv('SUPABASE_KEEPALIVE_EXPIRY', 30))
+SUPABASE_TIMEOUT = float(os.getenv('SUPABASE_TIMEOUT', 15))
+# HTTP/2 needs the optional h2 package
+SUPABASE_HTTP2 = (os.getenv('SUPABASE_HTTP2', '1').lower() in ('true', '1')
+                  and importlib.util.find_spec('h2') is not None)
+
+# ---------- Signed URL Configuration ----------
+RECEIPT_URL_TTL = int(os.getenv('RECEIPT_URL_TTL', 3600))
+RECEIPT_URL_REFRESH_MARGIN = int(os.getenv('RECEIPT_URL_REFRESH_MARGIN', 300))
+RECEIPT_URL_CACHE_MAX = int(os.getenv('RECEIPT_URL_CACHE_MAX', 5000))
+RECEIPT_URL_BATCH_SIZE = int(os.getenv('RECEIPT_URL_BATCH_SIZE', 200))
 
 # ---------- Email Configuration ----------
 SMTP_EMAIL = os.getenv('SMTP_EMAIL')
 SMTP_PASS = os.getenv('SMTP_PASS')
 SMTP_SERVER = os.getenv('SMTP_SERVER', 'smtp.gmail.com')
 SMTP_PORT = int(os.getenv('SMTP_PORT', 587))
+SMTP_STARTTLS = os.getenv('SMTP_STARTTLS', '1').lower() in ('true', '1')
+SMTP_TIMEOUT = int(os.getenv('SMTP_TIMEOUT', 15))
+SMTP_IDLE_TIMEOUT = int(os.getenv('SMTP_IDLE_TIMEOUT', 60))
+
+# ---------- Email Outbox Configuration ----------
+EMAIL_ASYNC = os.getenv('EMAIL_ASYNC', '1').lower() in ('true', '1')
+EMAIL_OUTBOX_SIZE = int(os.getenv('EMAIL_OUTBOX_SIZE', 200))
+EMAIL_WORKERS = int(os.getenv('EMAIL_WORKERS', 2))
+EMAIL_MAX_ATTEMPTS = int(os.getenv('EMAIL_MAX_ATTEMPTS', 3))
+EMAIL_RETRY_BACKOFF = float(os.getenv('EMAIL_RETRY_BACKOFF', 2.0))
+# Delivery statuses live in a SQLite file so any worker on the host can answer a poll
+EMAIL_STATUS_DB_PATH = os.getenv('EMAIL_STATUS_DB_PATH', os.path.join(UPLOAD_FOLDER, 'email_status.db'))
+EMAIL_STATUS_TTL = int(os.getenv('EMAIL_STATUS_TTL', 3600))
 
 # ---------- 2FA Configuration ----------
 CODE_TTL = int(os.getenv('CODE_TTL', 300))
 SEND_LIMIT_WINDOW = int(os.getenv('SEND_LIMIT_WINDOW', 3600))
 SEND_LIMIT_COUNT = int(os.getenv('SEND_LIMIT_COUNT', 5))
 
+# ---------- Rate Limit Configuration ----------
+# memory (per process), sqlite (shared by workers on one host; the launcher's
+# default) or redis
+RATE_LIMIT_BACKEND = os.getenv('RATE_LIMIT_BACKEND', 'memory').strip().lower()
+RATE_LIMIT_SQLITE_PATH = os.getenv('RATE_LIMIT_SQLITE_PATH', os.path.join(UPLOAD_FOLDER, 'rate_limits.db'))
+RATE_LIMIT_REDIS_URL = os.getenv('RATE_LIMIT_REDIS_URL', 'redis://localhost:6379/0')
+RATE_LIMIT_SWEEP_INTERVAL = int(os.getenv('RATE_LIMIT_SWEEP_INTERVAL', 60))
+
+# ---------- Storage Cleanup Configuration ----------
+# Pending deletions survive restarts in a SQLite file shared by workers on one host
+STORAGE_CLEANUP_DB_PATH = os.getenv('STORAGE_CLEANUP_DB_PATH', os.path.join(UPLOAD_FOLDER, 'storage_cleanup.db'))
+STORAGE_CLEANUP_BATCH = int(os.getenv('STORAGE_CLEANUP_BATCH', 100))
+STORAGE_CLEANUP_INTERVAL = float(os.getenv('STORAGE_CLEANUP_INTERVAL', 5))
+STORAGE_CLEANUP_LEASE = int(os.getenv('STORAGE_CLEANUP_LEASE', 120))
+STORAGE_CLEANUP_BACKOFF = float(os.getenv('STORAGE_CLEANUP_BACKOFF', 30))
+STORAGE_CLEANUP_MAX_BACKOFF = float(os.getenv('STORAGE_CLEANUP_MAX_BACKOFF', 3600))
+# Orphan sweep of the profile and receipt buckets; 0 disables the periodic run
+STORAGE_RECONCILE_INTERVAL = int(os.getenv('STORAGE_RECONCILE_INTERVAL', 86400))
+# Younger objects may belong to an upload whose row is not written yet
+STORAGE_ORPHAN_MIN_AGE = int(os.getenv('STORAGE_ORPHAN_MIN_AGE', 3600))
+STORAGE_LIST_PAGE_SIZE = int(os.getenv('STORAGE_LIST_PAGE_SIZE', 1000))
+
+# ---------- Pagination Configuration ----------
+TASKS_PAGE_MAX = int(os.getenv('TASKS_PAGE_MAX', 200))
+SYNC_PAGE_SIZE = int(os.getenv('SYNC_PAGE_SIZE', 500))
+SYNC_LOG_RETENTION = os.getenv('SYNC_LOG_RETENTION', '30 days')
+TASK_STATS_TTL = int(os.getenv('TASK_STATS_TTL', 60))
+TASK_BATCH_MAX = int(os.getenv('TASK_BATCH_MAX', 500))
+
+# ---------- User Cache Configuration ----------
+USER_CACHE_TTL = int(os.getenv('USER_CACHE_TTL', 60))
+USER_CACHE_SIZE = int(os.getenv('USER_CACHE_SIZE', 5000))
+
 # ---------- Global Variables ----------
 _supabase_client = None
+_receipt_url_cache = OrderedDict()
+_receipt_url_lock = threading.Lock()
+_stored_uploads = OrderedDict()
+_stored_uploads_lock = threading.Lock()
+_token_cache = OrderedDict()
+_token_cache_lock = threading.Lock()
+_token_cache_stats = {'hits': 0, 'misses': 0}
+_user_cache = OrderedDict()
+_user_cache_lock = threading.Lock()
+_task_stats_cache = {}
+_task_stats_lock = threading.Lock()
+_image_pool = None
+_image_pool_lock = threading.Lock()
+_image_slots = threading.BoundedSemaphore(IMAGE_MAX_PENDING)
+_receipt_image_slots = threading.BoundedSemaphore(RECEIPT_IMAGE_MAX_PENDING)
+_password_pool = None
+_password_pool_pid = None
+_password_pool_lock = threading.Lock()
+_password_slots = threading.BoundedSemaphore(PASSWORD_HASH_MAX_PENDING)
 
 
 # ================================================================================
@@ -114,6 +287,571 @@ def json_response(success, message=None, code=200, **kwargs):
     return jsonify(payload), code
 
 
+def postgrest_quote(value):
+    """Quote a value for use inside a PostgREST or/and filter string"""
+    text = str(value).replace('\\', '\\\\').replace('"', '\\"')
+    return f'"{text}"'
+
+
+def encode_cursor(data):
+    """Encode keyset pagination state as an opaque URL-safe cursor"""
+    raw = json.dumps(data, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Decode a cursor produced by encode_cursor, or None if malformed"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        return data if isinstance(data, dict) else None
+    except Exception:
+        return None
+
+
+def sqlite_connection(path, local, schema=()):
+    """This thread's connection to a SQLite file shared by the workers on a host.
+
+    local is the caller's threading.local(). Connections are per thread and
+    per process: one opened before a fork is never used by the child.
+    schema statements run on every new connection.
+    """
+    conn = getattr(local, 'conn', None)
+    if conn is None or local.pid != os.getpid():
+        import sqlite3
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = sqlite3.connect(path, timeout=5, isolation_level=None)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        for statement in schema:
+            conn.execute(statement)
+        local.conn = conn
+        local.pid = os.getpid()
+    return conn
+
+
+class WorkerThreads:
+    """Daemon threads running target, started lazily in each process.
+
+    Threads do not survive fork: a preforked worker inherits this object
+    but none of the running threads. start() is cheap once they run, so
+    owners call it on every use and each process starts its own.
+    on_start runs, under the lock, right before new threads start.
+    """
+
+    def __init__(self, target, name, count=1, on_start=None):
+        self.target = target
+        self.name = name
+        self.count = count
+        self.on_start = on_start
+        self.threads = []
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def running(self):
+        return self._pid == os.getpid() and bool(self.threads) and all(t.is_alive() for t in self.threads)
+
+    def start(self):
+        if self.running():
+            return
+        with self._lock:
+            if self.running():
+                return
+            if self.on_start:
+                self.on_start()
+            self._pid = os.getpid()
+            names = [self.name] if self.count == 1 else [f'{self.name}-{i}' for i in range(self.count)]
+            self.threads = [threading.Thread(target=self.target, name=name, daemon=True) for name in names]
+            for t in self.threads:
+                t.start()
+
+    def join(self, timeout):
+        for t in self.threads:
+            t.join(timeout=timeout)
+        self.threads = []
+
+    def stop_queue(self, work_queue, timeout):
+        """Put one None per thread on work_queue, then wait for the threads"""
+        for _ in self.threads:
+            try:
+                # A full queue with stuck workers must not hang shutdown
+                work_queue.put(None, timeout=timeout)
+            except queue.Full:
+                logger.warning('%s queue still full at shutdown, %d items dropped', self.name, work_queue.qsize())
+                break
+        self.join(timeout)
+
+
+# ---------- Metrics ----------
+
+class Metric:
+    """Prometheus counter or histogram with a fixed set of label names.
+
+    Each label combination holds raw per-bucket counts; they are made
+    cumulative only when rendered, so observe() is one bisect and a few
+    increments under a per-metric lock.
+    """
+
+    def __init__(self, name, help_text, labels=(), buckets=None):
+        self.name = name
+        self.help_text = help_text
+        self.labels = labels
+        self.buckets = buckets
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values, amount=1):
+        with self._lock:
+            self._series[label_values] = self._series.get(label_values, 0) + amount
+
+    def observe(self, value, *label_values):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[index] += 1
+            series[-1] += value
+
+    def _label_text(self, label_values, extra=None):
+        pairs = list(zip(self.labels, label_values))
+        if extra:
+            pairs.append(extra)
+        if not pairs:
+            return ''
+        escaped = (str(v).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, v in pairs)
+        return '{' + ','.join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + '}'
+
+    def collect_series(self):
+        """Copy of label values -> value (raw bucket counts and sum for histograms)"""
+        with self._lock:
+            return {k: (v if self.buckets is None else list(v)) for k, v in self._series.items()}
+
+    def merge(self, total, value):
+        """Add one process's value for a series to the running total"""
+        if total is None:
+            return value
+        if self.buckets is None:
+            return total + value
+        return [a + b for a, b in zip(total, value)]
+
+    def render(self, series=None):
+        kind = 'counter' if self.buckets is None else 'histogram'
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} {kind}']
+        if series is None:
+            series = self.collect_series()
+        for label_values, value in sorted(series.items()):
+            if self.buckets is None:
+                lines.append(f'{self.name}{self._label_text(label_values)} {value}')
+                continue
+            cumulative = 0
+            for bound, count in zip(self.buckets + ('+Inf',), value[:-1]):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{self._label_text(label_values, ("le", bound))} {cumulative}')
+            lines.append(f'{self.name}_sum{self._label_text(label_values)} {value[-1]}')
+            lines.append(f'{self.name}_count{self._label_text(label_values)} {cumulative}')
+        return lines
+
+
+class Gauge(Metric):
+    """Gauge read at scrape time from collect(), which maps label tuples to values"""
+
+    def __init__(self, name, help_text, labels, collect):
+        super().__init__(name, help_text, labels)
+        self.collect = collect
+
+    def collect_series(self):
+        return self.collect()
+
+    def merge(self, total, value):
+        return value if total is None else total + value
+
+    def render(self, values=None):
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} gauge']
+        if values is None:
+            try:
+                values = self.collect()
+            except Exception:
+                return lines
+        for label_values, value in sorted(values.items()):
+            lines.append(f'{self.name}{self._label_text(label_values)} {value}')
+        return lines
+
+
+class MetricsRegistry:
+    """Metrics rendered in the Prometheus text format.
+
+    With shared_dir set, every process writes a snapshot of its series to
+    <shared_dir>/<pid>.json every flush_interval seconds, and render()
+    sums the snapshots of all processes, so a scrape that lands on any
+    worker covers them all. Counters and histograms of exited workers keep
+    counting towards the totals; gauges only come from live processes.
+    """
+
+    def __init__(self, enabled=True, shared_dir=None, flush_interval=METRICS_FLUSH_INTERVAL):
+        self.enabled = enabled
+        self.shared_dir = shared_dir or None
+        self.flush_interval = flush_interval
+        self._metrics = []
+        self._flusher = WorkerThreads(self._run, 'metrics-flush')
+
+    def counter(self, name, help_text, labels=()):
+        metric = Metric(name, help_text, labels)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(self, name, help_text, labels=(), buckets=METRICS_LATENCY_BUCKETS):
+        metric = Metric(name, help_text, labels, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def gauge(self, name, help_text, labels, collect):
+        metric = Gauge(name, help_text, labels, collect)
+        self._metrics.append(metric)
+        return metric
+
+    def start(self):
+        """Start this process's snapshot writer; a no-op without shared_dir"""
+        if self.shared_dir:
+            self._flusher.start()
+
+    def _run(self):
+        while True:
+            time.sleep(self.flush_interval)
+            try:
+                self.flush()
+            except Exception as e:
+                logger.warning('Writing metrics snapshot failed: %s', e)
+
+    def flush(self):
+        """Write this process's series to its snapshot file"""
+        if not self.shared_dir:
+            return
+        snapshot = {}
+        for metric in self._metrics:
+            try:
+                series = metric.collect_series()
+            except Exception:
+                continue
+            snapshot[metric.name] = [[list(labels), value] for labels, value in series.items()]
+        os.makedirs(self.shared_dir, exist_ok=True)
+        path = os.path.join(self.shared_dir, f'{os.getpid()}.json')
+        with open(path + '.tmp', 'w') as f:
+            json.dump(snapshot, f)
+        os.replace(path + '.tmp', path)
+
+    def clear(self):
+        """Drop every process's snapshot; run once before workers start"""
+        if not self.shared_dir or not os.path.isdir(self.shared_dir):
+            return
+        for name in os.listdir(self.shared_dir):
+            if name.endswith('.json') or name.endswith('.tmp'):
+                os.remove(os.path.join(self.shared_dir, name))
+
+    def _merged(self):
+        self.flush()
+        merged = {metric.name: {} for metric in self._metrics}
+        by_name = {metric.name: metric for metric in self._metrics}
+        for name in os.listdir(self.shared_dir):
+            if not name.endswith('.json'):
+                continue
+            try:
+                with open(os.path.join(self.shared_dir, name)) as f:
+                    snapshot = json.load(f)
+            except (OSError, ValueError):
+                continue
+            alive = pid_alive(int(name[:-5])) if name[:-5].isdigit() else False
+            for metric_name, series in snapshot.items():
+                metric = by_name.get(metric_name)
+                if metric is None or (isinstance(metric, Gauge) and not alive):
+                    continue
+                totals = merged[metric_name]
+                for labels, value in series:
+                    labels = tuple(labels)
+                    totals[labels] = metric.merge(totals.get(labels), value)
+        return merged
+
+    def render(self):
+        merged = self._merged() if self.shared_dir else {}
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render(merged.get(metric.name)))
+        return '\n'.join(lines) + '\n'
+
+
+def pid_alive(pid):
+    """Whether a process with this pid exists on this host"""
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+metrics = MetricsRegistry(enabled=METRICS_ENABLED, shared_dir=METRICS_MULTIPROC_DIR)
+HTTP_REQUESTS = metrics.counter(
+    'likhayag_http_requests_total', 'HTTP requests by route, method and status', ('method', 'route', 'status'))
+HTTP_DURATION = metrics.histogram(
+    'likhayag_http_request_duration_seconds', 'HTTP request latency by route and method', ('method', 'route'))
+DB_CALLS_PER_REQUEST = metrics.histogram(
+    'likhayag_db_calls_per_request', 'Database calls made while serving one request', ('method', 'route'),
+    buckets=METRICS_COUNT_BUCKETS)
+DB_DURATION = metrics.histogram(
+    'likhayag_db_query_duration_seconds', 'Database call latency by safe_execute operation', ('operation',))
+DB_ERRORS = metrics.counter(
+    'likhayag_db_errors_total', 'Failed database calls by safe_execute operation', ('operation',))
+STORAGE_DURATION = metrics.histogram(
+    'likhayag_storage_duration_seconds', 'Supabase storage call latency', ('operation',))
+STORAGE_ERRORS = metrics.counter(
+    'likhayag_storage_errors_total', 'Failed Supabase storage calls', ('operation',))
+SMTP_DURATION = metrics.histogram(
+    'likhayag_smtp_duration_seconds', 'SMTP connect and send latency', ('operation',))
+SMTP_ERRORS = metrics.counter(
+    'likhayag_smtp_errors_total', 'Failed SMTP connects and sends', ('operation',))
+RECEIPT_DURATION = metrics.histogram(
+    'likhayag_receipt_processing_seconds', 'Receipt image normalization time, upload included', ('result',))
+RECEIPT_BYTES = metrics.counter(
+    'likhayag_receipt_bytes_total', 'Receipt image bytes before and after normalization', ('stage',))
+UNHANDLED_ERRORS = metrics.counter(
+    'likhayag_unhandled_exceptions_total', 'Exceptions that reached the 500 handler', ('route',))
+
+
+class CallTimer:
+    """Context manager recording a call's latency and failures"""
+
+    __slots__ = ('histogram', 'errors', 'operation', 'start')
+
+    def __init__(self, histogram, errors, operation):
+        self.histogram = histogram
+        self.errors = errors
+        self.operation = operation
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if metrics.enabled:
+            self.histogram.observe(time.perf_counter() - self.start, self.operation)
+            if exc_type is not None:
+                self.errors.inc(self.operation)
+        return False
+
+
+def request_route():
+    """Route template of the current request, bounded for use as a label"""
+    return request.url_rule.rule if request.url_rule else 'unmatched'
+
+
+@app.before_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
+    g.request_id = request.headers.get('X-Request-ID') or uuid.uuid4().hex
+    g.db_calls = 0
+
+
+# Registered before compress_response so it runs after it and includes it
+@app.after_request
+def record_request_metrics(response):
+    """Record latency, status and database call count for the request"""
+    started = g.get('request_started')
+    if started is None:
+        return response
+    elapsed = time.perf_counter() - started
+    route = request_route()
+    if metrics.enabled:
+        metrics.start()
+        HTTP_DURATION.observe(elapsed, request.method, route)
+        HTTP_REQUESTS.inc(request.method, route, str(response.status_code))
+        DB_CALLS_PER_REQUEST.observe(g.get('db_calls', 0), request.method, route)
+    response.headers['X-Request-ID'] = g.request_id
+    access_logger.info('%s %s %s', request.method, route, response.status_code,
+                       extra={'status': response.status_code, 'duration_ms': round(elapsed * 1000, 2),
+                              'db_calls': g.get('db_calls', 0)})
+    return response
+
+
+# ---------- Structured Logging ----------
+
+LOG_RECORD_FIELDS = frozenset(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+
+class JsonLogFormatter(logging.Formatter):
+    """One JSON object per record; extra= fields are included as keys"""
+
+    def format(self, record):
+        entry = {
+            'ts': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in LOG_RECORD_FIELDS and not key.startswith('_'):
+                entry[key] = value
+        if record.exc_info:
+            entry['exc_info'] = self.formatException(record.exc_info)
+        if ORJSON_AVAILABLE:
+            return orjson.dumps(entry, default=str).decode('utf-8')
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class RequestQueueHandler(logging.handlers.QueueHandler):
+    """Enqueue records without formatting them in the calling thread.
+
+    The message is interpolated by the listener thread, so a record only
+    costs a dict of request context and a put on the caller's side.
+    Records are dropped rather than blocking when the queue is full.
+    """
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record):
+        if has_request_context():
+            request_id, started = g.get('request_id'), g.get('request_started')
+        else:
+            state = async_request_state.get()
+            request_id, started = (state['request_id'], state['started']) if state else (None, None)
+        if request_id:
+            record.request_id = request_id
+            if started is not None and not hasattr(record, 'duration_ms'):
+                record.duration_ms = round((time.perf_counter() - started) * 1000, 2)
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class SamplingFilter(logging.Filter):
+    """Keep only a fraction of INFO/DEBUG records for selected loggers"""
+
+    def __init__(self, rates):
+        super().__init__()
+        self.rates = {logger.getChild(name).name: rate for name, rate in rates.items()}
+
+    def filter(self, record):
+        if record.levelno >= logging.WARNING:
+            return True
+        rate = self.rates.get(record.name)
+        return rate is None or random.random() < rate
+
+
+def configure_logging():
+    """Route all records through a queue drained by a listener thread"""
+    stream = logging.StreamHandler()
+    if LOG_FORMAT == 'json':
+        stream.setFormatter(JsonLogFormatter())
+    else:
+        stream.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
+    
+    handler = RequestQueueHandler(queue.Queue(maxsize=LOG_QUEUE_SIZE))
+    if LOG_SAMPLE_RATES:
+        handler.addFilter(SamplingFilter(LOG_SAMPLE_RATES))
+    
+    root = logging.getLogger()
+    root.setLevel(LOG_LEVEL)
+    root.handlers[:] = [handler]
+    
+    listener = logging.handlers.QueueListener(handler.queue, stream, respect_handler_level=True)
+    listener.start()
+    atexit.register(lambda: listener.stop())
+    
+    def restart_in_child():
+        # The listener thread does not survive fork; preforked workers need their own
+        nonlocal listener
+        handler.queue = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+        listener = logging.handlers.QueueListener(handler.queue, stream, respect_handler_level=True)
+        listener.start()
+    
+    if hasattr(os, 'register_at_fork'):
+        os.register_at_fork(after_in_child=restart_in_child)
+    return handler
+
+
+log_handler = configure_logging()
+
+
+def logging_stats():
+    """Queue depth and records dropped because the log queue was full"""
+    return {'queued': log_handler.queue.qsize(), 'dropped': log_handler.dropped}
+
+
+# ---------- Response Encoding ----------
+
+class OrjsonProvider(DefaultJSONProvider):
+    """Flask JSON provider backed by orjson; jsonify() goes through it"""
+
+    OPTIONS = orjson.OPT_NON_STR_KEYS if ORJSON_AVAILABLE else 0
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=self.default, option=self.OPTIONS).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        body = orjson.dumps(obj, default=self.default, option=self.OPTIONS)
+        return self._app.response_class(body, mimetype=self.mimetype)
+
+
+if ORJSON_AVAILABLE and JSON_FAST_ENCODER:
+    app.json = OrjsonProvider(app)
+
+
+def choose_encoding(accept_encoding):
+    """Pick the best supported content coding from an Accept-Encoding header"""
+    if BROTLI_AVAILABLE and accept_encoding['br']:
+        return 'br'
+    if accept_encoding['gzip']:
+        return 'gzip'
+    return None
+
+
+@app.after_request
+def compress_response(response):
+    """Compress large successful text/JSON bodies per Accept-Encoding"""
+    if (response.direct_passthrough
+            or response.is_streamed
+            or not 200 <= response.status_code < 300
+            or response.status_code == 204
+            or 'Content-Encoding' in response.headers
+            or response.mimetype not in COMPRESSIBLE_MIMETYPES):
+        return response
+    
+    response.vary.add('Accept-Encoding')
+    body = response.get_data()
+    if len(body) < COMPRESS_MIN_BYTES:
+        return response
+    
+    encoding = choose_encoding(request.accept_encodings)
+    if not encoding:
+        return response
+    
+    if encoding == 'br':
+        body = brotli.compress(body, quality=COMPRESS_BROTLI_QUALITY)
+    else:
+        body = gzip.compress(body, compresslevel=COMPRESS_GZIP_LEVEL)
+    
+    response.set_data(body)
+    response.headers['Content-Encoding'] = encoding
+    
+    # A strong ETag must differ between codings of the same entity
+    etag, weak = response.get_etag()
+    if etag:
+        response.set_etag(f'{etag}-{encoding}', weak=weak)
+    return response
+
+
 # ================================================================================
 # SECTION 3: JWT TOKEN MANAGEMENT
 # ================================================================================
@@ -127,13 +865,15 @@ def create_token(user_id, email, role):
         'exp': datetime.utcnow() + timedelta(hours=JWT_EXPIRATION_HOURS),
         'iat': datetime.utcnow()
     }
+    import jwt
     token = jwt.encode(payload, JWT_SECRET, algorithm=JWT_ALGORITHM)
-    logger.info(f'✅ Token created for user {user_id} ({email})')
+    auth_logger.info('✅ Token created for user %s (%s)', user_id, email)
     return token
 
 
 def decode_token(token):
     """Decode and verify JWT token"""
+    import jwt
     try:
         payload = jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALGORITHM])
         return payload
@@ -145,6 +885,43 @@ def decode_token(token):
         return None
 
 
+def verify_token(token):
+    """Verify JWT token, reusing the claims of recently verified tokens.
+
+    Verified payloads are kept in a bounded LRU keyed by the token's SHA-256
+    digest and dropped once the token's own `exp` passes.
+    """
+    key = hashlib.sha256(token.encode('utf-8')).digest()
+    now = time.time()
+    
+    with _token_cache_lock:
+        entry = _token_cache.get(key)
+        if entry:
+            if entry[1] > now:
+                _token_cache.move_to_end(key)
+                _token_cache_stats['hits'] += 1
+                return entry[0]
+            del _token_cache[key]
+        _token_cache_stats['misses'] += 1
+    
+    payload = decode_token(token)
+    if not payload or 'exp' not in payload:
+        return payload
+    
+    payload = MappingProxyType(payload)
+    with _token_cache_lock:
+        _token_cache[key] = (payload, float(payload['exp']))
+        while len(_token_cache) > TOKEN_CACHE_SIZE:
+            _token_cache.popitem(last=False)
+    return payload
+
+
+def token_cache_stats():
+    """Hit/miss counters of the verified-token cache"""
+    with _token_cache_lock:
+        return dict(_token_cache_stats, size=len(_token_cache))
+
+
 def get_token_from_request():
     """Extract JWT token from request headers"""
     auth_header = request.headers.get('Authorization')
@@ -158,24 +935,123 @@ def get_token_from_request():
     return None
 
 
+# ---------- Password Hashing ----------
+
+def get_password_pool():
+    """Get or create the password hashing thread pool.
+
+    hashlib's scrypt and pbkdf2_hmac release the GIL, so threads use every
+    core without pickling passwords across processes.
+    """
+    global _password_pool, _password_pool_pid
+    with _password_pool_lock:
+        # Per process, for the reason given on WorkerThreads
+        if _password_pool is None or _password_pool_pid != os.getpid():
+            _password_pool = ThreadPoolExecutor(
+                max_workers=PASSWORD_HASH_WORKERS,
+                thread_name_prefix='password-hash'
+            )
+            _password_pool_pid = os.getpid()
+        return _password_pool
+
+
+def run_password_task(func, *args):
+    """Run a KDF call in the pool; raises TimeoutError when too many are pending.
+
+    The calling request thread still waits for the result. The pool caps
+    how many KDFs compete for the CPU at once; it does not free the thread.
+    """
+    if not _password_slots.acquire(timeout=PASSWORD_HASH_QUEUE_TIMEOUT):
+        raise TimeoutError('Password workers busy')
+    try:
+        return get_password_pool().submit(func, *args).result()
+    finally:
+        _password_slots.release()
+
+
+def hash_password(password):
+    """Hash a password with the configured method"""
+    return run_password_task(generate_password_hash, password, PASSWORD_HASH_METHOD, PASSWORD_SALT_LENGTH)
+
+
+def verify_password(password_hash, password):
+    """Check a password against a stored hash"""
+    return run_password_task(check_password_hash, password_hash or '', password)
+
+
+@functools.lru_cache(maxsize=1)
+def password_hash_prefix():
+    """Method prefix Werkzeug writes for PASSWORD_HASH_METHOD, defaults filled in"""
+    return generate_password_hash('', PASSWORD_HASH_METHOD, 1).split('$', 1)[0]
+
+
+def password_needs_rehash(password_hash):
+    """Whether a stored hash was made with other parameters than configured"""
+    return bool(password_hash) and password_hash.split('$', 1)[0] != password_hash_prefix()
+
+
+def rehash_password_later(user_id, password):
+    """Upgrade a stored hash in the background; skipped when the pool is busy"""
+    if not _password_slots.acquire(blocking=False):
+        return
+    
+    def upgrade():
+        try:
+            new_hash = generate_password_hash(password, PASSWORD_HASH_METHOD, PASSWORD_SALT_LENGTH)
+            success, _, _ = safe_execute(
+                get_supabase().table('users').update({'password_hash': new_hash}).eq('id', user_id),
+                'rehash_password'
+            )
+            if success:
+                with app.app_context():
+                    invalidate_user(user_id)
+                auth_logger.info('🔑 Password hash upgraded for user %s', user_id)
+        except Exception:
+            logger.exception('Password rehash failed')
+        finally:
+            _password_slots.release()
+    
+    try:
+        get_password_pool().submit(upgrade)
+    except RuntimeError:
+        _password_slots.release()
+
+
 # ================================================================================
 # SECTION 4: AUTHENTICATION DECORATORS
 # ================================================================================
 
+def authenticate_request(admin_only=False):
+    """Resolve the request's token once; returns an error response or None.
+
+    On success the claims are stored on request.user_data and the
+    normalized role on request.user_role.
+    """
+    token = get_token_from_request()
+    
+    if not token:
+        return json_response(False, 'Authentication required', 401)
+    
+    payload = verify_token(token)
+    if not payload:
+        return json_response(False, 'Invalid or expired token', 401)
+    
+    role = (payload.get('role') or '').lower()
+    if admin_only and role not in ADMIN_ROLES:
+        return json_response(False, 'Admin access required', 403)
+    
+    request.user_data = payload
+    request.user_role = role
+    return None
+
+
 def token_required(f):
     """Decorator: Require valid JWT token"""
     @wraps(f)
     def wrap(*args, **kwargs):
-        token = get_token_from_request()
-        
-        if not token:
-            return json_response(False, 'Authentication required', 401)
-        
-        payload = decode_token(token)
-        if not payload:
-            return json_response(False, 'Invalid or expired token', 401)
-        
-        request.user_data = payload
+        error = authenticate_request()
+        if error:
+            return error
         return f(*args, **kwargs)
     
     return wrap
@@ -185,20 +1061,9 @@ def admin_required(f):
     """Decorator: Require admin role"""
     @wraps(f)
     def wrap(*args, **kwargs):
-        token = get_token_from_request()
-        
-        if not token:
-            return json_response(False, 'Authentication required', 401)
-        
-        payload = decode_token(token)
-        if not payload:
-            return json_response(False, 'Invalid token', 401)
-        
-        role = (payload.get('role') or '').lower()
-        if role not in ('admin', 'administrator', 'superuser'):
-            return json_response(False, 'Admin access required', 403)
-        
-        request.user_data = payload
+        error = authenticate_request(admin_only=True)
+        if error:
+            return error
         return f(*args, **kwargs)
     
     return wrap
@@ -208,32 +1073,208 @@ def admin_required(f):
 # SECTION 5: SUPABASE DATABASE HELPERS
 # ================================================================================
 
+# ---------- Supabase Client Management ----------
+class PoolStatsTransport:
+    """httpx transport wrapper counting in-flight requests against the pool limit"""
+
+    def __init__(self, inner, max_connections):
+        self.inner = inner
+        self.max_connections = max_connections
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.requests = 0
+        self.saturated = 0
+        self._lock = threading.Lock()
+
+    def handle_request(self, request):
+        with self._lock:
+            self.requests += 1
+            if self.in_flight >= self.max_connections:
+                # Every connection is busy: this request waits for one
+                self.saturated += 1
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        try:
+            return self.inner.handle_request(request)
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+    def connection_counts(self):
+        """(open, idle) connections, read from httpcore's pool when it exposes them"""
+        connections = getattr(getattr(self.inner, '_pool', None), 'connections', None)
+        if connections is None:
+            return None, None
+        connections = list(connections)
+        return len(connections), sum(1 for c in connections if c.is_idle())
+
+    def stats(self):
+        open_connections, idle_connections = self.connection_counts()
+        with self._lock:
+            return {
+                'in_flight': self.in_flight,
+                'peak_in_flight': self.peak_in_flight,
+                'requests': self.requests,
+                'saturated': self.saturated,
+                'open_connections': open_connections,
+                'idle_connections': idle_connections,
+            }
+
+    def close(self):
+        self.inner.close()
+
+    def __enter__(self):
+        self.inner.__enter__()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.inner.__exit__(*exc_info)
+
+
+def build_supabase_client():
+    """Create a Supabase client over a tuned httpx pool; returns (client, transport)"""
+    from supabase import create_client
+    try:
+        import httpx
+        from supabase.lib.client_options import SyncClientOptions
+        transport = PoolStatsTransport(httpx.HTTPTransport(
+            limits=httpx.Limits(
+                max_connections=SUPABASE_MAX_CONNECTIONS,
+                max_keepalive_connections=SUPABASE_MAX_KEEPALIVE,
+                keepalive_expiry=SUPABASE_KEEPALIVE_EXPIRY
+            ),
+            http2=SUPABASE_HTTP2
+        ), SUPABASE_MAX_CONNECTIONS)
+        http_client = httpx.Client(transport=transport, timeout=SUPABASE_TIMEOUT)
+        return create_client(SUPABASE_URL, SUPABASE_KEY,
+                             options=SyncClientOptions(httpx_client=http_client)), transport
+    except (ImportError, TypeError) as e:
+        # supabase-py releases before httpx_client was an option
+        logger.warning('⚠️  Supabase client without a tuned connection pool: %s', e)
+        return create_client(SUPABASE_URL, SUPABASE_KEY), None
+
+
+class SupabaseClientManager:
+    """Supabase clients shared per process or held per thread.
+
+    The shared client is built once under _create_lock; _lock only guards
+    the transport list, so building a client never re-enters it.
+    """
+
+    def __init__(self, mode='shared'):
+        self.mode = mode
+        self._lock = threading.Lock()
+        self._create_lock = threading.Lock()
+        self._shared = None
+        self._local = threading.local()
+        self._transports = []
+        self._pid = os.getpid()
+
+    def get(self):
+        if self._pid != os.getpid():
+            self.reset()
+        if self.mode == 'thread':
+            client = getattr(self._local, 'client', None)
+            if client is None:
+                client = self._local.client = self._create()
+            return client
+        client = self._shared
+        if client is None:
+            with self._create_lock:
+                if self._shared is None:
+                    self._shared = self._create()
+                client = self._shared
+        return client
+
+    def _create(self):
+        if not SUPABASE_AVAILABLE:
+            raise RuntimeError('Supabase library not available')
+        if not SUPABASE_URL or not SUPABASE_KEY:
+            raise RuntimeError('Supabase URL/KEY not configured')
+        client, transport = build_supabase_client()
+        with self._lock:
+            if transport is not None:
+                self._transports.append(transport)
+            count = len(self._transports)
+        logger.info('✅ Supabase client initialized (%s mode, %d pooled)', self.mode, count)
+        return client
+
+    def reset(self):
+        """Forget every client; after fork their sockets belong to the parent"""
+        # Fresh locks: a thread that held one at fork time does not exist here
+        self._lock = threading.Lock()
+        self._create_lock = threading.Lock()
+        self._shared = None
+        self._local = threading.local()
+        self._transports = []
+        self._pid = os.getpid()
+
+    def stats(self):
+        with self._lock:
+            transports = list(self._transports)
+        totals = {'mode': self.mode, 'clients': len(transports), 'max_connections': SUPABASE_MAX_CONNECTIONS,
+                  'http2': SUPABASE_HTTP2, 'in_flight': 0, 'peak_in_flight': 0, 'requests': 0, 'saturated': 0,
+                  'open_connections': 0, 'idle_connections': 0}
+        for transport in transports:
+            for key, value in transport.stats().items():
+                if value is None:
+                    continue
+                if key == 'peak_in_flight':
+                    totals[key] = max(totals[key], value)
+                else:
+                    totals[key] += value
+        return totals
+
+
+supabase_clients = SupabaseClientManager(SUPABASE_CLIENT_MODE)
+metrics.gauge(
+    'likhayag_supabase_pool', 'Supabase HTTP pool state summed over all clients', ('state',),
+    lambda: {(key,): value for key, value in supabase_clients.stats().items()
+             if key in ('in_flight', 'open_connections', 'idle_connections')})
+metrics.gauge(
+    'likhayag_supabase_pool_saturated_requests', 'Supabase requests that found every pooled connection busy', (),
+    lambda: {(): supabase_clients.stats()['saturated']})
+
+
 def get_supabase():
-    """Get or create Supabase client singleton"""
-    global _supabase_client
+    """Return the Supabase client for this process or thread"""
+    # A client assigned to _supabase_client (benchmarks, tests) takes precedence
     if _supabase_client is not None:
         return _supabase_client
-    if not SUPABASE_AVAILABLE or not create_client:
-        raise RuntimeError('Supabase library not available')
-    if not SUPABASE_URL or not SUPABASE_KEY:
-        raise RuntimeError('Supabase URL/KEY not configured')
-    _supabase_client = create_client(SUPABASE_URL, SUPABASE_KEY)
-    logger.info('✅ Supabase client initialized')
-    return _supabase_client
+    return supabase_clients.get()
+
+
+def count_db_call():
+    """Count a database call against the current Flask or ASGI request"""
+    if has_app_context():
+        g.db_calls = g.get('db_calls', 0) + 1
+        return
+    state = async_request_state.get()
+    if state is not None:
+        state['db_calls'] += 1
 
 
 def safe_execute(query, operation_name='database operation'):
     """Execute Supabase query with comprehensive error handling"""
+    count_db_call()
+    start = time.perf_counter()
     try:
         response = query.execute()
         if hasattr(response, 'error') and response.error:
             logger.error(f"{operation_name} failed: {response.error}")
+            if metrics.enabled:
+                DB_ERRORS.inc(operation_name)
             return False, None, str(response.error)
         data = getattr(response, 'data', None)
         return True, data, None
     except Exception as e:
         logger.exception(f"{operation_name} exception: {e}")
+        if metrics.enabled:
+            DB_ERRORS.inc(operation_name)
         return False, None, str(e)
+    finally:
+        if metrics.enabled:
+            DB_DURATION.observe(time.perf_counter() - start, operation_name)
 
 
 def fetch_one(table_name: str, **filters):
@@ -252,75 +1293,1004 @@ def fetch_one(table_name: str, **filters):
         return None
 
 
-# ================================================================================
-# SECTION 6: FILE UPLOAD HELPERS
-# ================================================================================
+# ---------- User Record Cache ----------
+#
+# Read-through cache of `users` rows keyed by ('id', id) and ('email', email),
+# shared by the process with a TTL, plus a per-request layer on flask.g so one
+# request never fetches the same row twice. Every write to `users` must call
+# invalidate_user().
 
-def allowed_file(filename):
-    """Check if file extension is allowed"""
-    if not filename:
-        return False
-    ext = filename.rsplit('.', 1)[-1].lower() if '.' in filename else ''
-    return ext in ALLOWED_EXTENSIONS
+def _user_cache_keys(row):
+    keys = [('id', str(row.get('id')))]
+    if row.get('email'):
+        keys.append(('email', row['email'].strip().lower()))
+    return keys
 
 
-def save_uploaded_file(file_storage, bucket_name):
-    """Save uploaded file to Supabase storage"""
-    if not file_storage or file_storage.filename == '':
-        raise ValueError("No file provided")
-    filename = secure_filename(file_storage.filename)
-    if not allowed_file(filename):
-        raise ValueError("File type not allowed")
+def cached_user_row(key):
+    """Unexpired row from the process cache, or None"""
+    with _user_cache_lock:
+        entry = _user_cache.get(key)
+        if entry and entry[1] > time.monotonic():
+            _user_cache.move_to_end(key)
+            return entry[0]
+    return None
+
+
+def remember_user_row(row):
+    """Store a freshly fetched row under all of its keys"""
+    expires = time.monotonic() + USER_CACHE_TTL
+    with _user_cache_lock:
+        for cache_key in _user_cache_keys(row):
+            _user_cache[cache_key] = (row, expires)
+            _user_cache.move_to_end(cache_key)
+        while len(_user_cache) > USER_CACHE_SIZE:
+            _user_cache.popitem(last=False)
+
+
+def get_user(user_id=None, email=None):
+    """Fetch a user row by id or email through the request and process caches"""
+    key = ('id', str(user_id)) if user_id is not None else ('email', (email or '').strip().lower())
+    request_cache = g.setdefault('user_rows', {})
+    if key in request_cache:
+        return dict(request_cache[key])
     
-    unique = f"{uuid.uuid4().hex}_{filename}"
+    row = cached_user_row(key)
+    if row is None:
+        row = fetch_one('users', id=user_id) if key[0] == 'id' else fetch_one('users', email=key[1])
+        if not row:
+            return None
+        remember_user_row(row)
     
-    try:
-        sb = get_supabase()
-        file_content = file_storage.read()
-        sb.storage.from_(bucket_name).upload(unique, file_content)
-        logger.info(f'✅ File uploaded: {unique}')
-        return unique
-    except Exception as e:
-        logger.exception(f"Failed to upload file: {e}")
-        raise
+    for cache_key in _user_cache_keys(row):
+        request_cache[cache_key] = row
+    return dict(row)
 
 
-def get_receipt_url(filename, expires_seconds=3600):
-    """Get signed URL for file in receipt bucket"""
-    if not filename:
+def invalidate_user(user_id=None, email=None):
+    """Drop a user row from the caches after a write"""
+    keys = []
+    if user_id is not None:
+        keys.append(('id', str(user_id)))
+    if email:
+        keys.append(('email', email.strip().lower()))
+    
+    with _user_cache_lock:
+        for key in list(keys):
+            entry = _user_cache.get(key)
+            if entry:
+                keys.extend(_user_cache_keys(entry[0]))
+        for key in keys:
+            _user_cache.pop(key, None)
+    
+    request_cache = g.get('user_rows')
+    if request_cache:
+        for key in keys:
+            request_cache.pop(key, None)
+
+
+# ---------- Conditional Requests (ETag) ----------
+
+def collection_versions(names):
+    """Change counters for collections, maintained by database triggers"""
+    sb = get_supabase()
+    success, rows, _ = safe_execute(
+        sb.table('collection_versions').select('name,version').in_('name', list(names)),
+        'collection_versions'
+    )
+    if not success:
         return None
+    versions = {r['name']: r['version'] for r in (rows or [])}
+    return [versions.get(name, 0) for name in names]
+
+
+def compute_etag(versions, query_string, variant=None):
+    """Strong ETag for a collection snapshot, query and caller variant"""
+    key = json.dumps([versions, query_string, variant])
+    return hashlib.sha256(key.encode('utf-8')).hexdigest()[:32]
+
+
+def matching_etag(etag, if_none_match):
+    """The tag in If-None-Match that matches `etag` in any content coding"""
+    # compress_response suffixes the ETag with the content coding
+    return next(
+        (tag for tag in (etag, f'{etag}-gzip', f'{etag}-br') if if_none_match.contains(tag)),
+        None
+    )
+
+
+def etag_cached(*collections, vary=None):
+    """Decorator: strong ETag / If-None-Match on GET for a list endpoint.
+
+    The ETag covers the collections' change counters, the query string and
+    whatever `vary()` returns (e.g. the caller's identity). A matching
+    If-None-Match gets a 304 before the handler fetches or serializes rows.
+    """
+    def decorator(f):
+        @wraps(f)
+        def wrap(*args, **kwargs):
+            if request.method != 'GET':
+                return f(*args, **kwargs)
+            
+            versions = collection_versions(collections)
+            if versions is None:
+                return f(*args, **kwargs)
+            
+            etag = compute_etag(versions, request.query_string.decode('latin-1'), vary() if vary else None)
+            matched = matching_etag(etag, request.if_none_match)
+            
+            if matched:
+                response = make_response('', 304)
+                response.set_etag(matched)
+            else:
+                response = make_response(f(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+                response.set_etag(etag)
+            
+            response.headers['Cache-Control'] = 'private, no-cache'
+            return response
+        
+        return wrap
+    return decorator
+
+
+def vary_by_user():
+    """ETag variant for responses filtered by the caller"""
+    return [request.user_data.get('email'), request.user_role]
+
+
+def signs_receipts(args):
+    """Whether a budget request asked for receipt URLs inline with ?sign_receipts=1"""
+    return args.get('sign_receipts', '0').lower() in ('1', 'true', 'yes')
+
+
+def receipt_url_window():
+    """Current signed URL window; rolls over before cached signed receipt URLs expire"""
+    window = max(RECEIPT_URL_TTL - RECEIPT_URL_REFRESH_MARGIN, 1)
+    return int(time.time() // window)
+
+
+def vary_by_receipt_url_window():
+    """ETag variant that follows the URL window when receipts are signed inline"""
+    return receipt_url_window() if signs_receipts(request.args) else None
+
+
+# ================================================================================
+# SECTION 6: FILE UPLOAD HELPERS
+# ================================================================================
+
+def allowed_file(filename):
+    """Check if file extension is allowed"""
+    if not filename:
+        return False
+    ext = filename.rsplit('.', 1)[-1].lower() if '.' in filename else ''
+    return ext in ALLOWED_EXTENSIONS
+
+
+class UploadSpool:
+    """Upload body buffer that hashes what the form parser writes into it.
+
+    Small files stay in memory; larger ones go to a named temp file that is
+    removed on close, so they can be re-opened and streamed to storage.
+    """
+
+    def __init__(self, expected_length=None):
+        if expected_length is not None and expected_length <= UPLOAD_SPOOL_MEMORY_BYTES:
+            self.file = io.BytesIO()
+        else:
+            self.file = tempfile.NamedTemporaryFile('w+b', dir=UPLOAD_TMP_DIR, suffix='.upload')
+        self.sha256 = hashlib.sha256()
+        self.size = 0
+
+    @property
+    def path(self):
+        return getattr(self.file, 'name', None)
+
+    def keep(self):
+        """Hard-link the spooled file to a new path that outlives the request"""
+        kept = os.path.join(os.path.dirname(self.path), f'{uuid.uuid4().hex}.kept')
+        self.file.flush()
+        try:
+            os.link(self.path, kept)
+        except OSError:
+            import shutil
+            shutil.copyfile(self.path, kept)
+        return kept
+
+    def write(self, data):
+        self.sha256.update(data)
+        self.size += len(data)
+        return self.file.write(data)
+
+    def __getattr__(self, name):
+        return getattr(self.file, name)
+
+    def __iter__(self):
+        return iter(self.file)
+
+
+class UploadRequest(Request):
+    """Flask request whose uploaded files land in hashing UploadSpools"""
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        return UploadSpool(content_length or total_content_length)
+
+
+app.request_class = UploadRequest
+
+
+def upload_digest(stream):
+    """SHA-256 hex digest of an upload; UploadSpools hashed it while it was parsed"""
+    if isinstance(stream, UploadSpool):
+        return stream.sha256.hexdigest()
+    digest = hashlib.sha256()
+    stream.seek(0)
+    for chunk in iter(lambda: stream.read(256 * 1024), b''):
+        digest.update(chunk)
+    return digest.hexdigest()
+
+
+def is_duplicate_upload_error(error):
+    """Storage rejects an upload to an existing path with a 409 'Duplicate'"""
+    text = str(error)
+    return 'Duplicate' in text or 'already exists' in text
+
+
+def remember_stored_upload(bucket_name, name):
+    with _stored_uploads_lock:
+        _stored_uploads[(bucket_name, name)] = time.monotonic() + UPLOAD_DEDUP_TTL
+        _stored_uploads.move_to_end((bucket_name, name))
+        while len(_stored_uploads) > UPLOAD_DEDUP_CACHE_SIZE:
+            _stored_uploads.popitem(last=False)
+
+
+def forget_stored_uploads(bucket_name, names):
+    """Drop removed objects from the dedup cache so they are uploaded again"""
+    with _stored_uploads_lock:
+        for name in names:
+            _stored_uploads.pop((bucket_name, name), None)
+
+
+def reclaim_stored_upload(bucket_name, name):
+    """A reused object must not be deleted: cancel any pending deletion of it"""
+    try:
+        storage_cleanup.cancel(bucket_name, [name])
+    except Exception:
+        # drain_once still re-checks receipt references before removing
+        logger.exception('Cancelling pending deletion of %s failed', name)
+
+
+def save_uploaded_file(file_storage, bucket_name):
+    """Store an uploaded file under its content hash; returns (filename, created).
+
+    The body is streamed from the request spool, never read whole. A file
+    already in the bucket is not uploaded again and created is False, so
+    callers must not remove it on rollback: other rows may reference it.
+    """
+    if not file_storage or file_storage.filename == '':
+        raise ValueError("No file provided")
+    filename = secure_filename(file_storage.filename)
+    if not allowed_file(filename):
+        raise ValueError("File type not allowed")
+    
+    ext = filename.rsplit('.', 1)[-1].lower()
+    stream = file_storage.stream
+    unique = f"{upload_digest(stream)}.{ext}"
+    
+    with _stored_uploads_lock:
+        expires = _stored_uploads.get((bucket_name, unique))
+        cached = expires is not None and expires > time.monotonic()
+        if cached:
+            _stored_uploads.move_to_end((bucket_name, unique))
+    if cached:
+        reclaim_stored_upload(bucket_name, unique)
+        logger.info('♻️  Duplicate upload reused: %s', unique)
+        return unique, False
+    
+    file_options = {'content-type': file_storage.mimetype or 'application/octet-stream', 'upsert': 'false'}
     try:
         sb = get_supabase()
-        response = sb.storage.from_(SUPABASE_RECEIPT_BUCKET).create_signed_url(filename, expires_seconds)
-        return response.get('signedURL')
+        bucket = sb.storage.from_(bucket_name)
+        path = getattr(stream, 'path', None)
+        with CallTimer(STORAGE_DURATION, STORAGE_ERRORS, 'upload'):
+            if path:
+                # storage3 streams an open file as the multipart body in chunks
+                with open(path, 'rb') as body:
+                    bucket.upload(unique, body, file_options)
+            else:
+                stream.seek(0)
+                bucket.upload(unique, stream.read(), file_options)
+    except Exception as e:
+        if not is_duplicate_upload_error(e):
+            logger.exception(f"Failed to upload file: {e}")
+            raise
+        remember_stored_upload(bucket_name, unique)
+        reclaim_stored_upload(bucket_name, unique)
+        logger.info('♻️  Duplicate upload reused: %s', unique)
+        return unique, False
+    
+    remember_stored_upload(bucket_name, unique)
+    logger.info('✅ File uploaded: %s', unique)
+    return unique, True
+
+
+# ---------- Profile Picture Processing ----------
+
+def get_image_pool():
+    """Get or create the image processing process pool"""
+    global _image_pool
+    with _image_pool_lock:
+        if _image_pool is None:
+            # spawn: never fork a threaded server process
+            import multiprocessing
+            from concurrent.futures import ProcessPoolExecutor
+            _image_pool = ProcessPoolExecutor(
+                max_workers=IMAGE_WORKERS,
+                mp_context=multiprocessing.get_context('spawn')
+            )
+        return _image_pool
+
+
+def run_image_task(func, *args, slots=_image_slots):
+    """Run func in the image pool with bounded admission against slots.
+
+    func must live in imaging.py, the only module the pool workers import.
+    """
+    global _image_pool
+    from concurrent.futures import TimeoutError as FutureTimeoutError
+    from concurrent.futures.process import BrokenProcessPool
+    if not slots.acquire(timeout=IMAGE_QUEUE_TIMEOUT):
+        raise TimeoutError('Image workers busy')
+    try:
+        try:
+            future = get_image_pool().submit(func, *args)
+        except BaseException:
+            slots.release()
+            raise
+        # The slot is freed when the task ends, not when the caller stops
+        # waiting: a render that timed out still occupies a pool worker
+        future.add_done_callback(lambda _: slots.release())
+        try:
+            return future.result(timeout=IMAGE_TASK_TIMEOUT)
+        except FutureTimeoutError:
+            future.cancel()  # dropped if it never started
+            raise
+    except BrokenProcessPool:
+        with _image_pool_lock:
+            _image_pool = None
+        raise
+
+
+def process_profile_image(data):
+    """Render profile picture sizes in the pool"""
+    return run_image_task(render_profile_images, data, PROFILE_PICTURE_SIZES, IMAGE_MAX_PIXELS)
+
+
+def profile_picture_filename(base_filename, size):
+    """Storage name of one profile picture size; the largest keeps the base name"""
+    if size == max(PROFILE_PICTURE_SIZES):
+        return base_filename
+    stem, ext = os.path.splitext(base_filename)
+    return f"{stem}_{size}{ext}"
+
+
+def profile_picture_urls(picture_url):
+    """Map each size to its URL, derived from the stored profile_picture URL"""
+    if not picture_url:
+        return {}
+    base, _, query = picture_url.partition('?')
+    prefix, _, filename = base.rpartition('/')
+    suffix = f'?{query}' if query else ''
+    return {
+        str(size): f"{prefix}/{profile_picture_filename(filename, size)}{suffix}"
+        for size in PROFILE_PICTURE_SIZES
+    }
+
+
+def profile_picture_storage_names(picture_url):
+    """Storage names of every size of a stored profile picture"""
+    return [url.split('?')[0].split('/')[-1] for url in profile_picture_urls(picture_url).values()]
+
+
+def get_receipt_url(filename, expires_seconds=RECEIPT_URL_TTL):
+    """Get signed URL for file in receipt bucket"""
+    if not filename:
+        return None
+    return get_receipt_urls([filename], expires_seconds).get(filename)
+
+
+def cached_receipt_urls(filenames, expires_seconds=RECEIPT_URL_TTL):
+    """Split receipt files into ({filename: cached URL}, [files to sign])"""
+    now = time.monotonic()
+    urls = {}
+    missing = []
+    with _receipt_url_lock:
+        for filename in dict.fromkeys(f for f in filenames if f):
+            entry = _receipt_url_cache.get((filename, expires_seconds))
+            if entry and entry[1] > now:
+                _receipt_url_cache.move_to_end((filename, expires_seconds))
+                urls[filename] = entry[0]
+            else:
+                missing.append(filename)
+    return urls, missing
+
+
+def signed_url_items(items):
+    """{path: url} from a create_signed_urls result, skipping failed entries"""
+    signed = {}
+    for item in items or []:
+        url = item.get('signedURL') or item.get('signedUrl')
+        if url and not item.get('error'):
+            signed[item.get('path')] = url
+    return signed
+
+
+def remember_receipt_urls(signed, expires_seconds=RECEIPT_URL_TTL):
+    """Cache freshly signed URLs until shortly before the storage-side expiry"""
+    valid_until = time.monotonic() + max(expires_seconds - RECEIPT_URL_REFRESH_MARGIN, 0)
+    with _receipt_url_lock:
+        for filename, url in signed.items():
+            _receipt_url_cache[(filename, expires_seconds)] = (url, valid_until)
+            _receipt_url_cache.move_to_end((filename, expires_seconds))
+        while len(_receipt_url_cache) > RECEIPT_URL_CACHE_MAX:
+            _receipt_url_cache.popitem(last=False)
+
+
+def get_receipt_urls(filenames, expires_seconds=RECEIPT_URL_TTL):
+    """Get signed URLs for many receipt files, signing cache misses in batches"""
+    urls, missing = cached_receipt_urls(filenames, expires_seconds)
+    if not missing:
+        return urls
+    
+    signed = {}
+    try:
+        bucket = get_supabase().storage.from_(SUPABASE_RECEIPT_BUCKET)
+        for i in range(0, len(missing), RECEIPT_URL_BATCH_SIZE):
+            chunk = missing[i:i + RECEIPT_URL_BATCH_SIZE]
+            with CallTimer(STORAGE_DURATION, STORAGE_ERRORS, 'create_signed_urls'):
+                signed.update(signed_url_items(bucket.create_signed_urls(chunk, expires_seconds)))
     except Exception as e:
-        logger.warning(f"Failed to get signed URL: {e}")
+        logger.warning(f"Failed to get signed URLs: {e}")
+    
+    remember_receipt_urls(signed, expires_seconds)
+    urls.update(signed)
+    return urls
+
+
+# ---------- Receipt Image Processing ----------
+
+def receipt_normalized_names(filename):
+    """(image, preview) storage names for a stored receipt image, or None if it is not one"""
+    if not RECEIPT_NORMALIZE or not filename:
+        return None
+    stem, ext = os.path.splitext(filename)
+    if ext.lstrip('.').lower() not in RECEIPT_IMAGE_EXTENSIONS or len(stem) != 64:
+        return None
+    target = 'jpg' if RECEIPT_IMAGE_FORMAT == 'jpeg' else RECEIPT_IMAGE_FORMAT
+    return f"{stem}.{target}", f"{stem}_preview.{target}"
+
+
+class ReceiptProcessor:
+    """Bounded queue of stored receipts to normalize in the background.
+
+    Workers render each receipt in the image pool and upload the preview.
+    When the re-encode is smaller it is stored under the name of its own
+    format, the transactions are repointed at it and the original is queued
+    for deletion. receipt_preview is set on the rows only once the preview
+    is stored, so clients never see a preview that does not exist.
+    """
+
+    def __init__(self, workers=RECEIPT_WORKERS, maxsize=RECEIPT_QUEUE_SIZE,
+                 max_attempts=RECEIPT_MAX_ATTEMPTS, backoff=RECEIPT_RETRY_BACKOFF):
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self._queue = queue.Queue(maxsize=maxsize)
+        self._lock = threading.Lock()
+        self._workers = WorkerThreads(self._run, 'receipt-processor', workers)
+        self.processed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+
+    def submit(self, bucket_name, filename, source):
+        """Queue a stored receipt; source is a path this processor then owns, or bytes"""
+        self._workers.start()
+        try:
+            self._queue.put_nowait((bucket_name, filename, source))
+            return True
+        except queue.Full:
+            with self._lock:
+                self.rejected += 1
+            self._discard(source)
+            logger.warning('Receipt queue full, %s stays unprocessed', filename)
+            return False
+
+    def stats(self):
+        with self._lock:
+            return {
+                'queued': self._queue.qsize(),
+                'processed': self.processed,
+                'failed': self.failed,
+                'rejected': self.rejected,
+                'bytes_in': self.bytes_in,
+                'bytes_out': self.bytes_out,
+                'bytes_saved': self.bytes_in - self.bytes_out,
+            }
+
+    def join(self):
+        """Block until every queued receipt has been handled"""
+        self._queue.join()
+
+    def close(self):
+        """Stop the workers after the queue drains"""
+        self._workers.stop_queue(self._queue, IMAGE_TASK_TIMEOUT)
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                self._queue.task_done()
+                return
+            try:
+                self._process(*item)
+            finally:
+                self._discard(item[2])
+                self._queue.task_done()
+
+    def _process(self, bucket_name, filename, source):
+        from PIL import UnidentifiedImageError
+        image_name, preview_name = receipt_normalized_names(filename)
+        content_type = 'image/jpeg' if RECEIPT_IMAGE_FORMAT == 'jpeg' else f'image/{RECEIPT_IMAGE_FORMAT}'
+        original_size = os.path.getsize(source) if isinstance(source, str) else len(source)
+        start = time.perf_counter()
+        for attempt in range(1, self.max_attempts + 1):
+            try:
+                # Own admission budget: a backlog of receipts never turns
+                # profile uploads away with 503
+                image, preview = run_image_task(
+                    normalize_receipt_image, source, RECEIPT_IMAGE_FORMAT, RECEIPT_IMAGE_QUALITY,
+                    RECEIPT_MAX_EDGE, RECEIPT_PREVIEW_EDGE, IMAGE_MAX_PIXELS, slots=_receipt_image_slots
+                )
+                sb = get_supabase()
+                bucket = sb.storage.from_(bucket_name)
+                with CallTimer(STORAGE_DURATION, STORAGE_ERRORS, 'upload'):
+                    bucket.upload(preview_name, preview, {'content-type': content_type, 'upsert': 'true'})
+                patch = {'receipt_preview': preview_name}
+                stored_name, stored_size = filename, original_size
+                if len(image) < original_size:
+                    with CallTimer(STORAGE_DURATION, STORAGE_ERRORS, 'upload'):
+                        bucket.upload(image_name, image, {'content-type': content_type, 'upsert': 'true'})
+                    patch['receipt'] = stored_name = image_name
+                    stored_size = len(image)
+                success, _, error = safe_execute(
+                    sb.table('budget_transactions').update(patch).eq('receipt', filename),
+                    'record_normalized_receipt'
+                )
+                if not success:
+                    raise RuntimeError(error)
+                break
+            except (UnidentifiedImageError, ValueError) as e:
+                # Not a decodable image: the original stays as uploaded
+                self._failed(filename, start, e)
+                return
+            except Exception as e:
+                if attempt == self.max_attempts:
+                    self._failed(filename, start, e)
+                    return
+                logger.warning('Receipt %s attempt %d failed: %s', filename, attempt, e)
+                time.sleep(self.backoff * 2 ** (attempt - 1))
+        
+        if stored_name != filename:
+            # Rows that reused the original since the update keep it alive:
+            # the cleanup queue re-checks references before removing
+            queue_storage_deletion(bucket_name, [filename])
+        
+        elapsed = time.perf_counter() - start
+        RECEIPT_DURATION.observe(elapsed, 'processed')
+        RECEIPT_BYTES.inc('original', amount=original_size)
+        RECEIPT_BYTES.inc('stored', amount=stored_size)
+        with self._lock:
+            self.processed += 1
+            self.bytes_in += original_size
+            self.bytes_out += stored_size
+        logger.info('🧾 Receipt %s normalized to %s: %d -> %d bytes (%d saved, preview %d) in %.0f ms',
+                    filename, stored_name, original_size, stored_size, original_size - stored_size,
+                    len(preview), elapsed * 1000)
+
+    def _failed(self, filename, start, error):
+        RECEIPT_DURATION.observe(time.perf_counter() - start, 'failed')
+        with self._lock:
+            self.failed += 1
+        logger.error('❌ Receipt %s not normalized: %s', filename, error)
+
+    @staticmethod
+    def _discard(source):
+        if isinstance(source, str):
+            try:
+                os.remove(source)
+            except OSError:
+                pass
+
+
+receipt_processor = ReceiptProcessor()
+atexit.register(receipt_processor.close)
+
+
+def queue_receipt_processing(filename, file_storage):
+    """Hand a just-stored receipt image to the background processor"""
+    if not receipt_normalized_names(filename):
+        return False
+    stream = file_storage.stream
+    if getattr(stream, 'path', None):
+        source = stream.keep()
+    else:
+        stream.seek(0)
+        source = stream.read()
+    return receipt_processor.submit(SUPABASE_RECEIPT_BUCKET, filename, source)
+
+
+# ---------- Storage Cleanup ----------
+
+class StorageCleanupQueue:
+    """Durable queue of storage objects to delete, drained in batches.
+
+    Requests only insert rows into a local SQLite file. A background
+    worker per process claims due rows under a lease, removes them with one
+    remove() call per bucket and batch, and reschedules failures with
+    exponential backoff. The same worker runs the orphan reconcile every
+    STORAGE_RECONCILE_INTERVAL seconds, once per host.
+    """
+
+    def __init__(self, path=STORAGE_CLEANUP_DB_PATH, batch_size=STORAGE_CLEANUP_BATCH,
+                 interval=STORAGE_CLEANUP_INTERVAL, reconcile_interval=STORAGE_RECONCILE_INTERVAL):
+        self.path = path
+        self.batch_size = batch_size
+        self.interval = interval
+        self.reconcile_interval = reconcile_interval
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._worker = WorkerThreads(self._run, 'storage-cleanup', on_start=self._stop.clear)
+        self.removed = 0
+        self.failed = 0
+        self.batches = 0
+
+    SCHEMA = (
+        'CREATE TABLE IF NOT EXISTS storage_deletions ('
+        'bucket TEXT NOT NULL, path TEXT NOT NULL, attempts INTEGER NOT NULL DEFAULT 0, '
+        'not_before REAL NOT NULL, last_error TEXT, PRIMARY KEY (bucket, path))',
+        'CREATE INDEX IF NOT EXISTS storage_deletions_due ON storage_deletions (not_before)',
+        'CREATE TABLE IF NOT EXISTS storage_cleanup_meta (key TEXT PRIMARY KEY, value REAL)',
+    )
+
+    def _connect(self):
+        return sqlite_connection(self.path, self._local, self.SCHEMA)
+
+    def start(self):
+        self._worker.start()
+
+    def enqueue(self, bucket_name, paths):
+        """Schedule objects for deletion; cheap enough for the request path"""
+        paths = [p for p in paths if p]
+        if not paths:
+            return 0
+        now = time.time()
+        conn = self._connect()
+        conn.executemany(
+            'INSERT OR IGNORE INTO storage_deletions (bucket, path, not_before) VALUES (?, ?, ?)',
+            [(bucket_name, path, now) for path in paths]
+        )
+        self.start()
+        self._wake.set()
+        return len(paths)
+
+    def cancel(self, bucket_name, paths):
+        """Drop pending deletions of objects that are in use again"""
+        conn = self._connect()
+        conn.executemany('DELETE FROM storage_deletions WHERE bucket = ? AND path = ?',
+                         [(bucket_name, path) for path in paths])
+
+    def _still_pending(self, conn, bucket_name, items):
+        """Claimed items whose rows were not cancelled in the meantime"""
+        placeholders = ','.join('?' * len(items))
+        pending = {row[0] for row in conn.execute(
+            f'SELECT path FROM storage_deletions WHERE bucket = ? AND path IN ({placeholders})',
+            [bucket_name] + [path for path, _ in items]
+        )}
+        return [item for item in items if item[0] in pending]
+
+    def _reschedule(self, conn, bucket_name, items, error):
+        now = time.time()
+        conn.executemany(
+            'UPDATE storage_deletions SET attempts = ?, not_before = ?, last_error = ? '
+            'WHERE bucket = ? AND path = ?',
+            [(attempts + 1, now + min(STORAGE_CLEANUP_BACKOFF * 2 ** attempts, STORAGE_CLEANUP_MAX_BACKOFF),
+              str(error)[:500], bucket_name, path) for path, attempts in items]
+        )
+        with self._lock:
+            self.failed += len(items)
+        logger.warning('Storage cleanup of %d objects in %s failed: %s', len(items), bucket_name, error)
+
+    def _claim(self):
+        """Take up to batch_size due rows and lease them to this worker"""
+        now = time.time()
+        conn = self._connect()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            rows = conn.execute(
+                'SELECT bucket, path, attempts FROM storage_deletions WHERE not_before <= ? '
+                'ORDER BY not_before LIMIT ?', (now, self.batch_size)
+            ).fetchall()
+            conn.executemany(
+                'UPDATE storage_deletions SET not_before = ? WHERE bucket = ? AND path = ?',
+                [(now + STORAGE_CLEANUP_LEASE, bucket, path) for bucket, path, _ in rows]
+            )
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        return rows
+
+    def drain_once(self):
+        """Handle one claimed batch; returns (rows claimed, objects removed)"""
+        rows = self._claim()
+        by_bucket = {}
+        for bucket_name, path, attempts in rows:
+            by_bucket.setdefault(bucket_name, []).append((path, attempts))
+        
+        conn = self._connect()
+        removed = 0
+        for bucket_name, items in by_bucket.items():
+            if bucket_name == SUPABASE_RECEIPT_BUCKET:
+                # Receipts are content-addressed, so a row written since the
+                # object was queued may be using it again
+                used = referenced_receipt_names([path for path, _ in items])
+                if used is None:
+                    self._reschedule(conn, bucket_name, items, 'reference check failed')
+                    continue
+                if used:
+                    self.cancel(bucket_name, used)
+                    logger.info('Storage cleanup kept %d receipts that are referenced again', len(used))
+                    items = [item for item in items if item[0] not in used]
+            items = self._still_pending(conn, bucket_name, items) if items else []
+            if not items:
+                continue
+            paths = [path for path, _ in items]
+            try:
+                with CallTimer(STORAGE_DURATION, STORAGE_ERRORS, 'remove'):
+                    get_supabase().storage.from_(bucket_name).remove(paths)
+            except Exception as e:
+                self._reschedule(conn, bucket_name, items, e)
+                continue
+            conn.executemany('DELETE FROM storage_deletions WHERE bucket = ? AND path = ?',
+                             [(bucket_name, path) for path in paths])
+            forget_stored_uploads(bucket_name, paths)
+            removed += len(paths)
+        
+        if rows:
+            with self._lock:
+                self.batches += 1
+                self.removed += removed
+        return len(rows), removed
+
+    def drain(self):
+        """Remove everything currently due (CLI, tests and shutdown)"""
+        total = 0
+        while True:
+            claimed, removed = self.drain_once()
+            total += removed
+            if not claimed:
+                return total
+
+    def _claim_reconcile(self):
+        """True for the one process per host whose turn it is to reconcile"""
+        now = time.time()
+        conn = self._connect()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            row = conn.execute("SELECT value FROM storage_cleanup_meta WHERE key = 'last_reconcile'").fetchone()
+            due = row is None or now - row[0] >= self.reconcile_interval
+            if due:
+                conn.execute("INSERT OR REPLACE INTO storage_cleanup_meta (key, value) VALUES ('last_reconcile', ?)",
+                             (now,))
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        return due
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            try:
+                while self.drain_once()[0] == self.batch_size:
+                    pass
+                if self.reconcile_interval and self._claim_reconcile():
+                    reconcile_storage_orphans()
+            except Exception:
+                logger.exception('Storage cleanup error')
+
+    def stats(self):
+        try:
+            pending, retrying, oldest = self._connect().execute(
+                'SELECT COUNT(*), SUM(attempts > 0), MIN(not_before) FROM storage_deletions'
+            ).fetchone()
+        except Exception:
+            pending = retrying = oldest = None
+        with self._lock:
+            return {
+                'pending': pending,
+                'retrying': retrying or 0,
+                'overdue_seconds': round(max(0.0, time.time() - oldest), 1) if oldest else 0.0,
+                'removed': self.removed,
+                'failed': self.failed,
+                'batches': self.batches,
+            }
+
+    def close(self):
+        """Stop the worker; pending rows stay in the file for the next start"""
+        self._stop.set()
+        self._wake.set()
+        self._worker.join(SUPABASE_TIMEOUT)
+
+
+storage_cleanup = StorageCleanupQueue()
+atexit.register(storage_cleanup.close)
+
+
+def queue_storage_deletion(bucket_name, names):
+    """Queue objects for deletion without failing the caller.
+
+    Objects that cannot even be queued are left for the orphan reconcile.
+    """
+    try:
+        storage_cleanup.enqueue(bucket_name, names)
+    except Exception:
+        logger.exception('Queueing %s from %s for deletion failed', names, bucket_name)
+
+
+def list_bucket_objects(bucket_name):
+    """Yield (name, created_at) for every file at the top level of a bucket"""
+    bucket = get_supabase().storage.from_(bucket_name)
+    offset = 0
+    while True:
+        with CallTimer(STORAGE_DURATION, STORAGE_ERRORS, 'list'):
+            items = bucket.list('', {'limit': STORAGE_LIST_PAGE_SIZE, 'offset': offset,
+                                     'sortBy': {'column': 'name', 'order': 'asc'}})
+        for item in items:
+            # Folders are listed without an id
+            if item.get('id') is not None:
+                yield item['name'], item.get('created_at')
+        if len(items) < STORAGE_LIST_PAGE_SIZE:
+            return
+        offset += STORAGE_LIST_PAGE_SIZE
+
+
+def referenced_storage_names():
+    """{bucket: names} referenced by users and budget_transactions, or None on a failed read"""
+    sb = get_supabase()
+    referenced = {SUPABASE_PROFILE_BUCKET: set(), SUPABASE_RECEIPT_BUCKET: set()}
+    # (table, columns read, column that must be set, bucket, row -> object names)
+    sources = (
+        ('users', 'id,profile_picture', 'profile_picture', SUPABASE_PROFILE_BUCKET,
+         lambda row: profile_picture_storage_names(row['profile_picture'])),
+        ('budget_transactions', 'id,receipt,receipt_preview', 'receipt', SUPABASE_RECEIPT_BUCKET,
+         lambda row: [row['receipt'], row.get('receipt_preview')]),
+    )
+    for table_name, columns, required, bucket_name, names in sources:
+        start = 0
+        while True:
+            success, rows, _ = safe_execute(
+                sb.table(table_name).select(columns).not_.is_(required, 'null')
+                .order('id').range(start, start + STORAGE_LIST_PAGE_SIZE - 1),
+                f'reconcile_{table_name}'
+            )
+            if not success:
+                return None
+            for row in rows or []:
+                referenced[bucket_name].update(n for n in names(row) if n)
+            if len(rows or []) < STORAGE_LIST_PAGE_SIZE:
+                break
+            start += STORAGE_LIST_PAGE_SIZE
+    return referenced
+
+
+def referenced_receipt_names(names):
+    """Those of names a budget_transactions row uses as receipt or preview, or None on a failed read"""
+    sb = get_supabase()
+    used = set()
+    for column in ('receipt', 'receipt_preview'):
+        success, rows, _ = safe_execute(
+            sb.table('budget_transactions').select(column).in_(column, list(names)),
+            f'check_{column}_references'
+        )
+        if not success:
+            return None
+        used.update(row[column] for row in rows or [])
+    return used
+
+
+def reconcile_storage_orphans(dry_run=False, min_age=STORAGE_ORPHAN_MIN_AGE):
+    """Queue deletion of bucket objects no row references.
+
+    Returns {bucket: orphan count}, or None if the check could not run.
+    Objects younger than min_age are skipped: their row may not be written yet.
+    A receipt referenced again after this read is spared by drain_once,
+    which re-checks receipt references right before removing.
+    """
+    referenced = referenced_storage_names()
+    if referenced is None:
         return None
+    cutoff = datetime.now(timezone.utc) - timedelta(seconds=min_age)
+    found = {}
+    for bucket_name, names in referenced.items():
+        orphans = []
+        try:
+            for name, created_at in list_bucket_objects(bucket_name):
+                if name in names:
+                    continue
+                if created_at and datetime.fromisoformat(created_at.replace('Z', '+00:00')) > cutoff:
+                    continue
+                orphans.append(name)
+        except Exception:
+            logger.exception('Listing %s failed', bucket_name)
+            return None
+        found[bucket_name] = len(orphans)
+        if orphans and not dry_run:
+            storage_cleanup.enqueue(bucket_name, orphans)
+    logger.info('🧹 Storage reconcile found orphans %s (dry_run=%s)', found, dry_run)
+    return found
 
 
 # ================================================================================
 # SECTION 7: EMAIL FUNCTIONS
 # ================================================================================
 
-def send_via_smtp(recipient_email, subject, html):
-    """Send email via SMTP"""
-    from_addr = SMTP_EMAIL or 'no-reply@example.com'
+def build_email(recipient_email, subject, html):
+    """Build an HTML email message"""
+    from email.mime.text import MIMEText
     msg = MIMEText(html, _subtype='html')
     msg['Subject'] = subject
-    msg['From'] = from_addr
+    msg['From'] = SMTP_EMAIL or 'no-reply@example.com'
     msg['To'] = recipient_email
+    return msg
+
+
+def smtp_configured():
+    """Check whether SMTP credentials are set"""
+    return bool(SMTP_EMAIL and SMTP_PASS)
+
+
+def open_smtp_connection():
+    """Open an authenticated SMTP connection"""
+    import smtplib
+    server = smtplib.SMTP(SMTP_SERVER, SMTP_PORT, timeout=SMTP_TIMEOUT)
+    server.ehlo()
+    if SMTP_STARTTLS:
+        server.starttls()
+        server.ehlo()
+    server.login(SMTP_EMAIL, SMTP_PASS)
+    return server
+
 
-    if not SMTP_EMAIL or not SMTP_PASS:
+def send_via_smtp(recipient_email, subject, html):
+    """Send email via SMTP"""
+    msg = build_email(recipient_email, subject, html)
+
+    if not smtp_configured():
         logger.warning('No SMTP credentials configured')
         return False
 
     try:
-        server = smtplib.SMTP(SMTP_SERVER, SMTP_PORT, timeout=15)
-        server.ehlo()
-        server.starttls()
-        server.ehlo()
-        server.login(SMTP_EMAIL, SMTP_PASS)
-        server.sendmail(from_addr, [recipient_email], msg.as_string())
+        with CallTimer(SMTP_DURATION, SMTP_ERRORS, 'connect'):
+            server = open_smtp_connection()
+        with CallTimer(SMTP_DURATION, SMTP_ERRORS, 'send'):
+            server.sendmail(msg['From'], [recipient_email], msg.as_string())
         server.quit()
         logger.info(f'✅ Email sent to {recipient_email}')
         return True
@@ -329,8 +2299,212 @@ def send_via_smtp(recipient_email, subject, html):
         return False
 
 
-def send_otp_email(recipient_email, code):
-    """Send OTP verification email"""
+# ---------- Email Outbox ----------
+
+class DeliveryStatusStore:
+    """Email delivery statuses in a SQLite file shared by workers on one host.
+
+    The worker that queued a message is rarely the one that answers the
+    client's status poll, so statuses cannot live in process memory.
+    Entries expire EMAIL_STATUS_TTL seconds after their last update.
+    """
+
+    FIELDS = ('attempts', 'error', 'sent_at')
+
+    def __init__(self, path=EMAIL_STATUS_DB_PATH, ttl=EMAIL_STATUS_TTL, sweep_interval=RATE_LIMIT_SWEEP_INTERVAL):
+        self.path = path
+        self.ttl = ttl
+        self._sweep_interval = sweep_interval
+        self._next_sweep = 0.0
+        self._local = threading.local()
+
+    SCHEMA = (
+        'CREATE TABLE IF NOT EXISTS email_deliveries (id TEXT PRIMARY KEY, status TEXT NOT NULL, '
+        'attempts INTEGER, error TEXT, sent_at TEXT, updated_at REAL NOT NULL)',
+    )
+
+    def _connect(self):
+        return sqlite_connection(self.path, self._local, self.SCHEMA)
+
+    def set(self, message_id, status, **fields):
+        """Record a status; fields not given keep their previous value"""
+        now = time.time()
+        values = [fields.get(name) for name in self.FIELDS]
+        conn = self._connect()
+        if now >= self._next_sweep:
+            self._next_sweep = now + self._sweep_interval
+            conn.execute('DELETE FROM email_deliveries WHERE updated_at < ?', (now - self.ttl,))
+        conn.execute(
+            'INSERT INTO email_deliveries (id, status, attempts, error, sent_at, updated_at) '
+            'VALUES (?, ?, ?, ?, ?, ?) ON CONFLICT (id) DO UPDATE SET status = excluded.status, '
+            'attempts = coalesce(excluded.attempts, attempts), error = coalesce(excluded.error, error), '
+            'sent_at = coalesce(excluded.sent_at, sent_at), updated_at = excluded.updated_at',
+            (message_id, status, *values, now)
+        )
+
+    def get(self, message_id):
+        """Status dict for a message id, or None if unknown or expired"""
+        row = self._connect().execute(
+            'SELECT status, attempts, error, sent_at FROM email_deliveries WHERE id = ? AND updated_at >= ?',
+            (message_id, time.time() - self.ttl)
+        ).fetchone()
+        if row is None:
+            return None
+        entry = {'id': message_id, 'status': row[0]}
+        entry.update((name, value) for name, value in zip(self.FIELDS, row[1:]) if value is not None)
+        return entry
+
+
+class EmailOutbox:
+    """Bounded email queue drained by background workers.
+
+    Each worker keeps its own authenticated SMTP session open between
+    messages and closes it after SMTP_IDLE_TIMEOUT seconds without work.
+    Failed sends are retried with exponential backoff, reconnecting first.
+    Delivery statuses go to a DeliveryStatusStore, so /api/2fa/status
+    answers from whichever worker the poll lands on.
+    """
+
+    def __init__(self, workers=EMAIL_WORKERS, maxsize=EMAIL_OUTBOX_SIZE,
+                 max_attempts=EMAIL_MAX_ATTEMPTS, backoff=EMAIL_RETRY_BACKOFF,
+                 connect=open_smtp_connection, statuses=None):
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.connect = connect
+        self.statuses = statuses or DeliveryStatusStore()
+        self._queue = queue.Queue(maxsize=maxsize)
+        self._lock = threading.Lock()
+        self._workers = WorkerThreads(self._run, 'email-outbox', workers, on_start=self._started)
+        self.sent = 0
+        self.failed = 0
+        self.connections = 0
+        self.started_at = None
+
+    def _started(self):
+        self.started_at = time.monotonic()
+
+    def _set_status(self, message_id, status, **fields):
+        # Delivery goes ahead even when its status cannot be recorded
+        try:
+            self.statuses.set(message_id, status, **fields)
+        except Exception as e:
+            logger.warning('Recording email status %s for %s failed: %s', status, message_id, e)
+
+    def submit(self, recipient_email, subject, html, on_failure=None):
+        """Queue a message; returns its id, or None if the outbox is full"""
+        self._workers.start()
+        message_id = uuid.uuid4().hex
+        self._set_status(message_id, 'queued', attempts=0)
+        try:
+            self._queue.put_nowait((message_id, recipient_email, subject, html, on_failure))
+        except queue.Full:
+            self._set_status(message_id, 'rejected')
+            logger.warning('Email outbox full, rejecting message')
+            return None
+        return message_id
+
+    def status(self, message_id):
+        """Delivery status for a message id, or None if unknown"""
+        return self.statuses.get(message_id)
+
+    def stats(self):
+        """Counters and send throughput since the workers started"""
+        elapsed = time.monotonic() - self.started_at if self.started_at else 0
+        return {
+            'queued': self._queue.qsize(),
+            'sent': self.sent,
+            'failed': self.failed,
+            'connections': self.connections,
+            'messages_per_second': round(self.sent / elapsed, 2) if elapsed else 0.0,
+        }
+
+    def join(self):
+        """Block until every queued message has been handled"""
+        self._queue.join()
+
+    def close(self):
+        """Stop the workers after the queue drains"""
+        self._workers.stop_queue(self._queue, SMTP_TIMEOUT)
+
+    def _run(self):
+        server = None
+        while True:
+            try:
+                item = self._queue.get(timeout=SMTP_IDLE_TIMEOUT)
+            except queue.Empty:
+                server = self._disconnect(server)
+                continue
+
+            if item is None:
+                self._disconnect(server)
+                self._queue.task_done()
+                return
+
+            try:
+                server = self._deliver(server, *item)
+            finally:
+                self._queue.task_done()
+
+    def _deliver(self, server, message_id, recipient_email, subject, html, on_failure):
+        msg = build_email(recipient_email, subject, html)
+        for attempt in range(1, self.max_attempts + 1):
+            self._set_status(message_id, 'sending', attempts=attempt)
+            try:
+                if server is None:
+                    with CallTimer(SMTP_DURATION, SMTP_ERRORS, 'connect'):
+                        server = self.connect()
+                    with self._lock:
+                        self.connections += 1
+                with CallTimer(SMTP_DURATION, SMTP_ERRORS, 'send'):
+                    server.sendmail(msg['From'], [recipient_email], msg.as_string())
+                with self._lock:
+                    self.sent += 1
+                self._set_status(message_id, 'sent', sent_at=datetime.now(timezone.utc).isoformat())
+                logger.info('✅ Email sent to %s', recipient_email)
+                return server
+            except Exception as e:
+                logger.warning(f'SMTP attempt {attempt} failed for {recipient_email}: {e}')
+                server = self._disconnect(server)
+                self._set_status(message_id, 'retrying', error=str(e))
+                if attempt < self.max_attempts:
+                    time.sleep(self.backoff * 2 ** (attempt - 1))
+
+        with self._lock:
+            self.failed += 1
+        self._set_status(message_id, 'failed')
+        logger.error(f'❌ Email to {recipient_email} failed after {self.max_attempts} attempts')
+        if on_failure:
+            try:
+                on_failure()
+            except Exception:
+                logger.exception('Email failure callback error')
+        return server
+
+    @staticmethod
+    def _disconnect(server):
+        if server is not None:
+            try:
+                server.quit()
+            except Exception:
+                pass
+        return None
+
+
+email_outbox = EmailOutbox()
+atexit.register(email_outbox.close)
+
+
+def queue_email(recipient_email, subject, html, on_failure=None):
+    """Queue an email for background delivery; returns message id or None"""
+    if not smtp_configured():
+        logger.warning('No SMTP credentials configured')
+        return None
+    return email_outbox.submit(recipient_email, subject, html, on_failure=on_failure)
+
+
+def send_otp_email(recipient_email, code, on_failure=None):
+    """Send OTP verification email (queued when EMAIL_ASYNC is on)"""
     subject = 'Your Likhayag Verification Code'
     html = f"""
     <html>
@@ -349,6 +2523,8 @@ def send_otp_email(recipient_email, code):
     </body>
     </html>
     """
+    if EMAIL_ASYNC:
+        return queue_email(recipient_email, subject, html, on_failure=on_failure)
     return send_via_smtp(recipient_email, subject, html)
 
 
@@ -357,7 +2533,7 @@ def send_otp_email(recipient_email, code):
 # ================================================================================
 
 def store_code(email, code, user_id=None):
-    """Store 2FA verification code"""
+    """Store 2FA verification code; returns the row id, or None on failure"""
     try:
         email = email.strip().lower()
         sb = get_supabase()
@@ -368,11 +2544,13 @@ def store_code(email, code, user_id=None):
             'code': code.upper(),
             'expires_at': expires.isoformat(),
         }
-        success, _, _ = safe_execute(sb.table('user_2fa_codes').insert(payload), 'store_code')
-        return bool(success)
+        success, data, _ = safe_execute(sb.table('user_2fa_codes').insert(payload), 'store_code')
+        if not success or not data:
+            return None
+        return data[0]['id']
     except Exception as e:
         logger.exception(f'store_code exception: {e}')
-        return False
+        return None
 
 
 def get_stored_code(email):
@@ -407,30 +2585,162 @@ def get_stored_code(email):
         return None
 
 
-def delete_stored_code(email):
-    """Delete all 2FA codes for email"""
+def delete_stored_code(email, code_id=None):
+    """Delete all 2FA codes for email, or only the one with code_id"""
     try:
         email = email.strip().lower()
         sb = get_supabase()
-        success, _, _ = safe_execute(sb.table('user_2fa_codes').delete().eq('email', email), 'delete_stored_code')
+        query = sb.table('user_2fa_codes').delete().eq('email', email)
+        if code_id is not None:
+            query = query.eq('id', code_id)
+        success, _, _ = safe_execute(query, 'delete_stored_code')
         return bool(success)
     except Exception:
         return False
 
 
+# ---------- Rate Limiting ----------
+#
+# GCRA (generic cell rate algorithm): `limit` events per `window` seconds,
+# tracked as a single "theoretical arrival time" (TAT) per key. A key whose
+# TAT is in the past carries no state and is dropped, so memory stays
+# proportional to the keys that are actually being limited.
+
+def gcra(tat, now, limit, window):
+    """Apply one GCRA hit; returns (allowed, new_tat, retry_after)"""
+    interval = window / limit
+    tat = max(tat or now, now)
+    new_tat = tat + interval
+    if new_tat - now > window:
+        return False, tat, new_tat - now - window
+    return True, new_tat, 0.0
+
+
+class MemoryRateLimitBackend:
+    """Per-process backend: one float per active key"""
+
+    def __init__(self, sweep_interval=RATE_LIMIT_SWEEP_INTERVAL):
+        self._tats = {}
+        self._lock = threading.Lock()
+        self._sweep_interval = sweep_interval
+        self._next_sweep = 0.0
+
+    def hit(self, key, limit, window):
+        now = time.time()
+        with self._lock:
+            if now >= self._next_sweep:
+                self._tats = {k: t for k, t in self._tats.items() if t > now}
+                self._next_sweep = now + self._sweep_interval
+            allowed, tat, retry_after = gcra(self._tats.get(key), now, limit, window)
+            self._tats[key] = tat
+        return allowed, retry_after
+
+
+class SQLiteRateLimitBackend:
+    """Cross-worker backend for a single host, stored in a SQLite file"""
+
+    SCHEMA = ('CREATE TABLE IF NOT EXISTS rate_limits (key TEXT PRIMARY KEY, tat REAL NOT NULL)',)
+
+    def __init__(self, path=RATE_LIMIT_SQLITE_PATH, sweep_interval=RATE_LIMIT_SWEEP_INTERVAL):
+        self.path = path
+        self._local = threading.local()
+        self._sweep_interval = sweep_interval
+        self._next_sweep = 0.0
+
+    def _connect(self):
+        return sqlite_connection(self.path, self._local, self.SCHEMA)
+
+    def hit(self, key, limit, window):
+        now = time.time()
+        conn = self._connect()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            if now >= self._next_sweep:
+                conn.execute('DELETE FROM rate_limits WHERE tat <= ?', (now,))
+                self._next_sweep = now + self._sweep_interval
+            row = conn.execute('SELECT tat FROM rate_limits WHERE key = ?', (key,)).fetchone()
+            allowed, tat, retry_after = gcra(row[0] if row else None, now, limit, window)
+            conn.execute('INSERT OR REPLACE INTO rate_limits (key, tat) VALUES (?, ?)', (key, tat))
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        return allowed, retry_after
+
+
+class RedisRateLimitBackend:
+    """Shared backend for any Redis-compatible server; keys expire at their TAT"""
+
+    SCRIPT = """
+    local now = tonumber(ARGV[1])
+    local interval = tonumber(ARGV[2])
+    local window = tonumber(ARGV[3])
+    local tat = tonumber(redis.call('GET', KEYS[1]) or now)
+    if tat < now then tat = now end
+    local new_tat = tat + interval
+    if new_tat - now > window then
+        return {0, tostring(new_tat - now - window)}
+    end
+    redis.call('SET', KEYS[1], tostring(new_tat), 'PX', math.ceil((new_tat - now) * 1000))
+    return {1, '0'}
+    """
+
+    def __init__(self, url=RATE_LIMIT_REDIS_URL, client=None, prefix='ratelimit:'):
+        if client is None:
+            import redis
+            client = redis.Redis.from_url(url)
+        self.client = client
+        self.prefix = prefix
+        self._script = client.register_script(self.SCRIPT)
+
+    def hit(self, key, limit, window):
+        allowed, retry_after = self._script(
+            keys=[self.prefix + key],
+            args=[time.time(), window / limit, window]
+        )
+        return bool(int(allowed)), float(retry_after)
+
+
+RATE_LIMIT_BACKENDS = {
+    'memory': MemoryRateLimitBackend,
+    'sqlite': SQLiteRateLimitBackend,
+    'redis': RedisRateLimitBackend,
+}
+
+
+class RateLimiter:
+    """Allow `limit` hits per `window` seconds for each key"""
+
+    def __init__(self, name, limit, window, backend=None):
+        self.name = name
+        self.limit = limit
+        self.window = window
+        self._backend = backend
+
+    @property
+    def backend(self):
+        # Created on first use so the app can import without the store
+        if self._backend is None:
+            self._backend = RATE_LIMIT_BACKENDS.get(RATE_LIMIT_BACKEND, MemoryRateLimitBackend)()
+        return self._backend
+
+    def hit(self, key):
+        """Record a hit; returns (allowed, retry_after_seconds)"""
+        try:
+            return self.backend.hit(f'{self.name}:{key}', self.limit, self.window)
+        except Exception as e:
+            # Fail open: a broken limiter store should not block logins
+            logger.exception(f'Rate limiter {self.name} error: {e}')
+            return True, 0.0
+
+
+send_code_limiter = RateLimiter('2fa_send', SEND_LIMIT_COUNT, SEND_LIMIT_WINDOW)
+
+
 def can_send_code(email):
     """Check rate limiting for 2FA"""
-    now_ts = int(datetime.now(timezone.utc).timestamp())
-    if not hasattr(app, '_send_hist'):
-        app._send_hist = {}
-    history = app._send_hist.get(email, [])
-    history = [t for t in history if now_ts - t < SEND_LIMIT_WINDOW]
-    if len(history) >= SEND_LIMIT_COUNT:
-        app._send_hist[email] = history
-        return False
-    history.append(now_ts)
-    app._send_hist[email] = history
-    return True
+    allowed, _ = send_code_limiter.hit(email)
+    return allowed
 
 
 # ================================================================================
@@ -444,7 +2754,7 @@ def api_login():
     email = (data.get('email') or '').strip().lower()
     password = data.get('password') or ''
 
-    logger.info(f'🔐 Login attempt: {email}')
+    auth_logger.info('🔐 Login attempt: %s', email)
 
     if not email or not password:
         return json_response(False, "Email and password required", 400)
@@ -459,13 +2769,16 @@ def api_login():
         
         user = user_data[0]
         
-        if not check_password_hash(user.get("password_hash", ""), password):
+        if not verify_password(user.get("password_hash", ""), password):
             return json_response(False, "Invalid credentials", 401)
+        
+        if password_needs_rehash(user.get("password_hash")):
+            rehash_password_later(user['id'], password)
 
         role = (user.get("role") or "user").strip().lower()
         token = create_token(user['id'], user['email'], role)
         
-        logger.info(f'✅ Login successful: {email}')
+        auth_logger.info('✅ Login successful: %s', email)
         return jsonify({
             "success": True,
             "message": "Login successful",
@@ -478,6 +2791,8 @@ def api_login():
             }
         }), 200
         
+    except TimeoutError:
+        return json_response(False, 'Server busy, try again', 503)
     except Exception as e:
         logger.exception('Login error')
         return json_response(False, "Server error", 500)
@@ -498,7 +2813,7 @@ def api_signup():
     code = (data.get('code') or '').strip().upper()
     role = (data.get('role') or 'user').strip().lower()
     
-    logger.info(f'📝 Signup attempt: {email}')
+    auth_logger.info('📝 Signup attempt: %s', email)
     
     # Validation
     if not all([email, password, first, last]):
@@ -552,7 +2867,7 @@ def api_signup():
                 'suffix': suffix or None,
                 'display_name': display_name.strip(),
                 'email': email,
-                'password_hash': generate_password_hash(password),
+                'password_hash': hash_password(password),
                 'two_fa_verified': True,
                 'role': role,
             }
@@ -568,7 +2883,7 @@ def api_signup():
             user = created_data[0]
             token = create_token(user['id'], user['email'], role)
             
-            logger.info(f'✅ Signup successful: {email}')
+            auth_logger.info('✅ Signup successful: %s', email)
             return jsonify({
                 "success": True,
                 "message": "Account created",
@@ -589,7 +2904,7 @@ def api_signup():
             'suffix': suffix or None,
             'display_name': display_name.strip(),
             'email': email,
-            'password_hash': generate_password_hash(password),
+            'password_hash': hash_password(password),
             'two_fa_verified': False,
             'role': role,
         }
@@ -609,6 +2924,8 @@ def api_signup():
             user_id=created_data[0].get('id') if created_data else None
         )
         
+    except TimeoutError:
+        return json_response(False, 'Server busy, try again', 503)
     except Exception as e:
         logger.exception('Signup error')
         return json_response(False, 'Server error', 500)
@@ -641,15 +2958,22 @@ def api_2fa_send():
     
     code = ''.join(random.choices(string.ascii_uppercase + string.digits, k=6))
     
-    if not store_code(email, code):
+    code_id = store_code(email, code)
+    if code_id is None:
         return json_response(False, 'Failed to store code', 500)
     
-    if not send_otp_email(email, code):
-        delete_stored_code(email)
+    # Only this message's code: a newer one may already be on its way
+    delivery = send_otp_email(email, code, on_failure=lambda: delete_stored_code(email, code_id))
+    if not delivery:
+        delete_stored_code(email, code_id)
         return json_response(False, 'Failed to send email', 500)
     
-    logger.info(f'📧 2FA sent to {email}')
-    return json_response(True, 'Code sent', 200)
+    if delivery is True:
+        auth_logger.info('📧 2FA sent to %s', email)
+        return json_response(True, 'Code sent', 200)
+    
+    auth_logger.info('📧 2FA queued for %s', email)
+    return json_response(True, 'Code sent', 200, delivery_id=delivery, delivery_status='queued')
 
 
 @app.route('/api/2fa/verify', methods=['POST'])
@@ -670,18 +2994,16 @@ def api_2fa_verify():
     
     try:
         sb = get_supabase()
-        query = sb.table('users').select('*').eq('email', email).limit(1)
-        success, user_data, _ = safe_execute(query, 'get_user')
+        user = get_user(email=email)
         
-        if not success or not user_data:
+        if not user:
             return json_response(False, 'User not found', 404)
         
-        user = user_data[0]
-        
         safe_execute(
             sb.table('users').update({'two_fa_verified': True}).eq('id', user['id']),
             'verify_user'
         )
+        invalidate_user(user['id'], email)
         
         return json_response(True, 'Email verified', 200)
         
@@ -696,6 +3018,15 @@ def api_2fa_resend():
     return api_2fa_send()
 
 
+@app.route('/api/2fa/status/<delivery_id>', methods=['GET'])
+def api_2fa_status(delivery_id):
+    """Delivery status of a queued 2FA email"""
+    status = email_outbox.status(delivery_id)
+    if not status:
+        return json_response(False, 'Unknown delivery id', 404)
+    return json_response(True, delivery=status)
+
+
 # ================================================================================
 # SECTION 11: PROFILE ENDPOINTS
 # ================================================================================
@@ -706,40 +3037,12 @@ def api_get_profile():
     """Get current user's profile"""
     try:
         user_id = request.user_data['user_id']
-        user = fetch_one('users', id=user_id)
+        user = get_user(user_id)
         
         if not user:
             return json_response(False, 'User not found', 404)
         
-        return jsonify({
-            'profile': {
-                'firstName': user.get('first_name') or '',
-                'lastName': user.get('last_name') or '',
-                'middleName': user.get('middle_name') or '',
-                'suffix': user.get('suffix') or '',
-                'email': user.get('email') or '',
-                'status': user.get('status') or 'Active Student',
-                'profilePicture': user.get('profile_picture')
-            },
-            'academic': {
-                'school': user.get('school') or '',
-                'strand': user.get('strand') or '',
-                'gradeLevel': user.get('grade_level') or '',
-                'schoolYear': user.get('school_year') or '',
-                'lrn': user.get('lrn') or '',
-                'adviserSection': user.get('adviser_section') or ''
-            },
-            'personal': {
-                'phone': user.get('phone') or '',
-                'dob': user.get('date_of_birth') or '',
-                'address': user.get('address') or '',
-                'emergency': user.get('emergency_contact') or ''
-            },
-            'settings': {
-                'emailNotifications': bool(user.get('email_notifications', True)),
-                'twoFactor': bool(user.get('two_factor_enabled', False))
-            }
-        }), 200
+        return jsonify(serialize_profile(user)), 200
         
     except Exception:
         logger.exception('Get profile error')
@@ -775,7 +3078,7 @@ def api_update_profile():
                     update_data[db_col] = fields[key]
             
             if any(k in fields for k in ['firstName', 'lastName', 'middleName', 'suffix']):
-                user = fetch_one('users', id=user_id)
+                user = get_user(user_id)
                 first = fields.get('firstName', user.get('first_name', ''))
                 middle = fields.get('middleName', user.get('middle_name', ''))
                 last = fields.get('lastName', user.get('last_name', ''))
@@ -826,6 +3129,7 @@ def api_update_profile():
             sb.table('users').update(update_data).eq('id', user_id),
             'update_profile'
         )
+        invalidate_user(user_id)
         
         if not success:
             return json_response(False, f'Failed: {error}', 500)
@@ -841,6 +3145,7 @@ def api_update_profile():
 @token_required
 def api_upload_profile_picture():
     """Upload profile picture"""
+    from PIL import Image, UnidentifiedImageError
     try:
         user_id = request.user_data['user_id']
         
@@ -852,65 +3157,96 @@ def api_upload_profile_picture():
         if not file or file.filename == '':
             return json_response(False, 'No file selected', 400)
         
-        image = Image.open(file)
-        
-        if image.mode in ('RGBA', 'LA', 'P'):
-            background = Image.new('RGB', image.size, (255, 255, 255))
-            if image.mode == 'P':
-                image = image.convert('RGBA')
-            if image.mode == 'RGBA':
-                background.paste(image, mask=image.split()[-1])
-            image = background
-        
-        image.thumbnail((800, 800), Image.Resampling.LANCZOS)
-        
-        output = io.BytesIO()
-        image.save(output, format='JPEG', quality=85)
-        output.seek(0)
+        try:
+            rendered = process_profile_image(file.read())
+        except (UnidentifiedImageError, ValueError, Image.DecompressionBombError):
+            return json_response(False, 'Invalid image', 400)
+        except TimeoutError:
+            return json_response(False, 'Server busy, try again', 503)
         
         unique_filename = f"profile_{user_id}_{uuid.uuid4().hex}.jpg"
+        filenames = [profile_picture_filename(unique_filename, size) for size in rendered]
         sb = get_supabase()
+        bucket = sb.storage.from_(SUPABASE_PROFILE_BUCKET)
         
-        user = fetch_one('users', id=user_id)
+        user = get_user(user_id)
         old_picture = user.get('profile_picture') if user else None
         
-        sb.storage.from_(SUPABASE_PROFILE_BUCKET).upload(
-            unique_filename, 
-            output.read(),
-            file_options={"content-type": "image/jpeg"}
-        )
+        for size, content in rendered.items():
+            with CallTimer(STORAGE_DURATION, STORAGE_ERRORS, 'upload'):
+                bucket.upload(
+                    profile_picture_filename(unique_filename, size),
+                    content,
+                    file_options={"content-type": "image/jpeg"}
+                )
         
-        picture_url = sb.storage.from_(SUPABASE_PROFILE_BUCKET).get_public_url(unique_filename)
+        picture_url = bucket.get_public_url(unique_filename)
         
         success, _, error = safe_execute(
             sb.table('users').update({'profile_picture': picture_url}).eq('id', user_id),
             'update_profile_picture'
         )
+        invalidate_user(user_id)
         
         if not success:
-            sb.storage.from_(SUPABASE_PROFILE_BUCKET).remove([unique_filename])
+            queue_storage_deletion(SUPABASE_PROFILE_BUCKET, filenames)
             return json_response(False, 'Failed to update profile', 500)
         
         if old_picture:
-            try:
-                old_filename = old_picture.split('/')[-1]
-                sb.storage.from_(SUPABASE_PROFILE_BUCKET).remove([old_filename])
-            except Exception:
-                pass
+            queue_storage_deletion(SUPABASE_PROFILE_BUCKET, profile_picture_storage_names(old_picture))
         
-        return json_response(True, 'Profile picture updated', 200, picture_url=picture_url)
+        return json_response(
+            True, 'Profile picture updated', 200,
+            picture_url=picture_url,
+            picture_urls=profile_picture_urls(picture_url)
+        )
         
     except Exception:
         logger.exception('Upload profile picture error')
         return json_response(False, 'Server error', 500)
 
 
+def serialize_profile(user):
+    """Profile payload grouped by the sections of the profile screen"""
+    return {
+        'profile': {
+            'firstName': user.get('first_name') or '',
+            'lastName': user.get('last_name') or '',
+            'middleName': user.get('middle_name') or '',
+            'suffix': user.get('suffix') or '',
+            'email': user.get('email') or '',
+            'status': user.get('status') or 'Active Student',
+            'profilePicture': user.get('profile_picture'),
+            'profilePictureSizes': profile_picture_urls(user.get('profile_picture'))
+        },
+        'academic': {
+            'school': user.get('school') or '',
+            'strand': user.get('strand') or '',
+            'gradeLevel': user.get('grade_level') or '',
+            'schoolYear': user.get('school_year') or '',
+            'lrn': user.get('lrn') or '',
+            'adviserSection': user.get('adviser_section') or ''
+        },
+        'personal': {
+            'phone': user.get('phone') or '',
+            'dob': user.get('date_of_birth') or '',
+            'address': user.get('address') or '',
+            'emergency': user.get('emergency_contact') or ''
+        },
+        'settings': {
+            'emailNotifications': bool(user.get('email_notifications', True)),
+            'twoFactor': bool(user.get('two_factor_enabled', False))
+        }
+    }
+
+
 # ================================================================================
 # SECTION 12: TASKS API
 # ================================================================================
 
 @app.route('/api/tasks', methods=['GET', 'POST'])
 @token_required
+@etag_cached('tasks')
 def api_tasks():
     """GET - List tasks, POST - Create task"""
     sb = get_supabase()
@@ -919,46 +3255,66 @@ def api_tasks():
             search = request.args.get('search', '').strip()
             filter_by = request.args.get('filter', 'all').strip()
             sort_by = request.args.get('sort', 'due').strip()
+            cursor = request.args.get('cursor', '').strip()
+            paginated = bool(cursor) or 'limit' in request.args
             
-            query = sb.table('tasks').select('*')
-            success, data, _ = safe_execute(query, 'get_tasks')
+            try:
+                limit = min(max(int(request.args.get('limit', TASKS_PAGE_MAX)), 1), TASKS_PAGE_MAX)
+            except ValueError:
+                return json_response(False, 'Invalid limit', 400)
             
-            if not success:
-                return jsonify([])
+            if sort_by not in TASK_SORT_KEYS:
+                sort_by = 'created_at'
             
-            tasks = data or []
+            query = sb.table('tasks').select('*')
+            conditions = []
             
             if search:
-                tasks = [t for t in tasks if search.lower() in (t.get('title', '') + t.get('notes', '')).lower()]
+                pattern = postgrest_quote(f'*{escape_like(search)}*')
+                conditions.append(f'title.ilike.{pattern},notes.ilike.{pattern}')
             
             if filter_by == 'pending':
-                tasks = [t for t in tasks if not t.get('completed')]
+                query = query.not_.is_('completed', 'true')
             elif filter_by == 'completed':
-                tasks = [t for t in tasks if t.get('completed')]
+                query = query.eq('completed', True)
             elif filter_by == 'high':
-                tasks = [t for t in tasks if t.get('priority') == 'high']
+                query = query.eq('priority', 'high')
             
-            if sort_by == 'due':
-                tasks.sort(key=lambda x: (x.get('due') is None, x.get('due') or ''))
-            elif sort_by == 'priority':
-                priority_order = {'high': 0, 'medium': 1, 'low': 2}
-                tasks.sort(key=lambda x: priority_order.get(x.get('priority', 'medium'), 1))
-            else:
-                tasks.sort(key=lambda x: x.get('created_at', ''), reverse=True)
+            if cursor:
+                position = decode_cursor(cursor)
+                if not position or position.get('sort') != sort_by or 'id' not in position:
+                    return json_response(False, 'Invalid cursor', 400)
+                conditions.append(task_keyset_filter(sort_by, position))
+            
+            # PostgREST takes a single `or` tree, so AND several groups together
+            if len(conditions) == 1:
+                query = query.or_(conditions[0])
+            elif conditions:
+                query = query.or_('and(' + ','.join(f'or({c})' for c in conditions) + ')')
+            
+            column, descending = TASK_SORT_KEYS[sort_by]
+            query = query.order(column, desc=descending).order('id', desc=descending)
+            
+            if paginated:
+                query = query.limit(limit + 1)
+            
+            success, data, _ = safe_execute(query, 'get_tasks')
+            
+            if not success:
+                return jsonify([])
+            
+            tasks = data or []
+            next_cursor = None
+            
+            if paginated and len(tasks) > limit:
+                tasks = tasks[:limit]
+                last = tasks[-1]
+                next_cursor = encode_cursor({'sort': sort_by, 'value': last.get(column), 'id': last.get('id')})
             
-            serialized = [{
-                'id': str(t.get('id')),
-                'title': t.get('title'),
-                'due': t.get('due'),
-                'priority': t.get('priority', 'medium'),
-                'notes': t.get('notes', ''),
-                'status': t.get('status', 'pending'),
-                'progress': int(t.get('progress', 0)),
-                'type': t.get('type', 'assignment'),
-                'completed': bool(t.get('completed')),
-                'created_at': t.get('created_at')
-            } for t in tasks]
+            serialized = [serialize_task(t) for t in tasks]
             
+            if paginated:
+                return jsonify({'tasks': serialized, 'next_cursor': next_cursor})
             return jsonify(serialized)
         except Exception:
             logger.exception('Get tasks error')
@@ -966,27 +3322,18 @@ def api_tasks():
     
     # POST
     data = request.get_json() or {}
-    title = data.get('title', '').strip()
     
-    if not title:
-        return json_response(False, 'Title required', 400)
+    try:
+        payload = build_task_payload(data)
+    except ValueError as e:
+        return json_response(False, str(e), 400)
     
     try:
-        payload = {
-            'title': title,
-            'due': data.get('due') or data.get('dueDate'),
-            'priority': data.get('priority', 'medium'),
-            'notes': data.get('notes') or data.get('desc') or '',
-            'status': 'pending',
-            'progress': int(data.get('progress', 0)),
-            'type': data.get('type', 'assignment'),
-            'completed': bool(data.get('completed', False)),
-        }
-        
         success, created, error = safe_execute(
             sb.table('tasks').insert(payload),
             'create_task'
         )
+        invalidate_task_stats()
         
         if not success or not created:
             return json_response(False, f'Failed: {error}', 500)
@@ -1000,6 +3347,150 @@ def api_tasks():
         return json_response(False, 'Server error', 500)
 
 
+def apply_task_creates(sb, creates, results):
+    """Insert (index, payload) creates in one statement, filling results"""
+    success, created, error = safe_execute(
+        sb.table('tasks').insert([payload for _, payload in creates]),
+        'batch_create_tasks'
+    )
+    created = created or []
+    for position, (index, _) in enumerate(creates):
+        if success and position < len(created):
+            results[index] = {'index': index, 'op': 'create', 'success': True,
+                              'id': str(created[position]['id']), 'task': serialize_task(created[position])}
+        else:
+            results[index] = {'index': index, 'op': 'create', 'success': False, 'error': error or 'Not created'}
+
+
+def apply_task_updates(sb, updates, results):
+    """Run {patch key: [(index, id)]} updates, one statement per distinct patch"""
+    for patch_key, items in updates.items():
+        ids = [task_id for _, task_id in items]
+        success, updated, error = safe_execute(
+            sb.table('tasks').update(json.loads(patch_key)).in_('id', ids),
+            'batch_update_tasks'
+        )
+        found = {str(row.get('id')) for row in (updated or [])}
+        for index, task_id in items:
+            ok = success and task_id in found
+            results[index] = {'index': index, 'op': 'update', 'id': task_id, 'success': ok}
+            if not ok:
+                results[index]['error'] = error or 'Not found'
+
+
+def apply_task_deletes(sb, deletes, results):
+    """Delete (index, id) items in one statement, filling results"""
+    success, deleted, error = safe_execute(
+        sb.table('tasks').delete().in_('id', [task_id for _, task_id in deletes]),
+        'batch_delete_tasks'
+    )
+    found = {str(row.get('id')) for row in (deleted or [])}
+    for index, task_id in deletes:
+        ok = success and task_id in found
+        results[index] = {'index': index, 'op': 'delete', 'id': task_id, 'success': ok}
+        if not ok:
+            results[index]['error'] = error or 'Not found'
+
+
+@app.route('/api/tasks/batch', methods=['POST'])
+@token_required
+def api_tasks_batch():
+    """Create, update and delete many tasks in a few bulk statements.
+
+    Body: {"operations": [{"op": "create", "data": {...}},
+                          {"op": "update", "id": "1", "data": {...}},
+                          {"op": "delete", "id": "2"}]}
+    Operations apply in request order. Each run of consecutive operations
+    of one kind is combined: creates into one insert, updates sharing the
+    same fields into one in_()-filtered update, deletes into one
+    in_()-filtered delete. A run of updates is split where an id repeats,
+    so a later update of the same task still wins. Results are returned
+    per operation, in request order.
+    """
+    data = request.get_json(silent=True) or {}
+    operations = data.get('operations')
+    
+    if not isinstance(operations, list) or not operations:
+        return json_response(False, 'Operations required', 400)
+    
+    if len(operations) > TASK_BATCH_MAX:
+        return json_response(False, f'At most {TASK_BATCH_MAX} operations per batch', 400)
+    
+    sb = get_supabase()
+    results = [None] * len(operations)
+    run_op, run_items, run_ids = None, None, set()
+    
+    def flush():
+        if run_op == 'create':
+            apply_task_creates(sb, run_items, results)
+        elif run_op == 'update':
+            apply_task_updates(sb, run_items, results)
+        elif run_op == 'delete':
+            apply_task_deletes(sb, run_items, results)
+    
+    for index, operation in enumerate(operations):
+        operation = operation if isinstance(operation, dict) else {}
+        op = operation.get('op')
+        task_id = operation.get('id')
+        fields = operation.get('data') or {}
+        
+        try:
+            if op in ('create', 'update') and not isinstance(fields, dict):
+                raise ValueError('Data must be an object')
+            if op == 'create':
+                item = (index, build_task_payload(fields))
+            elif op == 'update':
+                patch = {k: fields[k] for k in TASK_UPDATE_FIELDS if k in fields}
+                if task_id is None or not patch:
+                    raise ValueError('Id and fields to update required')
+                patch = clean_task_fields(patch)
+                item = (json.dumps(patch, sort_keys=True), (index, str(task_id)))
+            elif op == 'delete':
+                if task_id is None:
+                    raise ValueError('Id required')
+                item = (index, str(task_id))
+            else:
+                raise ValueError('Unknown op')
+        except ValueError as e:
+            # Raised only with the fixed messages above and in clean_task_fields
+            results[index] = {'index': index, 'op': op, 'success': False, 'error': str(e)}
+            continue
+        
+        repeated = op == 'update' and item[1][1] in run_ids
+        if op != run_op or repeated:
+            flush()
+            run_op, run_items, run_ids = op, {} if op == 'update' else [], set()
+        if op == 'update':
+            # Operations with identical patches share one statement
+            run_items.setdefault(item[0], []).append(item[1])
+            run_ids.add(item[1][1])
+        else:
+            run_items.append(item)
+    flush()
+    
+    invalidate_task_stats()
+    
+    failed = sum(1 for r in results if not r['success'])
+    return json_response(
+        failed == 0,
+        'Batch applied' if failed == 0 else f'{failed} operations failed',
+        200,
+        results=results,
+        succeeded=len(results) - failed,
+        failed=failed
+    )
+
+
+@app.route('/api/tasks/stats', methods=['GET'])
+@token_required
+def api_task_stats():
+    """Task counts by status/priority/type, overdue, due this week, average progress"""
+    stats = get_task_stats()
+    if stats is None:
+        return json_response(False, 'Failed to load stats', 500)
+    return json_response(True, stats=stats)
+
+
 @app.route('/api/tasks/<task_id>', methods=['GET', 'PATCH', 'DELETE'])
 @token_required
 def api_task_item(task_id):
@@ -1018,6 +3509,7 @@ def api_task_item(task_id):
                 sb.table('tasks').delete().eq('id', task_id),
                 'delete_task'
             )
+            invalidate_task_stats()
             if not success:
                 return json_response(False, 'Failed to delete', 500)
             return json_response(True, 'Task deleted')
@@ -1029,18 +3521,24 @@ def api_task_item(task_id):
     data = request.get_json() or {}
     allowed = {}
     
-    for key in ['title', 'notes', 'priority', 'status', 'due', 'progress', 'type', 'completed']:
+    for key in TASK_UPDATE_FIELDS:
         if key in data:
             allowed[key] = data[key]
     
     if not allowed:
         return json_response(False, 'No fields to update', 400)
     
+    try:
+        allowed = clean_task_fields(allowed)
+    except ValueError as e:
+        return json_response(False, str(e), 400)
+    
     try:
         success, _, error = safe_execute(
             sb.table('tasks').update(allowed).eq('id', task_id),
             'update_task'
         )
+        invalidate_task_stats()
         if not success:
             return json_response(False, f'Failed: {error}', 500)
         return json_response(True, 'Task updated')
@@ -1049,12 +3547,141 @@ def api_task_item(task_id):
         return json_response(False, 'Server error', 500)
 
 
+# Sort key -> (column, descending). priority_rank is a generated column
+# (high=0, medium=1, low=2) so priority ordering happens in the database.
+TASK_SORT_KEYS = {
+    'due': ('due', False),
+    'priority': ('priority_rank', False),
+    'created_at': ('created_at', True),
+}
+
+
+def escape_like(value):
+    """Escape LIKE wildcards in user-supplied search text"""
+    return value.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+
+def task_keyset_filter(sort_by, position):
+    """Build the PostgREST or-filter selecting rows after a cursor position"""
+    column, descending = TASK_SORT_KEYS[sort_by]
+    value = position.get('value')
+    row_id = postgrest_quote(position['id'])
+    
+    # Postgres sorts nulls last ascending and first descending
+    if descending:
+        if value is None:
+            return f'{column}.not.is.null,and({column}.is.null,id.lt.{row_id})'
+        value = postgrest_quote(value)
+        return f'{column}.lt.{value},and({column}.eq.{value},id.lt.{row_id})'
+    
+    if value is None:
+        return f'and({column}.is.null,id.gt.{row_id})'
+    value = postgrest_quote(value)
+    return f'{column}.gt.{value},{column}.is.null,and({column}.eq.{value},id.gt.{row_id})'
+
+
+def get_task_stats(scope='all'):
+    """Aggregate task stats from the task_stats() database function, cached.
+
+    Entries are keyed by scope and reused while the `tasks` change counter
+    is unchanged (so writes from any worker invalidate them) and for at most
+    TASK_STATS_TTL seconds, since overdue/this-week counts move with time.
+    Tasks are not owned by users in this schema, so every caller shares the
+    'all' scope.
+    """
+    versions = collection_versions(['tasks'])
+    version = versions[0] if versions else None
+    now = time.monotonic()
+    
+    with _task_stats_lock:
+        entry = _task_stats_cache.get(scope)
+        if entry and version is not None and entry[0] == version and entry[1] > now:
+            return entry[2]
+    
+    sb = get_supabase()
+    success, stats, _ = safe_execute(sb.rpc('task_stats', {}), 'task_stats')
+    if not success or stats is None:
+        return None
+    
+    with _task_stats_lock:
+        _task_stats_cache[scope] = (version, now + TASK_STATS_TTL, stats)
+    return stats
+
+
+def invalidate_task_stats():
+    """Drop cached task stats after a task write in this process"""
+    with _task_stats_lock:
+        _task_stats_cache.clear()
+
+
+TASK_UPDATE_FIELDS = ['title', 'notes', 'priority', 'status', 'due', 'progress', 'type', 'completed']
+TASK_TEXT_FIELDS = ['notes', 'priority', 'status', 'due', 'type']
+
+
+def clean_task_fields(fields):
+    """Check and normalise task field values.
+
+    Returns a cleaned copy. Raises ValueError with a fixed message such as
+    'Invalid progress', safe to return to the client as is.
+    """
+    cleaned = dict(fields)
+    if 'title' in cleaned:
+        title = cleaned['title']
+        if not isinstance(title, str) or not title.strip():
+            raise ValueError('Title required')
+        cleaned['title'] = title.strip()
+    if 'progress' in cleaned:
+        try:
+            cleaned['progress'] = int(cleaned['progress'])
+        except (TypeError, ValueError):
+            raise ValueError('Invalid progress') from None
+    if 'completed' in cleaned:
+        cleaned['completed'] = bool(cleaned['completed'])
+    for key in TASK_TEXT_FIELDS:
+        if cleaned.get(key) is not None and not isinstance(cleaned[key], str):
+            raise ValueError(f'Invalid {key}')
+    return cleaned
+
+
+def build_task_payload(data):
+    """Build an insert payload for a new task; raises ValueError if invalid"""
+    if not data.get('title'):
+        raise ValueError('Title required')
+    return clean_task_fields({
+        'title': data.get('title'),
+        'due': data.get('due') or data.get('dueDate'),
+        'priority': data.get('priority', 'medium'),
+        'notes': data.get('notes') or data.get('desc') or '',
+        'status': 'pending',
+        'progress': data.get('progress', 0),
+        'type': data.get('type', 'assignment'),
+        'completed': data.get('completed', False),
+    })
+
+
+def serialize_task(t):
+    """Serialize task for Flutter"""
+    return {
+        'id': str(t.get('id')),
+        'title': t.get('title'),
+        'due': t.get('due'),
+        'priority': t.get('priority', 'medium'),
+        'notes': t.get('notes', ''),
+        'status': t.get('status', 'pending'),
+        'progress': int(t.get('progress', 0)),
+        'type': t.get('type', 'assignment'),
+        'completed': bool(t.get('completed')),
+        'created_at': t.get('created_at')
+    }
+
+
 # ================================================================================
 # SECTION 13: MEETINGS API (FIXED - NO DUPLICATE DECORATORS)
 # ================================================================================
 
 @app.route('/api/meetings', methods=['GET', 'POST'])
 @token_required
+@etag_cached('meetings', vary=vary_by_user)
 def api_meetings():
     """GET - List meetings, POST - Create meeting (admin only)"""
     sb = get_supabase()
@@ -1062,32 +3689,24 @@ def api_meetings():
         try:
             current_user = request.user_data
             user_email = current_user.get('email')
-            user_role = (current_user.get('role', '')).lower()
+            user_role = request.user_role
             
             if not user_email:
                 return json_response(False, 'User email not found in token', 401)
             
+            query = visible_meetings_query(sb, user_email, user_role)
+            
             success, data, _ = safe_execute(
-                sb.table('meetings').select('*').order('datetime', desc=False),
+                query.order('datetime', desc=False),
                 'get_meetings'
             )
             
             if not success:
                 return jsonify([])
             
-            all_meetings = data or []
+            meetings = [serialize_meeting(r) for r in (data or [])]
             
-            if user_role in ('admin', 'administrator', 'superuser'):
-                filtered_meetings = all_meetings
-            else:
-                filtered_meetings = [
-                    meeting for meeting in all_meetings 
-                    if user_is_attendee(meeting, user_email)
-                ]
-            
-            meetings = [serialize_meeting(r) for r in filtered_meetings]
-            
-            logger.info(f'User {user_email} ({user_role}) retrieved {len(meetings)} meetings')
+            query_logger.info('User %s (%s) retrieved %d meetings', user_email, user_role, len(meetings))
             
             return jsonify(meetings)
             
@@ -1096,10 +3715,9 @@ def api_meetings():
             return jsonify([])
     
     # POST
-    current_user = request.user_data
-    user_role = (current_user.get('role', '')).lower()
+    user_role = request.user_role
     
-    if user_role not in ('admin', 'administrator', 'superuser'):
+    if user_role not in ADMIN_ROLES:
         return json_response(False, 'Only admins can create meetings', 403)
     
     data = request.get_json() or {}
@@ -1161,19 +3779,18 @@ def api_meeting_item(meeting_id):
         
         current_user = request.user_data
         user_email = current_user.get('email')
-        user_role = (current_user.get('role', '')).lower()
+        user_role = request.user_role
         
-        if user_role not in ('admin', 'administrator', 'superuser') and user_email:
+        if user_role not in ADMIN_ROLES and user_email:
             if not user_is_attendee(meeting, user_email):
                 return json_response(False, 'Access denied', 403)
         
         return jsonify(serialize_meeting(meeting))
     
     if request.method == 'DELETE':
-        current_user = request.user_data
-        user_role = (current_user.get('role', '')).lower()
+        user_role = request.user_role
         
-        if user_role not in ('admin', 'administrator', 'superuser'):
+        if user_role not in ADMIN_ROLES:
             return json_response(False, 'Only admins can delete meetings', 403)
         
         try:
@@ -1189,8 +3806,7 @@ def api_meeting_item(meeting_id):
             return json_response(False, 'Server error', 500)
     
     # PATCH
-    current_user = request.user_data
-    user_role = (current_user.get('role', '')).lower()
+    user_role = request.user_role
     
     data = request.get_json() or {}
     allowed = {}
@@ -1199,22 +3815,22 @@ def api_meeting_item(meeting_id):
     
     for key in ['title', 'type', 'purpose', 'datetime', 'location', 'status']:
         if key in data:
-            if user_role not in ('admin', 'administrator', 'superuser') and key not in non_admin_allowed_fields:
+            if user_role not in ADMIN_ROLES and key not in non_admin_allowed_fields:
                 return json_response(False, f'Only admins can update {key}', 403)
             allowed[key] = data[key]
     
     if 'meetLink' in data:
-        if user_role not in ('admin', 'administrator', 'superuser'):
+        if user_role not in ADMIN_ROLES:
             return json_response(False, 'Only admins can update meet link', 403)
         allowed['meet_link'] = data['meetLink']
     
     if 'meet_link' in data:
-        if user_role not in ('admin', 'administrator', 'superuser'):
+        if user_role not in ADMIN_ROLES:
             return json_response(False, 'Only admins can update meet link', 403)
         allowed['meet_link'] = data['meet_link']
     
     if 'attendees' in data:
-        if user_role not in ('admin', 'administrator', 'superuser'):
+        if user_role not in ADMIN_ROLES:
             return json_response(False, 'Only admins can update attendees', 403)
         allowed['attendees'] = json.dumps(data['attendees'])
     
@@ -1245,6 +3861,18 @@ def api_meeting_item(meeting_id):
         return json_response(False, 'Server error', 500)
 
 
+def visible_meetings_query(sb, user_email, user_role):
+    """Meetings query limited to what the user may see"""
+    if user_role in ADMIN_ROLES:
+        return sb.table('meetings').select('*')
+    # Indexed join on meeting_attendees (kept in sync by a trigger)
+    return (
+        sb.table('meetings')
+        .select('*, meeting_attendees!inner(email)')
+        .in_('meeting_attendees.email', [user_email.lower().strip(), 'all'])
+    )
+
+
 def serialize_meeting(row):
     """Serialize meeting for Flutter"""
     m = {
@@ -1324,6 +3952,7 @@ def user_is_attendee(meeting_row, user_email):
 
 @app.route('/api/budget', methods=['GET'])
 @token_required
+@etag_cached('budget_categories', 'budget_transactions', vary=vary_by_receipt_url_window)
 def api_budget_root():
     """Get all budget data"""
     try:
@@ -1333,26 +3962,21 @@ def api_budget_root():
             sb.table('budget_categories').select('*').order('name'),
             'get_categories'
         )
-        categories = [{
-            'id': c['id'],
-            'name': c['name'],
-            'budget': float(c.get('budget', 0))
-        } for c in (cats or [])]
+        categories = [serialize_category(c) for c in (cats or [])]
         
         success, txs, _ = safe_execute(
             sb.table('budget_transactions').select('*').order('date', desc=True),
             'get_transactions'
         )
-        transactions = [{
-            'id': t['id'],
-            'type': t.get('type'),
-            'category': t.get('category'),
-            'description': t.get('description'),
-            'amount': float(t.get('amount', 0)),
-            'date': t.get('date'),
-            'receipt': t.get('receipt'),
-            'receipt_url': get_receipt_url(t.get('receipt')) if t.get('receipt') else None
-        } for t in (txs or [])]
+        txs = txs or []
+        
+        # receipt_url stays empty unless ?sign_receipts=1: clients sign the
+        # receipts they open through /api/budget/receipts/<filename>/url
+        receipt_urls = {}
+        if signs_receipts(request.args):
+            receipt_urls = get_receipt_urls([t.get('receipt') for t in txs])
+        
+        transactions = [serialize_transaction(t, receipt_urls) for t in txs]
         
         return jsonify({
             'categories': categories,
@@ -1365,6 +3989,84 @@ def api_budget_root():
         return jsonify({'categories': [], 'transactions': [], 'funds': [], 'tickets': []})
 
 
+@app.route('/api/budget/summary', methods=['GET'])
+@token_required
+@etag_cached('budget_categories', 'budget_transactions')
+def api_budget_summary():
+    """Per-category budget, spent, income and remaining from running totals"""
+    try:
+        sb = get_supabase()
+        
+        success, cats, error = safe_execute(
+            sb.table('budget_categories').select('*').order('name'),
+            'get_categories'
+        )
+        if not success:
+            return json_response(False, f'Failed: {error}', 500)
+        
+        success, totals, error = safe_execute(
+            sb.table('budget_category_totals').select('category,spent,income,tx_count'),
+            'get_category_totals'
+        )
+        if not success:
+            return json_response(False, f'Failed: {error}', 500)
+        
+        totals_by_name = {t['category']: t for t in (totals or [])}
+        categories = []
+        for c in (cats or []):
+            totals_row = totals_by_name.get(c['name'], {})
+            budget = float(c.get('budget') or 0)
+            spent = float(totals_row.get('spent') or 0)
+            categories.append({
+                'id': c['id'],
+                'name': c['name'],
+                'budget': budget,
+                'spent': spent,
+                'income': float(totals_row.get('income') or 0),
+                'remaining': budget - spent,
+                'transactions': int(totals_row.get('tx_count') or 0)
+            })
+        
+        return jsonify({
+            'categories': categories,
+            'totals': {
+                'budget': sum(c['budget'] for c in categories),
+                'spent': sum(c['spent'] for c in categories),
+                'income': sum(c['income'] for c in categories),
+                'remaining': sum(c['remaining'] for c in categories)
+            }
+        })
+    except Exception:
+        logger.exception('Budget summary error')
+        return json_response(False, 'Server error', 500)
+
+
+@app.route('/api/budget/summary/reconcile', methods=['POST'])
+@admin_required
+def api_budget_summary_reconcile():
+    """Check running category totals against a full recomputation"""
+    repair = bool((request.get_json(silent=True) or {}).get('repair', True))
+    drift = reconcile_budget_totals(repair=repair)
+    if drift is None:
+        return json_response(False, 'Reconcile failed', 500)
+    return json_response(True, 'Totals reconciled' if repair else 'Totals checked', drift=drift, repaired=repair)
+
+
+@app.route('/api/budget/receipts/<path:filename>/url', methods=['GET'])
+@token_required
+def api_receipt_url(filename):
+    """Get signed URL for a receipt or preview a budget transaction references"""
+    used = referenced_receipt_names([filename])
+    if used is None:
+        return json_response(False, 'Server error', 500)
+    if filename not in used:
+        return json_response(False, 'Receipt not found', 404)
+    url = get_receipt_url(filename)
+    if not url:
+        return json_response(False, 'Receipt not found', 404)
+    return json_response(True, receipt_url=url)
+
+
 @app.route('/api/budget/transactions', methods=['POST'])
 @token_required
 def api_create_transaction():
@@ -1382,10 +4084,10 @@ def api_create_transaction():
         if not cat:
             return json_response(False, f'Category "{category}" does not exist', 400)
         
-        receipt_filename = None
+        receipt_filename, receipt_created = None, False
         if 'receipt' in request.files:
             file = request.files['receipt']
-            receipt_filename = save_uploaded_file(file, SUPABASE_RECEIPT_BUCKET)
+            receipt_filename, receipt_created = save_uploaded_file(file, SUPABASE_RECEIPT_BUCKET)
         
         payload = {
             'type': data.get('type', 'expense'),
@@ -1403,25 +4105,77 @@ def api_create_transaction():
         )
         
         if not success:
-            if receipt_filename:
-                try:
-                    sb.storage.from_(SUPABASE_RECEIPT_BUCKET).remove([receipt_filename])
-                except Exception:
-                    pass
+            if receipt_created:
+                queue_storage_deletion(SUPABASE_RECEIPT_BUCKET, [receipt_filename])
             return json_response(False, f'Failed: {error}', 500)
         
+        if receipt_created:
+            queue_receipt_processing(receipt_filename, file)
+        
         return json_response(True, 'Transaction created', 201)
     except Exception:
         logger.exception('Create transaction error')
         return json_response(False, 'Server error', 500)
 
 
+def reconcile_budget_totals(repair=True):
+    """Compare budget_category_totals with a full recomputation.
+
+    Returns the categories that drifted (empty when consistent), or None if
+    the check could not run. With repair=True the totals are rebuilt.
+    """
+    sb = get_supabase()
+    success, drift, error = safe_execute(
+        sb.rpc('reconcile_budget_category_totals', {'repair': repair}),
+        'reconcile_budget_totals'
+    )
+    if not success:
+        return None
+    if drift:
+        logger.warning(f'⚠️  Budget totals drifted for {len(drift)} categories (repaired={repair})')
+    return drift or []
+
+
+@app.cli.command('reconcile-budget')
+def reconcile_budget_command():
+    """Check and repair running budget totals (run from a scheduler)"""
+    drift = reconcile_budget_totals(repair=True)
+    if drift is None:
+        raise SystemExit(1)
+    print(f'{len(drift)} categories repaired')
+
+
+def serialize_category(c):
+    """Serialize budget category for Flutter"""
+    return {
+        'id': c['id'],
+        'name': c['name'],
+        'budget': float(c.get('budget', 0))
+    }
+
+
+def serialize_transaction(t, receipt_urls):
+    """Serialize budget transaction for Flutter"""
+    return {
+        'id': t['id'],
+        'type': t.get('type'),
+        'category': t.get('category'),
+        'description': t.get('description'),
+        'amount': float(t.get('amount', 0)),
+        'date': t.get('date'),
+        'receipt': t.get('receipt'),
+        'receipt_url': receipt_urls.get(t.get('receipt')),
+        'receipt_preview': t.get('receipt_preview')
+    }
+
+
 # ================================================================================
 # SECTION 15: STUDENTS API
 # ================================================================================
 
 @app.route('/api/students', methods=['GET'])
 @token_required
+@etag_cached('users')
 def api_students():
     """Get all students"""
     try:
@@ -1433,20 +4187,9 @@ def api_students():
         if not success:
             return jsonify([])
         
-        students = []
-        for student in (data or []):
-            students.append({
-                'id': student.get('id'),
-                'name': student.get('display_name') or f"{student.get('first_name', '')} {student.get('last_name', '')}".strip(),
-                'email': student.get('email'),
-                'school': student.get('school', ''),
-                'strand': student.get('strand', ''),
-                'gradeLevel': student.get('grade_level', ''),
-                'lrn': student.get('lrn', ''),
-                'status': student.get('status', 'Active Student')
-            })
+        students = [serialize_student(student) for student in (data or [])]
         
-        logger.info(f'✅ Fetched {len(students)} students')
+        query_logger.info('✅ Fetched %d students', len(students))
         return jsonify(students)
         
     except Exception:
@@ -1454,8 +4197,180 @@ def api_students():
         return jsonify([])
 
 
+def serialize_student(student):
+    """Student list entry with the smallest avatar size"""
+    return {
+        'id': student.get('id'),
+        'name': student.get('display_name') or f"{student.get('first_name', '')} {student.get('last_name', '')}".strip(),
+        'email': student.get('email'),
+        'school': student.get('school', ''),
+        'strand': student.get('strand', ''),
+        'gradeLevel': student.get('grade_level', ''),
+        'lrn': student.get('lrn', ''),
+        'status': student.get('status', 'Active Student'),
+        'avatar': profile_picture_urls(student.get('profile_picture')).get(str(min(PROFILE_PICTURE_SIZES)))
+    }
+
+
+# ================================================================================
+# SECTION 16: SYNC API
+# ================================================================================
+
+# change_log table name -> response key
+SYNC_COLLECTIONS = {
+    'tasks': 'tasks',
+    'meetings': 'meetings',
+    'budget_transactions': 'transactions',
+    'budget_categories': 'categories',
+}
+
+
+def fetch_sync_rows(sb, table_name, ids=None):
+    """Fetch current rows of a synced table visible to the caller"""
+    if table_name == 'meetings':
+        query = visible_meetings_query(sb, request.user_data.get('email') or '', request.user_role)
+    else:
+        query = sb.table(table_name).select('*')
+    if ids is not None:
+        query = query.in_('id', ids)
+    success, data, error = safe_execute(query, f'sync_fetch({table_name})')
+    if not success:
+        raise RuntimeError(error)
+    return data or []
+
+
+def serialize_sync_rows(table_name, rows, sign_receipts=False):
+    """Serialize synced rows with the same shapes as the list endpoints"""
+    if table_name == 'tasks':
+        return [serialize_task(r) for r in rows]
+    if table_name == 'meetings':
+        return [serialize_meeting(r) for r in rows]
+    if table_name == 'budget_categories':
+        return [serialize_category(r) for r in rows]
+    # As on /api/budget: receipt_url only on ?sign_receipts=1
+    receipt_urls = get_receipt_urls([r.get('receipt') for r in rows]) if sign_receipts else {}
+    return [serialize_transaction(r, receipt_urls) for r in rows]
+
+
+def fetch_sync_changes(sb, after_txid, after_id, limit):
+    """Commit-ordered change_log page: {'horizon', 'pruned_through', 'changes'}.
+
+    Only changes from transactions below the snapshot xmin are returned, so
+    a change can never commit behind a cursor that has already passed it.
+    """
+    success, data, error = safe_execute(
+        sb.rpc('sync_changes', {'p_after_txid': after_txid, 'p_after_id': after_id, 'p_limit': limit}),
+        'sync_changes'
+    )
+    if not success:
+        raise RuntimeError(error)
+    return data
+
+
+def prune_change_log(keep=SYNC_LOG_RETENTION):
+    """Delete change_log rows older than keep; returns the count, or None on failure"""
+    success, deleted, error = safe_execute(
+        get_supabase().rpc('prune_change_log', {'p_keep': keep}),
+        'prune_change_log'
+    )
+    if not success:
+        return None
+    logger.info('🧹 Pruned %s change_log rows older than %s', deleted, keep)
+    return deleted
+
+
+@app.cli.command('prune-change-log')
+def prune_change_log_command():
+    """Apply the sync log retention (run from a scheduler)"""
+    deleted = prune_change_log()
+    if deleted is None:
+        raise SystemExit(1)
+    print(f'{deleted} change_log rows pruned')
+
+
+@app.route('/api/sync', methods=['GET'])
+@token_required
+def api_sync():
+    """Delta sync of tasks, meetings, budget transactions and categories.
+
+    Without `since` the response is a full snapshot (`reset: true`).
+    With a cursor it carries only rows changed after it: `upserted` rows
+    and `deleted` ids (tombstones). `has_more` means another page should
+    be fetched with the returned cursor. receipt_url is only filled in
+    with ?sign_receipts=1; clients otherwise sign the receipts they open
+    through /api/budget/receipts/<filename>/url.
+    """
+    try:
+        sb = get_supabase()
+        since = request.args.get('since', '').strip()
+        sign_receipts = signs_receipts(request.args)
+        
+        try:
+            limit = min(max(int(request.args.get('limit', SYNC_PAGE_SIZE)), 1), SYNC_PAGE_SIZE)
+        except ValueError:
+            return json_response(False, 'Invalid limit', 400)
+        
+        position = None
+        if since:
+            position = decode_cursor(since)
+            if not position or not isinstance(position.get('change'), int):
+                return json_response(False, 'Invalid cursor', 400)
+            # Cursors from before commit ordering carry no txid: resync
+            if not str(position.get('txid', '')).isdigit():
+                position = None
+        
+        result = {key: {'upserted': [], 'deleted': []} for key in SYNC_COLLECTIONS.values()}
+        
+        page = None
+        if position is not None:
+            page = fetch_sync_changes(sb, position['txid'], position['change'], limit + 1)
+            pruned_through = page.get('pruned_through')
+            # The log was pruned past this cursor: fall back to a snapshot
+            if pruned_through is not None and int(position['txid']) <= int(pruned_through):
+                page = None
+        
+        if page is None:
+            # Read the horizon first so changes racing the snapshot replay
+            horizon = fetch_sync_changes(sb, None, 0, 0)['horizon']
+            for table_name, key in SYNC_COLLECTIONS.items():
+                result[key]['upserted'] = serialize_sync_rows(table_name, fetch_sync_rows(sb, table_name), sign_receipts)
+            result.update(cursor=encode_cursor({'txid': horizon, 'change': 0}), reset=True, has_more=False)
+            return jsonify(result)
+        
+        changes = page.get('changes') or []
+        has_more = len(changes) > limit
+        changes = changes[:limit]
+        
+        # Keep only the last operation per row
+        latest = {}
+        for change in changes:
+            if change['table_name'] in SYNC_COLLECTIONS:
+                latest[(change['table_name'], change['row_id'])] = change['op']
+        
+        for table_name, key in SYNC_COLLECTIONS.items():
+            changed = [row_id for (t, row_id), op in latest.items() if t == table_name and op != 'D']
+            deleted = [row_id for (t, row_id), op in latest.items() if t == table_name and op == 'D']
+            
+            if changed:
+                rows = fetch_sync_rows(sb, table_name, changed)
+                found = {str(r.get('id')) for r in rows}
+                # Rows gone since (or no longer visible to this user) are tombstones too
+                deleted.extend(row_id for row_id in changed if row_id not in found)
+                result[key]['upserted'] = serialize_sync_rows(table_name, rows, sign_receipts)
+            result[key]['deleted'] = deleted
+        
+        if changes:
+            position = {'txid': changes[-1]['txid'], 'change': changes[-1]['id']}
+        result.update(cursor=encode_cursor(position), reset=False, has_more=has_more)
+        return jsonify(result)
+    
+    except Exception:
+        logger.exception('Sync error')
+        return json_response(False, 'Server error', 500)
+
+
 # ================================================================================
-# SECTION 16: ERROR HANDLERS
+# SECTION 17: ERROR HANDLERS
 # ================================================================================
 
 @app.errorhandler(404)
@@ -1465,6 +4380,8 @@ def not_found(e):
 @app.errorhandler(500)
 def internal_error(e):
     logger.exception('Internal server error')
+    if metrics.enabled:
+        UNHANDLED_ERRORS.inc(request_route())
     return json_response(False, 'Internal server error', 500)
 
 @app.errorhandler(413)
@@ -1473,7 +4390,7 @@ def file_too_large(e):
 
 
 # ================================================================================
-# SECTION 17: HEALTH CHECK & DEBUG
+# SECTION 18: HEALTH CHECK & DEBUG
 # ================================================================================
 
 @app.route('/health', methods=['GET'])
@@ -1492,23 +4409,68 @@ def api_config():
         'version': '3.1'
     })
 
+@app.route('/api/stats', methods=['GET'])
+@admin_required
+def api_stats():
+    """Runtime state of this worker's caches, queues and pools"""
+    return jsonify({
+        'token_cache': token_cache_stats(),
+        'logging': logging_stats(),
+        'supabase_pool': supabase_clients.stats(),
+        'receipts': receipt_processor.stats(),
+        'storage_cleanup': storage_cleanup.stats(),
+    })
+
+@app.route('/metrics', methods=['GET'])
+def prometheus_metrics():
+    """Prometheus scrape endpoint for METRICS_TOKEN as a bearer token, or an admin"""
+    if not metrics.enabled:
+        return json_response(False, 'Metrics disabled', 404)
+    if not (METRICS_TOKEN and hmac.compare_digest(get_token_from_request() or '', METRICS_TOKEN)):
+        error = authenticate_request(admin_only=True)
+        if error:
+            return error
+    response = make_response(metrics.render())
+    response.headers['Content-Type'] = 'text/plain; version=0.0.4; charset=utf-8'
+    return response
+
+@app.route('/api/storage/reconcile', methods=['POST'])
+@admin_required
+def api_storage_reconcile():
+    """Find storage objects no user or transaction references and queue them for deletion"""
+    dry_run = bool((request.get_json(silent=True) or {}).get('dry_run', False))
+    found = reconcile_storage_orphans(dry_run=dry_run)
+    if found is None:
+        return json_response(False, 'Reconcile failed', 500)
+    return json_response(True, 'Orphans found' if dry_run else 'Orphans queued for deletion',
+                         orphans=found, dry_run=dry_run)
+
+
+@app.cli.command('reconcile-storage')
+def reconcile_storage_command():
+    """Queue orphaned storage objects for deletion and remove them (run from a scheduler)"""
+    found = reconcile_storage_orphans()
+    if found is None:
+        raise SystemExit(1)
+    print(f'{sum(found.values())} orphans queued, {storage_cleanup.drain()} objects removed')
+
 
 # ================================================================================
-# SECTION 18: APPLICATION STARTUP
+# SECTION 19: APPLICATION STARTUP
 # ================================================================================
 
-if __name__ == '__main__':
-    logger.info('=' * 80)
-    logger.info('LIKHAYAG MOBILE API - Starting...')
-    logger.info('=' * 80)
-    
+def startup_checks():
+    """Validate configuration and reach Supabase once; returns False on a fatal problem"""
     if not SUPABASE_URL or not SUPABASE_KEY:
         logger.error('❌ SUPABASE_URL and SUPABASE_KEY must be set in environment')
-        exit(1)
+        return False
     
     if not SUPABASE_AVAILABLE:
         logger.error('❌ Supabase library not installed. Run: pip install supabase')
-        exit(1)
+        return False
+    
+    if METRICS_ENABLED and not METRICS_TOKEN:
+        logger.warning('⚠️  METRICS_TOKEN not set: /metrics only answers admin tokens')
     
     try:
         sb = get_supabase()
@@ -1519,14 +4481,82 @@ if __name__ == '__main__':
             logger.warning('⚠️  Supabase connection test failed - check credentials')
     except Exception as e:
         logger.error(f'❌ Startup check failed: {e}')
+        return False
+    return True
+
+
+def reset_after_fork():
+    """Drop state a forked worker must not share with its parent"""
+    global _supabase_client, _image_pool
+    # HTTP connection pools and executor threads do not survive fork
+    _supabase_client = None
+    supabase_clients.reset()
+    _image_pool = None
+    send_code_limiter._backend = None
+
+
+def warm_up():
+    """Pay first-request costs before a worker takes traffic; returns seconds per step"""
+    timings = {}
+    
+    def step(name, func):
+        start = time.perf_counter()
+        try:
+            func()
+        except Exception as e:
+            logger.warning(f'⚠️  Warm-up step {name} failed: {e}')
+        timings[name] = round(time.perf_counter() - start, 3)
+    
+    def first_query():
+        safe_execute(get_supabase().table('users').select('id').limit(1), 'warm_up')
+    
+    def image_pool():
+        from PIL import Image
+        Image.init()
+        sample = io.BytesIO()
+        Image.new('RGB', (8, 8)).save(sample, format='PNG')
+        process_profile_image(sample.getvalue())
+    
+    def routing():
+        with app.test_request_context('/health'):
+            app.json.dumps({'warm': True})
+    
+    step('supabase', first_query)
+    step('jwt', lambda: decode_token(create_token(0, 'warm-up@localhost', 'user')))
+    step('password_hash', password_hash_prefix)
+    step('image_pool', image_pool)
+    step('routing', routing)
+    step('storage_cleanup', storage_cleanup.start)
+    logger.info(f'🔥 Worker {os.getpid()} warmed up: {timings}')
+    return timings
+
+
+def shutdown():
+    """Drain background work before the process exits"""
+    metrics.flush()
+    email_outbox.close()
+    receipt_processor.close()
+    storage_cleanup.close()
+    if _password_pool is not None:
+        _password_pool.shutdown(wait=True)
+    if _image_pool is not None:
+        _image_pool.shutdown(wait=True)
+
+
+if __name__ == '__main__':
+    logger.info('=' * 80)
+    logger.info('LIKHAYAG MOBILE API - Starting...')
+    logger.info('=' * 80)
+    
+    if not startup_checks():
         exit(1)
     
     debug_mode = os.getenv('FLASK_DEBUG', 'False').lower() in ('true', '1')
     host = os.getenv('FLASK_HOST', '0.0.0.0')
     port = int(os.getenv('FLASK_PORT', '5000'))
     
-    logger.info(f'🚀 Starting server on {host}:{port}')
+    logger.info(f'🚀 Starting development server on {host}:{port} (production: python -m likhayag serve)')
     logger.info(f'📱 Debug mode: {debug_mode}')
     logger.info('=' * 80)
     
-    app.run(debug=debug_mode, host=host, port=port)
\ No newline at end of file
+    app.run(debug=debug_mode, host=host, port=port)
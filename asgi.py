@@ -0,0 +1,543 @@
+"""
+================================================================================
+LIKHAYAG MOBILE API - ASGI Entry Point
+================================================================================
+Async serving mode. The I/O-bound read endpoints below are coroutines on
+the async Supabase client, so a single process keeps many requests in flight
+while they wait on the network, and independent calls run concurrently.
+Every other route falls through to the Flask app in app.py on a bounded
+thread pool, so behaviour is unchanged for anything not ported here.
+
+    uvicorn asgi:application --workers 4
+
+The WSGI entry point (`python app.py`, `app:app`) is kept as it was.
+================================================================================
+"""
+
+import asyncio
+import gzip
+import importlib.util
+import os
+import sys
+import tempfile
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from urllib.parse import parse_qs
+
+from werkzeug.http import parse_accept_header, parse_etags, quote_etag
+
+import app as api
+from app import logger, metrics
+
+# ==================== OPTIONAL IMPORTS ====================
+# Imported on first use, like app.py's heavy dependencies
+ASYNC_SUPABASE_AVAILABLE = importlib.util.find_spec('supabase') is not None
+
+
+# ================================================================================
+# SECTION 1: CONFIGURATION
+# ================================================================================
+
+# ---------- WSGI Fallback ----------
+ASGI_WSGI_THREADS = int(os.getenv('ASGI_WSGI_THREADS', 32))
+ASGI_SPOOL_BYTES = int(os.getenv('ASGI_SPOOL_BYTES', 1024 * 1024))
+
+# ---------- Global Variables ----------
+_async_supabase_client = None
+_async_supabase_lock = asyncio.Lock()
+_wsgi_pool = None
+_wsgi_pool_pid = None
+
+
+# ================================================================================
+# SECTION 2: ASYNC SUPABASE HELPERS
+# ================================================================================
+
+async def get_async_supabase():
+    """Get or create the async Supabase client singleton"""
+    global _async_supabase_client
+    if _async_supabase_client is not None:
+        return _async_supabase_client
+    async with _async_supabase_lock:
+        if _async_supabase_client is None:
+            if not ASYNC_SUPABASE_AVAILABLE:
+                raise RuntimeError('Supabase library not available')
+            if not api.SUPABASE_URL or not api.SUPABASE_KEY:
+                raise RuntimeError('Supabase URL/KEY not configured')
+            from supabase import acreate_client
+            _async_supabase_client = await acreate_client(api.SUPABASE_URL, api.SUPABASE_KEY)
+            logger.info('✅ Async Supabase client initialized')
+    return _async_supabase_client
+
+
+async def async_execute(query, operation_name='database operation'):
+    """Awaitable counterpart of app.safe_execute"""
+    api.count_db_call()
+    start = time.perf_counter()
+    try:
+        response = await query.execute()
+        if hasattr(response, 'error') and response.error:
+            logger.error(f"{operation_name} failed: {response.error}")
+            if metrics.enabled:
+                api.DB_ERRORS.inc(operation_name)
+            return False, None, str(response.error)
+        return True, getattr(response, 'data', None), None
+    except Exception as e:
+        logger.exception(f"{operation_name} exception: {e}")
+        if metrics.enabled:
+            api.DB_ERRORS.inc(operation_name)
+        return False, None, str(e)
+    finally:
+        if metrics.enabled:
+            api.DB_DURATION.observe(time.perf_counter() - start, operation_name)
+
+
+async def async_collection_versions(names):
+    """Awaitable counterpart of app.collection_versions"""
+    sb = await get_async_supabase()
+    success, rows, _ = await async_execute(
+        sb.table('collection_versions').select('name,version').in_('name', list(names)),
+        'collection_versions'
+    )
+    if not success:
+        return None
+    versions = {r['name']: r['version'] for r in (rows or [])}
+    return [versions.get(name, 0) for name in names]
+
+
+async def async_get_user(user_id):
+    """Fetch a user row by id through the shared process cache"""
+    key = ('id', str(user_id))
+    row = api.cached_user_row(key)
+    if row is None:
+        sb = await get_async_supabase()
+        success, data, _ = await async_execute(
+            sb.table('users').select('*').eq('id', user_id).limit(1),
+            'fetch_one(users)'
+        )
+        if not success or not data:
+            return None
+        row = data[0]
+        api.remember_user_row(row)
+    return dict(row)
+
+
+async def async_receipt_urls(filenames, expires_seconds=api.RECEIPT_URL_TTL):
+    """Signed receipt URLs; cache misses are signed in concurrent batches"""
+    urls, missing = api.cached_receipt_urls(filenames, expires_seconds)
+    if not missing:
+        return urls
+
+    async def sign(chunk):
+        with api.CallTimer(api.STORAGE_DURATION, api.STORAGE_ERRORS, 'create_signed_urls'):
+            return api.signed_url_items(await bucket.create_signed_urls(chunk, expires_seconds))
+
+    signed = {}
+    try:
+        bucket = (await get_async_supabase()).storage.from_(api.SUPABASE_RECEIPT_BUCKET)
+        chunks = [missing[i:i + api.RECEIPT_URL_BATCH_SIZE] for i in range(0, len(missing), api.RECEIPT_URL_BATCH_SIZE)]
+        for part in await asyncio.gather(*(sign(chunk) for chunk in chunks)):
+            signed.update(part)
+    except Exception as e:
+        logger.warning(f"Failed to get signed URLs: {e}")
+
+    api.remember_receipt_urls(signed, expires_seconds)
+    urls.update(signed)
+    return urls
+
+
+# ================================================================================
+# SECTION 3: REQUESTS & RESPONSES
+# ================================================================================
+
+class AsyncRequest:
+    """The parts of an ASGI HTTP scope the async handlers use"""
+
+    def __init__(self, scope):
+        self.method = scope['method']
+        self.path = scope['path']
+        self.query_string = scope.get('query_string', b'').decode('latin-1')
+        self.args = {k: v[0] for k, v in parse_qs(self.query_string).items()}
+        self.headers = {k.decode('latin-1').lower(): v.decode('latin-1') for k, v in scope.get('headers', [])}
+        self.user_data = None
+        self.user_role = None
+
+
+class AsyncResponse:
+    """Buffered response sent as one ASGI start/body pair"""
+
+    def __init__(self, body=b'', status=200, content_type='application/json'):
+        self.body = body
+        self.status = status
+        self.headers = {'Content-Type': content_type} if content_type else {}
+
+    def set_etag(self, etag):
+        self.headers['ETag'] = quote_etag(etag)
+
+    async def send(self, send):
+        self.headers['Content-Length'] = str(len(self.body))
+        await send({
+            'type': 'http.response.start',
+            'status': self.status,
+            'headers': [(k.encode('latin-1'), v.encode('latin-1')) for k, v in self.headers.items()],
+        })
+        await send({'type': 'http.response.body', 'body': self.body})
+
+
+def json_result(payload, status=200):
+    """JSON body encoded by the Flask app's JSON provider"""
+    return AsyncResponse(api.app.json.dumps(payload).encode('utf-8') + b'\n', status)
+
+
+def json_error(message, status):
+    """Same shape as app.json_response(False, message, status)"""
+    return json_result({'success': False, 'message': message}, status)
+
+
+def authenticate(req, admin_only=False):
+    """Mirror of app.authenticate_request; returns an error response or None"""
+    auth_header = req.headers.get('authorization')
+    if auth_header and auth_header.startswith('Bearer '):
+        token = auth_header.split(' ')[1]
+    else:
+        token = req.headers.get('x-auth-token')
+
+    if not token:
+        return json_error('Authentication required', 401)
+
+    payload = api.verify_token(token)
+    if not payload:
+        return json_error('Invalid or expired token', 401)
+
+    role = (payload.get('role') or '').lower()
+    if admin_only and role not in api.ADMIN_ROLES:
+        return json_error('Admin access required', 403)
+
+    req.user_data = payload
+    req.user_role = role
+    return None
+
+
+async def with_etag(req, collections, variant, handler):
+    """Async counterpart of app.etag_cached"""
+    versions = await async_collection_versions(collections)
+    if versions is None:
+        return await handler(req)
+
+    etag = api.compute_etag(versions, req.query_string, variant)
+    matched = api.matching_etag(etag, parse_etags(req.headers.get('if-none-match')))
+
+    if matched:
+        response = AsyncResponse(b'', 304, content_type=None)
+        response.set_etag(matched)
+    else:
+        response = await handler(req)
+        if response.status != 200:
+            return response
+        response.set_etag(etag)
+
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
+
+
+def finalize(req, response):
+    """Compression and CORS, matching compress_response and flask-cors"""
+    origin = req.headers.get('origin')
+    if origin:
+        response.headers['Access-Control-Allow-Origin'] = origin
+        response.headers['Access-Control-Allow-Credentials'] = 'true'
+        response.headers['Access-Control-Expose-Headers'] = 'X-Auth-Token'
+    vary = ['Origin'] if origin else []
+
+    compressible = (200 <= response.status < 300 and response.status != 204
+                    and response.headers.get('Content-Type', '').split(';')[0] in api.COMPRESSIBLE_MIMETYPES)
+    if compressible:
+        vary.append('Accept-Encoding')
+        encoding = None
+        if len(response.body) >= api.COMPRESS_MIN_BYTES:
+            encoding = api.choose_encoding(parse_accept_header(req.headers.get('accept-encoding')))
+        if encoding == 'br':
+            response.body = api.brotli.compress(response.body, quality=api.COMPRESS_BROTLI_QUALITY)
+        elif encoding == 'gzip':
+            response.body = gzip.compress(response.body, compresslevel=api.COMPRESS_GZIP_LEVEL)
+        if encoding:
+            response.headers['Content-Encoding'] = encoding
+            etag = response.headers.get('ETag')
+            if etag:
+                response.headers['ETag'] = f'{etag[:-1]}-{encoding}"'
+
+    if vary:
+        response.headers['Vary'] = ', '.join(vary)
+
+
+# ================================================================================
+# SECTION 4: ASYNC ENDPOINTS
+# ================================================================================
+
+ROUTES = {}
+
+
+def route(path, auth=True, etag=None, vary=None):
+    """Register an async GET handler, with token auth and ETag like the Flask route"""
+    def decorator(handler):
+        async def endpoint(req):
+            if auth:
+                error = authenticate(req)
+                if error:
+                    return error
+            if etag:
+                return await with_etag(req, etag, vary(req) if vary else None, handler)
+            return await handler(req)
+        ROUTES[('GET', path)] = endpoint
+        return handler
+    return decorator
+
+
+@route('/health', auth=False)
+async def health_check(req):
+    return json_result({'status': 'healthy', 'timestamp': datetime.utcnow().isoformat() + 'Z'})
+
+
+@route('/api/profile')
+async def get_profile(req):
+    """Get current user's profile"""
+    user = await async_get_user(req.user_data['user_id'])
+    if not user:
+        return json_error('User not found', 404)
+    return json_result(api.serialize_profile(user))
+
+
+@route('/api/meetings', etag=('meetings',), vary=lambda req: [req.user_data.get('email'), req.user_role])
+async def list_meetings(req):
+    """List the meetings visible to the caller"""
+    user_email = req.user_data.get('email')
+    if not user_email:
+        return json_error('User email not found in token', 401)
+
+    try:
+        sb = await get_async_supabase()
+        success, data, _ = await async_execute(
+            api.visible_meetings_query(sb, user_email, req.user_role).order('datetime', desc=False),
+            'get_meetings'
+        )
+        if not success:
+            return json_result([])
+
+        meetings = [api.serialize_meeting(r) for r in (data or [])]
+        api.query_logger.info('User %s (%s) retrieved %d meetings', user_email, req.user_role, len(meetings))
+        return json_result(meetings)
+    except Exception:
+        logger.exception('Get meetings error')
+        return json_result([])
+
+
+@route('/api/budget', etag=('budget_categories', 'budget_transactions'),
+       vary=lambda req: api.receipt_url_window() if api.signs_receipts(req.args) else None)
+async def get_budget(req):
+    """Get all budget data; categories and transactions are fetched concurrently"""
+    try:
+        sb = await get_async_supabase()
+        (_, cats, _), (_, txs, _) = await asyncio.gather(
+            async_execute(sb.table('budget_categories').select('*').order('name'), 'get_categories'),
+            async_execute(sb.table('budget_transactions').select('*').order('date', desc=True), 'get_transactions'),
+        )
+        txs = txs or []
+
+        # Signed only on ?sign_receipts=1, as in app.api_budget_root
+        receipt_urls = {}
+        if api.signs_receipts(req.args):
+            receipt_urls = await async_receipt_urls([t.get('receipt') for t in txs])
+
+        return json_result({
+            'categories': [api.serialize_category(c) for c in (cats or [])],
+            'transactions': [api.serialize_transaction(t, receipt_urls) for t in txs],
+            'funds': [],
+            'tickets': []
+        })
+    except Exception:
+        logger.exception('Budget API error')
+        return json_result({'categories': [], 'transactions': [], 'funds': [], 'tickets': []})
+
+
+@route('/api/students', etag=('users',))
+async def list_students(req):
+    """Get all students"""
+    try:
+        sb = await get_async_supabase()
+        success, data, _ = await async_execute(
+            sb.table('users').select('*').eq('role', 'user').order('display_name'),
+            'get_students'
+        )
+        if not success:
+            return json_result([])
+
+        students = [api.serialize_student(s) for s in (data or [])]
+        api.query_logger.info('✅ Fetched %d students', len(students))
+        return json_result(students)
+    except Exception:
+        logger.exception('Get students error')
+        return json_result([])
+
+
+# ================================================================================
+# SECTION 5: WSGI FALLBACK
+# ================================================================================
+
+def get_wsgi_pool():
+    """Threads running Flask for routes without an async handler"""
+    global _wsgi_pool, _wsgi_pool_pid
+    if _wsgi_pool is None or _wsgi_pool_pid != os.getpid():
+        _wsgi_pool = ThreadPoolExecutor(max_workers=ASGI_WSGI_THREADS, thread_name_prefix='wsgi')
+        _wsgi_pool_pid = os.getpid()
+    return _wsgi_pool
+
+
+def build_environ(scope, body, length):
+    """PEP 3333 environ for an ASGI HTTP scope"""
+    server = scope.get('server') or ('localhost', 80)
+    client = scope.get('client') or ('', 0)
+    root_path = scope.get('root_path', '')
+    path = scope['path'][len(root_path):] if scope['path'].startswith(root_path) else scope['path']
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': root_path.encode('utf-8').decode('latin-1'),
+        'PATH_INFO': path.encode('utf-8').decode('latin-1'),
+        'QUERY_STRING': scope.get('query_string', b'').decode('latin-1'),
+        'SERVER_NAME': server[0],
+        'SERVER_PORT': str(server[1]),
+        'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+        'REMOTE_ADDR': client[0],
+        'CONTENT_LENGTH': str(length),
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': body,
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': True,
+        'wsgi.run_once': False,
+    }
+    for name, value in scope.get('headers', []):
+        key = name.decode('latin-1').upper().replace('-', '_')
+        value = value.decode('latin-1')
+        if key == 'CONTENT_TYPE':
+            environ['CONTENT_TYPE'] = value
+        elif key != 'CONTENT_LENGTH':
+            key = f'HTTP_{key}'
+            environ[key] = f'{environ[key]},{value}' if key in environ else value
+    return environ
+
+
+def call_wsgi(environ):
+    """Run the Flask app for one request; returns status, headers and body"""
+    started = {}
+
+    def start_response(status, headers, exc_info=None):
+        started['status'] = int(status.split(' ', 1)[0])
+        started['headers'] = headers
+
+    iterable = api.app(environ, start_response)
+    try:
+        body = b''.join(iterable)
+    finally:
+        if hasattr(iterable, 'close'):
+            iterable.close()
+    return started['status'], started['headers'], body
+
+
+async def serve_wsgi(scope, receive, send):
+    """Buffer the request body (spooling large uploads to disk) and run Flask in a thread"""
+    with tempfile.SpooledTemporaryFile(max_size=ASGI_SPOOL_BYTES) as body:
+        length = 0
+        more_body = True
+        while more_body:
+            message = await receive()
+            if message['type'] == 'http.disconnect':
+                return
+            chunk = message.get('body', b'')
+            length += len(chunk)
+            if length > api.MAX_CONTENT_LENGTH:
+                await json_error('File too large', 413).send(send)
+                return
+            body.write(chunk)
+            more_body = message.get('more_body', False)
+        body.seek(0)
+
+        loop = asyncio.get_running_loop()
+        status, headers, content = await loop.run_in_executor(
+            get_wsgi_pool(), call_wsgi, build_environ(scope, body, length)
+        )
+
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [(k.encode('latin-1'), v.encode('latin-1')) for k, v in headers],
+    })
+    await send({'type': 'http.response.body', 'body': content})
+
+
+# ================================================================================
+# SECTION 6: APPLICATION
+# ================================================================================
+
+async def serve_async(endpoint, scope, send):
+    """Run an async handler with the request id, metrics and access log of the Flask path"""
+    req = AsyncRequest(scope)
+    state = {
+        'request_id': req.headers.get('x-request-id') or uuid.uuid4().hex,
+        'started': time.perf_counter(),
+        'db_calls': 0,
+    }
+    token = api.async_request_state.set(state)
+    try:
+        try:
+            response = await endpoint(req)
+        except Exception:
+            logger.exception('Async endpoint error')
+            if metrics.enabled:
+                api.UNHANDLED_ERRORS.inc(req.path)
+            response = json_error('Server error', 500)
+
+        finalize(req, response)
+        response.headers['X-Request-ID'] = state['request_id']
+
+        elapsed = time.perf_counter() - state['started']
+        if metrics.enabled:
+            metrics.start()
+            api.HTTP_DURATION.observe(elapsed, req.method, req.path)
+            api.HTTP_REQUESTS.inc(req.method, req.path, str(response.status))
+            api.DB_CALLS_PER_REQUEST.observe(state['db_calls'], req.method, req.path)
+        api.access_logger.info('%s %s %s', req.method, req.path, response.status,
+                               extra={'status': response.status, 'duration_ms': round(elapsed * 1000, 2),
+                                      'db_calls': state['db_calls']})
+        await response.send(send)
+    finally:
+        api.async_request_state.reset(token)
+
+
+async def lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            if _wsgi_pool is not None:
+                _wsgi_pool.shutdown(wait=True)
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+
+async def application(scope, receive, send):
+    """ASGI entry point"""
+    if scope['type'] == 'lifespan':
+        await lifespan(receive, send)
+        return
+    if scope['type'] != 'http':
+        return
+
+    endpoint = ROUTES.get((scope['method'], scope['path']))
+    if endpoint is None:
+        await serve_wsgi(scope, receive, send)
+    else:
+        await serve_async(endpoint, scope, send)
@@ -0,0 +1,121 @@
+"""
+Concurrent in-flight requests per process: WSGI threads vs the ASGI mode.
+
+Fires a burst of requests at one read endpoint against the in-memory
+Supabase stand-in with a fixed per-call latency. The WSGI run uses a pool
+of worker threads (like a gthread worker). The ASGI run drives
+asgi.application from a single event loop. For each it reports
+throughput, latency percentiles and the peak number of requests waiting
+on the database at once.
+
+    python benchmarks/bench_asgi_concurrency.py --requests 1000 --latency 0.05 --threads 32
+    python benchmarks/bench_asgi_concurrency.py --path /api/budget --scale 0.05
+"""
+
+import argparse
+import asyncio
+import os
+import resource
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import app  # noqa: E402
+import asgi  # noqa: E402
+import datasets  # noqa: E402
+from fake_supabase import AsyncFakeSupabase, FakeSupabase  # noqa: E402
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(pct / 100 * len(ordered)))] if ordered else 0.0
+
+
+def run_wsgi(path, headers, requests, threads):
+    local = threading.local()
+    lock = threading.Lock()
+    in_flight = {'now': 0, 'peak': 0}
+
+    def one(_):
+        if not hasattr(local, 'client'):
+            local.client = app.app.test_client()
+        with lock:
+            in_flight['now'] += 1
+            in_flight['peak'] = max(in_flight['peak'], in_flight['now'])
+        start = time.perf_counter()
+        status = local.client.get(path, headers=headers).status_code
+        elapsed = time.perf_counter() - start
+        with lock:
+            in_flight['now'] -= 1
+        return elapsed, status
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        results = list(pool.map(one, range(requests)))
+    return time.perf_counter() - start, results, in_flight['peak']
+
+
+def run_asgi(path, headers, requests, async_fake):
+    raw_headers = [(k.lower().encode('latin-1'), v.encode('latin-1')) for k, v in headers.items()]
+
+    async def one():
+        scope = {'type': 'http', 'method': 'GET', 'path': path, 'query_string': b'', 'headers': raw_headers}
+        status = {}
+
+        async def receive():
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+        async def send(message):
+            if message['type'] == 'http.response.start':
+                status['code'] = message['status']
+
+        start = time.perf_counter()
+        await asgi.application(scope, receive, send)
+        return time.perf_counter() - start, status.get('code')
+
+    async def burst():
+        return await asyncio.gather(*(one() for _ in range(requests)))
+
+    start = time.perf_counter()
+    results = asyncio.run(burst())
+    return time.perf_counter() - start, results, async_fake.peak_in_flight
+
+
+def report(label, wall, results, peak):
+    latencies = [r[0] for r in results]
+    ok = sum(1 for r in results if r[1] == 200)
+    print(f'{label:<6} {len(results) / wall:>10.1f} {percentile(latencies, 50) * 1000:>10.1f} '
+          f'{percentile(latencies, 95) * 1000:>10.1f} {peak:>10} {ok:>6}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--path', default='/api/meetings', help='async-served GET route to drive')
+    parser.add_argument('--requests', type=int, default=1000)
+    parser.add_argument('--threads', type=int, default=32, help='WSGI worker threads')
+    parser.add_argument('--latency', type=float, default=0.05, help='seconds per database round trip')
+    parser.add_argument('--scale', type=float, default=0.01, help='seeded data volume multiplier')
+    args = parser.parse_args()
+
+    if ('GET', args.path) not in asgi.ROUTES:
+        parser.error(f'{args.path} has no async handler; choose one of {sorted(p for _, p in asgi.ROUTES)}')
+
+    fake = FakeSupabase(latency=args.latency)
+    datasets.seed(fake, scale=args.scale)
+    async_fake = AsyncFakeSupabase(fake)
+    app._supabase_client = fake
+    asgi._async_supabase_client = async_fake
+    headers = {'Authorization': f'Bearer {app.create_token(1, datasets.ADMIN_EMAIL, "admin")}'}
+
+    print(f'GET {args.path}: {args.requests} concurrent requests, {args.latency * 1000:.0f} ms per round trip')
+    print(f'{"mode":<6} {"req/s":>10} {"p50 ms":>10} {"p95 ms":>10} {"in flight":>10} {"ok":>6}')
+    report('wsgi', *run_wsgi(args.path, headers, args.requests, args.threads))
+    report('asgi', *run_asgi(args.path, headers, args.requests, async_fake))
+    print(f'peak RSS {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.0f} MB')
+
+
+if __name__ == '__main__':
+    main()
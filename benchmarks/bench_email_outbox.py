@@ -0,0 +1,97 @@
+"""
+Email outbox throughput against a local SMTP sink.
+
+Compares the old one-connection-per-message path (send_via_smtp) with the
+pooled EmailOutbox. Requires aiosmtpd:
+
+    pip install aiosmtpd
+    python benchmarks/bench_email_outbox.py --messages 200 --workers 4
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+from aiosmtpd.controller import Controller
+from aiosmtpd.smtp import AuthResult
+
+HOST, PORT = '127.0.0.1', 8025
+
+# The app reads SMTP settings at import time
+os.environ.update({
+    'SMTP_SERVER': HOST,
+    'SMTP_PORT': str(PORT),
+    'SMTP_EMAIL': 'bench@example.com',
+    'SMTP_PASS': 'bench',
+    'SMTP_STARTTLS': '0',
+})
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import app  # noqa: E402
+
+
+class Sink:
+    def __init__(self):
+        self.count = 0
+
+    async def handle_DATA(self, server, session, envelope):
+        self.count += 1
+        return '250 OK'
+
+
+def authenticator(server, session, envelope, mechanism, auth_data):
+    return AuthResult(success=True)
+
+
+def bench_direct(n):
+    start = time.perf_counter()
+    for i in range(n):
+        app.send_via_smtp(f'user{i}@example.com', 'Bench', '<p>bench</p>')
+    return time.perf_counter() - start
+
+
+def bench_outbox(n, workers):
+    with tempfile.TemporaryDirectory() as directory:
+        statuses = app.DeliveryStatusStore(os.path.join(directory, 'email_status.db'))
+        outbox = app.EmailOutbox(workers=workers, maxsize=n, statuses=statuses)
+        start = time.perf_counter()
+        for i in range(n):
+            outbox.submit(f'user{i}@example.com', 'Bench', '<p>bench</p>')
+        enqueued = time.perf_counter() - start
+        outbox.join()
+        elapsed = time.perf_counter() - start
+        stats = outbox.stats()
+        outbox.close()
+    return enqueued, elapsed, stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--messages', type=int, default=200)
+    parser.add_argument('--workers', type=int, default=app.EMAIL_WORKERS)
+    args = parser.parse_args()
+
+    sink = Sink()
+    controller = Controller(sink, hostname=HOST, port=PORT,
+                            authenticator=authenticator, auth_require_tls=False)
+    controller.start()
+    try:
+        n = args.messages
+        direct = bench_direct(n)
+        print(f'send_via_smtp:  {n} messages in {direct:.2f}s '
+              f'({n / direct:.1f} msg/s, {n} connections)')
+
+        enqueued, elapsed, stats = bench_outbox(n, args.workers)
+        print(f'EmailOutbox:    {n} messages in {elapsed:.2f}s '
+              f'({n / elapsed:.1f} msg/s, {stats["connections"]} connections, '
+              f'{args.workers} workers)')
+        print(f'  request-path cost: {enqueued / n * 1e6:.1f} us per message')
+        print(f'  sink received {sink.count} messages, {stats["failed"]} failed')
+    finally:
+        controller.stop()
+
+
+if __name__ == '__main__':
+    main()
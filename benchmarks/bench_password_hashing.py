@@ -0,0 +1,135 @@
+"""
+Login throughput vs. password hashing workers, and what a login burst does
+to the latency of an unrelated endpoint.
+
+Drives /api/login from many client threads against the in-memory Supabase
+stand-in while another thread polls /health. "inline" hashes on the request
+thread as before; the numbered rows use the bounded hashing pool with that
+many workers. Request threads wait for their hash either way.
+
+The worker count only matters relative to the cores the process may use.
+--cores pins the run to that many CPUs, so a host with fewer cores than
+this machine can be reproduced. Workers beyond the pinned cores only add
+contention.
+
+    python benchmarks/bench_password_hashing.py --logins 200 --concurrency 32
+    python benchmarks/bench_password_hashing.py --method pbkdf2:sha256:600000 --workers 1,2,4
+    python benchmarks/bench_password_hashing.py --cores 2 --workers 1,2,4
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import app  # noqa: E402
+from fake_supabase import FakeSupabase  # noqa: E402
+from werkzeug.security import generate_password_hash  # noqa: E402
+
+PASSWORD = 'Bench!12345'
+ORIGINAL_RUN_PASSWORD_TASK = app.run_password_task
+
+
+def configure_pool(workers):
+    """Swap the app's hashing pool; workers=None hashes on the request thread"""
+    if app._password_pool is not None:
+        app._password_pool.shutdown(wait=True)
+        app._password_pool = None
+    if workers is None:
+        app.run_password_task = lambda func, *args: func(*args)
+        return
+    app.run_password_task = ORIGINAL_RUN_PASSWORD_TASK
+    app.PASSWORD_HASH_WORKERS = workers
+    app._password_slots = threading.BoundedSemaphore(workers * 8)
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(pct / 100 * len(ordered)))] if ordered else 0.0
+
+
+def run(users, logins, concurrency):
+    local = threading.local()
+    done = threading.Event()
+    health = []
+
+    def login(i):
+        if not hasattr(local, 'client'):
+            local.client = app.app.test_client()
+        email = f'user{i % users}@gmail.com'
+        return local.client.post('/api/login', json={'email': email, 'password': PASSWORD}).status_code
+
+    def poll_health():
+        client = app.app.test_client()
+        while not done.is_set():
+            start = time.perf_counter()
+            client.get('/health')
+            health.append(time.perf_counter() - start)
+            time.sleep(0.005)
+
+    poller = threading.Thread(target=poll_health)
+    poller.start()
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        statuses = list(pool.map(login, range(logins)))
+    wall = time.perf_counter() - start
+    done.set()
+    poller.join()
+
+    return {
+        'logins_per_second': logins / wall,
+        'ok': statuses.count(200),
+        'busy': statuses.count(503),
+        'health_p50_ms': percentile(health, 50) * 1000,
+        'health_p95_ms': percentile(health, 95) * 1000,
+    }
+
+
+def available_cores():
+    return len(os.sched_getaffinity(0)) if hasattr(os, 'sched_getaffinity') else os.cpu_count() or 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--cores', type=int, help='pin the run to this many CPUs (Linux)')
+    parser.add_argument('--logins', type=int, default=200)
+    parser.add_argument('--concurrency', type=int, default=32, help='client threads issuing logins')
+    parser.add_argument('--users', type=int, default=50)
+    parser.add_argument('--method', default=app.PASSWORD_HASH_METHOD, help='Werkzeug hash method')
+    parser.add_argument('--workers', help='comma-separated worker counts (default: 1, 2, 4, cores/2, cores)')
+    parser.add_argument('--latency', type=float, default=0.002, help='seconds per database round trip')
+    args = parser.parse_args()
+
+    if args.cores:
+        os.sched_setaffinity(0, sorted(os.sched_getaffinity(0))[:args.cores])
+    cores = available_cores()
+    if not args.workers:
+        args.workers = ','.join(str(w) for w in sorted({1, 2, 4, cores // 2 or 1, cores}) if w <= cores)
+
+    app.PASSWORD_HASH_METHOD = args.method
+    app.password_hash_prefix.cache_clear()
+    password_hash = generate_password_hash(PASSWORD, args.method)
+    fake = FakeSupabase(latency=args.latency)
+    fake.seed('users', [
+        {'id': i + 1, 'email': f'user{i}@gmail.com', 'role': 'user', 'password_hash': password_hash}
+        for i in range(args.users)
+    ])
+    app._supabase_client = fake
+
+    print(f'{args.method}, {cores} cores, {args.logins} logins from {args.concurrency} client threads')
+    print(f'{"workers":<8} {"logins/s":>10} {"ok":>6} {"503":>6} {"/health p50":>12} {"/health p95":>12}')
+    variants = [None] + [int(w) for w in args.workers.split(',')]
+    for workers in variants:
+        configure_pool(workers)
+        r = run(args.users, args.logins, args.concurrency)
+        label = 'inline' if workers is None else str(workers)
+        print(f'{label:<8} {r["logins_per_second"]:>10.1f} {r["ok"]:>6} {r["busy"]:>6} '
+              f'{r["health_p50_ms"]:>10.2f}ms {r["health_p95_ms"]:>10.2f}ms')
+
+
+if __name__ == '__main__':
+    main()
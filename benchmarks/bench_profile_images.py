@@ -0,0 +1,100 @@
+"""
+Profile picture processing: legacy request-thread path vs render_profile_images.
+
+Each variant runs in its own subprocess so peak RSS is measured per variant.
+CPU time and peak RSS are reported per upload.
+
+    python benchmarks/bench_profile_images.py --width 4032 --height 3024 --uploads 20
+"""
+
+import argparse
+import io
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+
+def make_photo(width, height):
+    from PIL import Image
+    image = Image.radial_gradient('L').resize((width, height)).convert('RGB')
+    output = io.BytesIO()
+    image.save(output, format='JPEG', quality=92)
+    return output.getvalue()
+
+
+def legacy(data):
+    """The pre-pool implementation from api_upload_profile_picture"""
+    from PIL import Image
+    image = Image.open(io.BytesIO(data))
+    if image.mode in ('RGBA', 'LA', 'P'):
+        background = Image.new('RGB', image.size, (255, 255, 255))
+        if image.mode == 'P':
+            image = image.convert('RGBA')
+        if image.mode == 'RGBA':
+            background.paste(image, mask=image.split()[-1])
+        image = background
+    image.thumbnail((800, 800), Image.Resampling.LANCZOS)
+    output = io.BytesIO()
+    image.save(output, format='JPEG', quality=85)
+    return {800: output.getvalue()}
+
+
+def run_variant(variant, width, height, uploads):
+    from app import render_profile_images
+    func = legacy if variant == 'legacy' else render_profile_images
+    data = make_photo(width, height)
+    baseline_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    cpu_start = time.process_time()
+    wall_start = time.perf_counter()
+    for _ in range(uploads):
+        outputs = func(data)
+    cpu = time.process_time() - cpu_start
+    wall = time.perf_counter() - wall_start
+
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(json.dumps({
+        'variant': variant,
+        'input_bytes': len(data),
+        'sizes': sorted(outputs),
+        'cpu_ms_per_upload': cpu / uploads * 1000,
+        'wall_ms_per_upload': wall / uploads * 1000,
+        'peak_rss_mb': peak_rss / 1024,
+        'rss_growth_mb': (peak_rss - baseline_rss) / 1024,
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--width', type=int, default=4032)
+    parser.add_argument('--height', type=int, default=3024)
+    parser.add_argument('--uploads', type=int, default=20)
+    parser.add_argument('--variant', choices=['legacy', 'pool'])
+    args = parser.parse_args()
+
+    if args.variant:
+        run_variant(args.variant, args.width, args.height, args.uploads)
+        return
+
+    print(f'{args.width}x{args.height} JPEG, {args.uploads} uploads per variant')
+    print(f'{"variant":<8} {"sizes":<14} {"cpu ms":>8} {"wall ms":>8} {"peak MB":>8} {"growth MB":>10}')
+    for variant in ('legacy', 'pool'):
+        out = subprocess.run(
+            [sys.executable, __file__, '--variant', variant,
+             '--width', str(args.width), '--height', str(args.height),
+             '--uploads', str(args.uploads)],
+            check=True, capture_output=True, text=True
+        ).stdout
+        r = json.loads(out.strip().splitlines()[-1])
+        print(f'{variant:<8} {",".join(map(str, r["sizes"])):<14} '
+              f'{r["cpu_ms_per_upload"]:>8.1f} {r["wall_ms_per_upload"]:>8.1f} '
+              f'{r["peak_rss_mb"]:>8.1f} {r["rss_growth_mb"]:>10.1f}')
+
+
+if __name__ == '__main__':
+    main()
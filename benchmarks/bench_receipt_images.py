@@ -0,0 +1,73 @@
+"""
+Receipt normalization: bytes saved and processing time per file.
+
+Synthesizes phone-camera receipts (a large JPEG and a PNG with an alpha
+channel, both with EXIF) and runs normalize_receipt_image over them for
+each output format and quality. The numbers are what the background
+receipt processor logs for each file.
+
+    python benchmarks/bench_receipt_images.py
+    python benchmarks/bench_receipt_images.py --width 4032 --height 3024 --qualities 70,80,90 --repeat 5
+"""
+
+import argparse
+import io
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+
+def make_receipt(width, height, image_format):
+    """Paper-coloured noise with dark text lines, EXIF orientation and camera tags"""
+    from PIL import Image, ImageDraw
+    rnd = random.Random(3)
+    image = Image.effect_noise((width, height), 12).convert('RGB')
+    image = Image.blend(image, Image.new('RGB', (width, height), (238, 232, 220)), 0.85)
+    draw = ImageDraw.Draw(image)
+    line = max(height // 60, 8)
+    for y in range(line * 4, height - line * 4, line * 2):
+        draw.rectangle((width // 10, y, width // 10 + rnd.randint(width // 4, width * 3 // 4), y + line // 2),
+                       fill=(40, 40, 40))
+    exif = Image.Exif()
+    exif[0x0112] = 6  # Orientation: rotate 90
+    exif[0x010F] = 'PhoneMaker'
+    exif[0x0110] = 'PhoneModel 12'
+    output = io.BytesIO()
+    if image_format == 'PNG':
+        image.convert('RGBA').save(output, format='PNG', exif=exif)
+    else:
+        image.save(output, format='JPEG', quality=95, exif=exif)
+    return output.getvalue()
+
+
+def main():
+    from app import normalize_receipt_image
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--width', type=int, default=3024)
+    parser.add_argument('--height', type=int, default=4032)
+    parser.add_argument('--max-edge', type=int, default=1600)
+    parser.add_argument('--formats', default='webp,jpeg')
+    parser.add_argument('--qualities', default='70,80,90')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    inputs = {kind: make_receipt(args.width, args.height, kind) for kind in ('JPEG', 'PNG')}
+    print(f'{args.width}x{args.height} receipts, longest edge capped at {args.max_edge}')
+    print(f'{"input":<6} {"format":<6} {"quality":>7} {"in KB":>8} {"out KB":>8} {"saved":>7} '
+          f'{"preview KB":>10} {"ms/file":>8}')
+    for kind, data in inputs.items():
+        for image_format in args.formats.split(','):
+            for quality in (int(q) for q in args.qualities.split(',')):
+                start = time.perf_counter()
+                for _ in range(args.repeat):
+                    image, preview = normalize_receipt_image(data, image_format, quality, args.max_edge)
+                elapsed = (time.perf_counter() - start) / args.repeat
+                print(f'{kind:<6} {image_format:<6} {quality:>7} {len(data) / 1024:>8.0f} {len(image) / 1024:>8.0f} '
+                      f'{1 - len(image) / len(data):>7.0%} {len(preview) / 1024:>10.1f} {elapsed * 1000:>8.1f}')
+
+
+if __name__ == '__main__':
+    main()
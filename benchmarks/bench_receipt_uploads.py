@@ -0,0 +1,138 @@
+"""
+Worker memory during concurrent receipt uploads: whole-file buffering vs
+the streamed, content-addressed path in save_uploaded_file.
+
+Fires concurrent POST /api/budget/transactions with a large receipt each
+against the in-memory Supabase stand-in. The stand-in counts the bytes it
+receives and does not keep them. "buffered" is the previous implementation,
+which read every file into memory before one upload. "streaming" is the
+current one. Each variant runs in its own subprocess so peak RSS is its
+own. A second round re-uploads the same files to show deduplication.
+
+    python benchmarks/bench_receipt_uploads.py
+    python benchmarks/bench_receipt_uploads.py --uploads 50 --size-mb 20 --latency 0.05
+"""
+
+import argparse
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+BLOCK = 64 * 1024
+
+
+class SyntheticReceipt:
+    """Read-only file of `size` bytes unique to `seed`, generated as it is read"""
+
+    def __init__(self, size, seed):
+        self.size = size
+        self.block = random.Random(seed).randbytes(BLOCK)
+        self.position = 0
+
+    def read(self, n=-1):
+        remaining = self.size - self.position
+        n = remaining if n is None or n < 0 else min(n, remaining)
+        start = self.position % BLOCK
+        chunk = (self.block[start:] + self.block * (n // BLOCK + 1))[:n]
+        self.position += n
+        return chunk
+
+
+def buffered_save(file_storage, bucket_name):
+    """The pre-streaming save_uploaded_file: read the whole file, upload once"""
+    import app
+    unique = f"{uuid.uuid4().hex}_{file_storage.filename}"
+    content = file_storage.read()
+    app.get_supabase().storage.from_(bucket_name).upload(unique, content)
+    return unique, True
+
+
+def run_variant(variant, uploads, size, latency):
+    import app
+    import datasets
+    from fake_supabase import FakeSupabase
+    from flask import Request
+
+    fake = FakeSupabase(latency=latency, keep_objects=False)
+    datasets.seed(fake, scale=0.001)
+    app._supabase_client = fake
+    app.app.config['MAX_CONTENT_LENGTH'] = size + 1024 * 1024
+    # The synthetic receipts are not images; measure the upload path alone
+    app.RECEIPT_NORMALIZE = False
+    if variant == 'buffered':
+        app.app.request_class = Request
+        app.save_uploaded_file = buffered_save
+    headers = {'Authorization': f'Bearer {app.create_token(1, datasets.ADMIN_EMAIL, "admin")}'}
+    local = threading.local()
+
+    def upload(seed):
+        if not hasattr(local, 'client'):
+            local.client = app.app.test_client()
+        data = {
+            'category': datasets.CATEGORIES[0], 'amount': '120.50', 'description': 'Receipt upload',
+            'receipt': (SyntheticReceipt(size, seed), 'receipt.jpg', 'image/jpeg'),
+        }
+        return local.client.post('/api/budget/transactions', data=data, headers=headers).status_code
+
+    def burst():
+        before = fake.uploaded_bytes
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=uploads) as pool:
+            statuses = list(pool.map(upload, range(uploads)))
+        return time.perf_counter() - start, statuses.count(201), fake.uploaded_bytes - before
+
+    baseline_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    first = burst()
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    repeat = burst()
+    print(json.dumps({
+        'variant': variant,
+        'wall_s': first[0],
+        'ok': first[1],
+        'stored_mb': first[2] / 2 ** 20,
+        'repeat_wall_s': repeat[0],
+        'repeat_stored_mb': repeat[2] / 2 ** 20,
+        'objects': len(fake.buckets.get(app.SUPABASE_RECEIPT_BUCKET, {})),
+        'peak_rss_mb': peak_rss / 1024,
+        'rss_growth_mb': (peak_rss - baseline_rss) / 1024,
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--uploads', type=int, default=50, help='concurrent uploads per round')
+    parser.add_argument('--size-mb', type=float, default=20)
+    parser.add_argument('--latency', type=float, default=0.02, help='seconds per database/storage round trip')
+    parser.add_argument('--variant', choices=['buffered', 'streaming'])
+    args = parser.parse_args()
+    size = int(args.size_mb * 2 ** 20)
+
+    if args.variant:
+        run_variant(args.variant, args.uploads, size, args.latency)
+        return
+
+    print(f'{args.uploads} concurrent {args.size_mb:g} MB receipts, then the same files again')
+    print(f'{"variant":<10} {"wall s":>8} {"ok":>5} {"stored MB":>10} {"repeat MB":>10} {"objects":>8} '
+          f'{"peak MB":>9} {"growth MB":>10}')
+    for variant in ('buffered', 'streaming'):
+        out = subprocess.run(
+            [sys.executable, __file__, '--variant', variant, '--uploads', str(args.uploads),
+             '--size-mb', str(args.size_mb), '--latency', str(args.latency)],
+            check=True, capture_output=True, text=True
+        ).stdout
+        r = json.loads(out.strip().splitlines()[-1])
+        print(f'{variant:<10} {r["wall_s"]:>8.2f} {r["ok"]:>5} {r["stored_mb"]:>10.0f} {r["repeat_stored_mb"]:>10.0f} '
+              f'{r["objects"]:>8} {r["peak_rss_mb"]:>9.1f} {r["rss_growth_mb"]:>10.1f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+"""
+Bytes on the wire and serialization CPU per endpoint.
+
+Compares the stdlib JSON provider with OrjsonProvider, each uncompressed
+and with gzip / brotli negotiated through Accept-Encoding. Runs the Flask
+app against the in-memory Supabase stand-in.
+
+    python benchmarks/bench_responses.py --students 2000 --transactions 50000
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import app  # noqa: E402
+from flask.json.provider import DefaultJSONProvider  # noqa: E402
+from fake_supabase import FakeSupabase  # noqa: E402
+from datasets import seed  # noqa: E402
+
+ENDPOINTS = ['/api/students', '/api/budget', '/api/tasks', '/api/meetings']
+
+
+def run(client, path, headers, encoding, repeat):
+    request_headers = dict(headers)
+    if encoding:
+        request_headers['Accept-Encoding'] = encoding
+    cpu = time.process_time()
+    for _ in range(repeat):
+        response = client.get(path, headers=request_headers)
+    cpu = (time.process_time() - cpu) / repeat
+    return len(response.get_data()), response.headers.get('Content-Encoding', 'identity'), cpu
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--students', type=int, default=2000)
+    parser.add_argument('--transactions', type=int, default=50000)
+    parser.add_argument('--tasks', type=int, default=10000)
+    parser.add_argument('--meetings', type=int, default=5000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    fake = FakeSupabase()
+    seed(fake, tasks=args.tasks, transactions=args.transactions, students=args.students, meetings=args.meetings)
+    app._supabase_client = fake
+    client = app.app.test_client()
+    headers = {'Authorization': f'Bearer {app.create_token(1, "admin@admin.com", "admin")}'}
+
+    providers = [('stdlib', DefaultJSONProvider(app.app))]
+    if app.ORJSON_AVAILABLE:
+        providers.append(('orjson', app.OrjsonProvider(app.app)))
+    encodings = [None, 'gzip'] + (['br'] if app.BROTLI_AVAILABLE else [])
+
+    print(f'{"endpoint":<16} {"encoder":<8} {"coding":<9} {"bytes":>12} {"cpu ms/req":>11}')
+    for path in ENDPOINTS:
+        for name, provider in providers:
+            app.app.json = provider
+            for encoding in encodings:
+                size, coding, cpu = run(client, path, headers, encoding, args.repeat)
+                print(f'{path:<16} {name:<8} {coding:<9} {size:>12,} {cpu * 1000:>11.1f}')
+
+
+if __name__ == '__main__':
+    main()
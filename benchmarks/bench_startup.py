@@ -0,0 +1,115 @@
+"""
+Cold-start budget: time from a fresh interpreter running its first line to
+having served /health, plus an `-X importtime` breakdown of what
+`import app` loads.
+
+Every run is a fresh interpreter. The script exits with status 1 when the
+median boot-to-/health time is over --budget-ms, or when a module that
+should load lazily (PIL, supabase, smtplib, ...) is imported at startup,
+so it can gate CI.
+
+    python benchmarks/bench_startup.py
+    python benchmarks/bench_startup.py --runs 10 --budget-ms 300 --top 15
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+# Must not be loaded until a request needs them
+LAZY_MODULES = ('PIL', 'supabase', 'httpx', 'postgrest', 'storage3', 'gotrue', 'smtplib', 'email.mime',
+                'jwt', 'cryptography', 'sqlite3', 'multiprocessing', 'concurrent.futures.process')
+
+BOOT_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import app
+imported = time.perf_counter()
+response = app.app.test_client().get('/health')
+served = time.perf_counter()
+print(json.dumps({
+    'import_ms': (imported - start) * 1000,
+    'health_ms': (served - start) * 1000,
+    'status': response.status_code,
+    'loaded': [m for m in %r if m in sys.modules],
+}))
+"""
+
+
+def probe_env():
+    env = dict(os.environ)
+    # Startup must not depend on credentials or a reachable project
+    env.pop('SUPABASE_URL', None)
+    env.pop('SUPABASE_KEY', None)
+    env['LOG_LEVEL'] = 'WARNING'
+    return env
+
+
+def boot_once():
+    output = subprocess.run(
+        [sys.executable, '-c', BOOT_PROBE % (LAZY_MODULES,)],
+        cwd=ROOT, env=probe_env(), capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def import_breakdown():
+    """Cumulative import time of each package app.py imports directly, in ms"""
+    stderr = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import app'],
+        cwd=ROOT, env=probe_env(), capture_output=True, text=True, check=True
+    ).stderr
+    totals = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        _, cumulative, column = line[len('import time:'):].split('|')
+        if not cumulative.strip().isdigit():
+            continue
+        # The name column is indented two spaces per nesting level; imports
+        # made by app.py itself sit one level below the top
+        depth = (len(column) - len(column.lstrip(' ')) - 1) // 2
+        if depth == 1:
+            package = column.strip().split('.')[0]
+            totals[package] = totals.get(package, 0) + int(cumulative) / 1000
+    return totals
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--budget-ms', type=float, default=float(os.getenv('STARTUP_BUDGET_MS', 500)),
+                        help='maximum median time from the first line of a fresh process to a served /health')
+    parser.add_argument('--top', type=int, default=10, help='packages to list in the import breakdown')
+    args = parser.parse_args()
+
+    runs = [boot_once() for _ in range(args.runs)]
+    import_ms = statistics.median(r['import_ms'] for r in runs)
+    health_ms = statistics.median(r['health_ms'] for r in runs)
+    loaded = sorted({m for r in runs for m in r['loaded']})
+
+    print(f'import app       {import_ms:>8.1f} ms (median of {args.runs})')
+    print(f'first /health    {health_ms:>8.1f} ms (budget {args.budget_ms:.0f} ms)')
+    print('\nslowest imports made by app.py (-X importtime, cumulative):')
+    for name, ms in sorted(import_breakdown().items(), key=lambda item: -item[1])[:args.top]:
+        print(f'  {name:<28} {ms:>8.1f} ms')
+
+    failed = False
+    if loaded:
+        print(f'\n❌ loaded at startup but should be lazy: {", ".join(loaded)}')
+        failed = True
+    if health_ms > args.budget_ms:
+        print(f'\n❌ boot to /health {health_ms:.1f} ms exceeds the {args.budget_ms:.0f} ms budget')
+        failed = True
+    if not failed:
+        print('\n✅ within the cold-start budget')
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,81 @@
+"""
+Storage deletion: request-path cost and round trips of inline remove()
+calls vs the durable cleanup queue, and what the orphan reconcile finds.
+
+Runs against the in-memory Supabase stand-in with a fixed storage latency
+standing in for the network. The queue lives in a temporary SQLite file.
+
+    python benchmarks/bench_storage_cleanup.py --deletions 500 --latency 0.05 --batch 100
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import app  # noqa: E402
+from fake_supabase import FakeSupabase  # noqa: E402
+
+
+def fill_bucket(fake, bucket_name, names):
+    fake.buckets.setdefault(bucket_name, {}).update((name, b'x') for name in names)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--deletions', type=int, default=500)
+    parser.add_argument('--latency', type=float, default=0.05, help='seconds per storage round trip')
+    parser.add_argument('--batch', type=int, default=100, help='objects per remove() call')
+    parser.add_argument('--orphans', type=int, default=200)
+    args = parser.parse_args()
+
+    fake = FakeSupabase(latency=0.0, storage_latency=args.latency)
+    app._supabase_client = fake
+    bucket_name = app.SUPABASE_RECEIPT_BUCKET
+    names = [f'{i:064x}.webp' for i in range(args.deletions)]
+
+    print(f'{args.deletions} deletions, {args.latency * 1000:.0f} ms per storage round trip')
+    print(f'{"variant":<10} {"per request ms":>15} {"round trips":>12} {"drain s":>9}')
+
+    fill_bucket(fake, bucket_name, names)
+    fake.round_trips = 0
+    start = time.perf_counter()
+    for name in names:
+        fake.storage.from_(bucket_name).remove([name])
+    inline = time.perf_counter() - start
+    print(f'{"inline":<10} {inline / args.deletions * 1000:>15.2f} {fake.round_trips:>12} {"-":>9}')
+
+    with tempfile.TemporaryDirectory() as directory:
+        cleanup = app.StorageCleanupQueue(path=os.path.join(directory, 'cleanup.db'), batch_size=args.batch,
+                                          reconcile_interval=0)
+        cleanup.start = lambda: None  # drained below, not by the background thread
+        app.storage_cleanup = cleanup
+
+        fill_bucket(fake, bucket_name, names)
+        fake.round_trips = 0
+        start = time.perf_counter()
+        for name in names:
+            cleanup.enqueue(bucket_name, [name])
+        enqueue = time.perf_counter() - start
+        start = time.perf_counter()
+        cleanup.drain()
+        drain = time.perf_counter() - start
+        print(f'{"queued":<10} {enqueue / args.deletions * 1000:>15.2f} {fake.round_trips:>12} {drain:>9.2f}')
+        assert not fake.buckets[bucket_name], 'queue left objects behind'
+
+        referenced = names[:args.deletions // 2]
+        fake.seed('budget_transactions', [{'id': i + 1, 'receipt': name} for i, name in enumerate(referenced)])
+        fake.seed('users', [{'id': 1, 'profile_picture': None}])
+        fill_bucket(fake, bucket_name, referenced + [f'orphan_{i}.pdf' for i in range(args.orphans)])
+        start = time.perf_counter()
+        found = app.reconcile_storage_orphans(min_age=0)
+        removed = cleanup.drain()
+        print(f'\nreconcile: {found} orphans found, {removed} removed in {time.perf_counter() - start:.2f} s, '
+              f'{len(fake.buckets[bucket_name])} referenced objects kept')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+"""
+Round trips and wall time: 100 single-task requests vs one /api/tasks/batch.
+
+Runs the Flask app against the in-memory Supabase stand-in with a fixed
+per-query latency standing in for the network.
+
+    python benchmarks/bench_task_batch.py --items 100 --latency 0.02
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import app  # noqa: E402
+from fake_supabase import FakeSupabase  # noqa: E402
+
+
+def measure(fake, label, fn):
+    fake.round_trips = 0
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    print(f'{label:<32} {fake.round_trips:>6} round trips {elapsed * 1000:>10.1f} ms')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--items', type=int, default=100)
+    parser.add_argument('--latency', type=float, default=0.02, help='seconds per database round trip')
+    args = parser.parse_args()
+
+    fake = FakeSupabase(latency=args.latency)
+    app._supabase_client = fake
+    client = app.app.test_client()
+    headers = {'Authorization': f'Bearer {app.create_token(1, "bench@gmail.com", "admin")}'}
+    n = args.items
+
+    ids = []
+
+    def single_create():
+        for i in range(n):
+            r = client.post('/api/tasks', json={'title': f'Task {i}'}, headers=headers)
+            ids.append(r.get_json()['task']['id'])
+
+    def single_update():
+        for task_id in ids:
+            client.patch(f'/api/tasks/{task_id}', json={'completed': True}, headers=headers)
+
+    def single_delete():
+        for task_id in ids:
+            client.delete(f'/api/tasks/{task_id}', headers=headers)
+
+    batch_ids = []
+
+    def batch_create():
+        ops = [{'op': 'create', 'data': {'title': f'Task {i}'}} for i in range(n)]
+        r = client.post('/api/tasks/batch', json={'operations': ops}, headers=headers)
+        batch_ids.extend(item['id'] for item in r.get_json()['results'])
+
+    def batch_update():
+        ops = [{'op': 'update', 'id': task_id, 'data': {'completed': True}} for task_id in batch_ids]
+        client.post('/api/tasks/batch', json={'operations': ops}, headers=headers)
+
+    def batch_delete():
+        ops = [{'op': 'delete', 'id': task_id} for task_id in batch_ids]
+        client.post('/api/tasks/batch', json={'operations': ops}, headers=headers)
+
+    print(f'{n} items, {args.latency * 1000:.0f} ms per round trip')
+    measure(fake, f'create x{n} (single)', single_create)
+    measure(fake, f'create x{n} (batch)', batch_create)
+    measure(fake, f'mark complete x{n} (single)', single_update)
+    measure(fake, f'mark complete x{n} (batch)', batch_update)
+    measure(fake, f'delete x{n} (single)', single_delete)
+    measure(fake, f'delete x{n} (batch)', batch_delete)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,105 @@
+"""
+Runs the same rate limit hits through every backend and fails if any of
+them disagrees with the in-process GCRA reference.
+
+The Redis backend's Lua script runs against fakeredis, an in-process Redis
+stand-in, or against a real server with --redis-url. fakeredis needs lupa
+to execute Lua:
+
+    pip install fakeredis lupa
+    python benchmarks/check_rate_limit_backends.py
+    python benchmarks/check_rate_limit_backends.py --redis-url redis://localhost:6379/15
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import uuid
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import app  # noqa: E402
+
+LIMIT, WINDOW = 5, 60
+
+
+def sequential(backend, hits):
+    """(allowed, retry_after) for `hits` back-to-back hits on one fresh key"""
+    key = uuid.uuid4().hex
+    return [backend.hit(key, LIMIT, WINDOW) for _ in range(hits)]
+
+
+def concurrent(backend, threads):
+    """Allowed count when `threads` threads hit one fresh key at once"""
+    key = uuid.uuid4().hex
+    barrier = threading.Barrier(threads)
+    allowed = []
+
+    def hit():
+        barrier.wait()
+        allowed.append(backend.hit(key, LIMIT, WINDOW)[0])
+
+    workers = [threading.Thread(target=hit) for _ in range(threads)]
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+    return sum(allowed)
+
+
+def redis_backend(url):
+    if url:
+        import redis
+        client = redis.Redis.from_url(url)
+    else:
+        import fakeredis
+        client = fakeredis.FakeRedis()
+    return app.RedisRateLimitBackend(client=client, prefix=f'check:{uuid.uuid4().hex}:')
+
+
+def compare(name, backend, reference, threads):
+    """Error message, or None when the backend matches the reference"""
+    results = sequential(backend, len(reference))
+    for i, ((allowed, retry), (want_allowed, want_retry)) in enumerate(zip(results, reference)):
+        if allowed != want_allowed or abs(retry - want_retry) > 0.5:
+            return f'hit {i + 1}: allowed={allowed} retry_after={retry:.2f}, expected {want_allowed} {want_retry:.2f}'
+    allowed = concurrent(backend, threads)
+    if allowed != LIMIT:
+        return f'{allowed} of {threads} concurrent hits allowed, expected {LIMIT}'
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--redis-url', help='check against this server instead of fakeredis')
+    parser.add_argument('--threads', type=int, default=32)
+    args = parser.parse_args()
+
+    reference = sequential(app.MemoryRateLimitBackend(), LIMIT + 3)
+    failed = False
+    with tempfile.TemporaryDirectory() as directory:
+        factories = {
+            'memory': app.MemoryRateLimitBackend,
+            'sqlite': lambda: app.SQLiteRateLimitBackend(path=os.path.join(directory, 'rate_limits.db')),
+            'redis': lambda: redis_backend(args.redis_url),
+        }
+        for name, factory in factories.items():
+            try:
+                error = compare(name, factory(), reference, args.threads)
+            except ImportError as e:
+                error = f'{e.name} not installed (pip install fakeredis lupa, or pass --redis-url)'
+            except Exception as e:
+                error = f'{type(e).__name__}: {e}'
+            if error:
+                print(f'❌ {name:<7} {error}')
+                failed = True
+            else:
+                print(f'✅ {name:<7} {LIMIT} of {len(reference)} sequential hits allowed, '
+                      f'{LIMIT} of {args.threads} concurrent')
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,70 @@
+"""
+Realistic data volumes for the in-memory Supabase stand-in.
+
+Default volumes: 10k tasks, 50k budget transactions, 2k students and 5k
+meetings. `scale` multiplies all of them.
+"""
+
+import json
+import random
+
+from werkzeug.security import generate_password_hash
+
+ADMIN_EMAIL = 'admin@admin.com'
+STUDENT_EMAIL = 'student1@gmail.com'
+PASSWORD = 'Bench!12345'
+CATEGORIES = ['Supplies', 'Events', 'Transport', 'Food', 'Printing', 'Uniforms', 'Sports', 'Misc']
+
+
+def seed(fake, tasks=10000, transactions=50000, students=2000, meetings=5000, scale=1.0, rnd=None):
+    """Populate `fake` and return the seeded volumes"""
+    rnd = rnd or random.Random(7)
+    tasks, transactions = int(tasks * scale), int(transactions * scale)
+    students, meetings = max(int(students * scale), 1), int(meetings * scale)
+    password_hash = generate_password_hash(PASSWORD)
+
+    users = [{
+        'id': 1, 'role': 'admin', 'email': ADMIN_EMAIL, 'password_hash': password_hash,
+        'first_name': 'Admin', 'last_name': 'User', 'display_name': 'Admin User', 'two_fa_verified': True,
+    }]
+    for i in range(1, students + 1):
+        users.append({
+            'id': i + 1, 'role': 'user', 'email': f'student{i}@gmail.com', 'password_hash': password_hash,
+            'first_name': 'Student', 'last_name': f'{i:05d}', 'display_name': f'Student {i:05d}',
+            'school': 'Likhayag National High School', 'strand': rnd.choice(['STEM', 'ABM', 'HUMSS', 'GAS']),
+            'grade_level': rnd.choice(['11', '12']), 'school_year': '2026-2027', 'lrn': f'{100000000000 + i}',
+            'status': 'Active Student', 'two_fa_verified': True,
+            'profile_picture': f'https://fake.supabase.co/storage/v1/object/public/profile-pictures/profile_{i + 1}.jpg',
+        })
+    fake.seed('users', users)
+
+    fake.seed('tasks', [{
+        'id': i, 'title': f'{rnd.choice(["Read", "Write", "Review", "Submit"])} task {i}',
+        'notes': rnd.choice(['', 'Answer the exercises at the end of the chapter', 'Group work']),
+        'priority': rnd.choice(['high', 'medium', 'low']), 'status': rnd.choice(['pending', 'in-progress', 'done']),
+        'progress': rnd.randint(0, 100), 'type': rnd.choice(['assignment', 'project', 'exam', 'reading']),
+        'completed': rnd.random() < 0.3,
+        'due': None if rnd.random() < 0.1 else f'2026-{rnd.randint(9, 12):02d}-{rnd.randint(1, 28):02d}',
+        'created_at': f'2026-{rnd.randint(6, 10):02d}-{rnd.randint(1, 28):02d}T08:{rnd.randint(0, 59):02d}:00+00:00',
+    } for i in range(1, tasks + 1)])
+
+    fake.seed('budget_categories', [
+        {'id': i, 'name': name, 'budget': float(rnd.randint(5, 50) * 1000)} for i, name in enumerate(CATEGORIES, 1)
+    ])
+    fake.seed('budget_transactions', [{
+        'id': i, 'type': 'income' if rnd.random() < 0.2 else 'expense', 'category': rnd.choice(CATEGORIES),
+        'description': f'Transaction {i}', 'amount': round(rnd.uniform(10, 5000), 2),
+        'date': f'2026-{rnd.randint(1, 12):02d}-{rnd.randint(1, 28):02d}',
+        'receipt': f'{i:08x}_receipt.jpg' if rnd.random() < 0.3 else None, 'added_by': 1,
+    } for i in range(1, transactions + 1)])
+
+    student_emails = [u['email'] for u in users[1:]]
+    fake.seed('meetings', [{
+        'id': i, 'title': f'Meeting {i}', 'type': rnd.choice(['Class', 'Club', 'Council']),
+        'purpose': 'Weekly sync', 'location': f'Room {rnd.randint(100, 400)}', 'meet_link': '',
+        'datetime': f'2026-{rnd.randint(9, 12):02d}-{rnd.randint(1, 28):02d}T{rnd.randint(7, 17):02d}:00:00',
+        'status': 'Not Started',
+        'attendees': json.dumps(['all'] if rnd.random() < 0.2 else rnd.sample(student_emails, min(5, len(student_emails)))),
+    } for i in range(1, meetings + 1)])
+
+    return {'tasks': tasks, 'transactions': transactions, 'students': students, 'meetings': meetings}
@@ -0,0 +1,728 @@
+"""
+In-memory stand-in for the supabase-py client used by app.py.
+
+Implements the fluent PostgREST builder the API relies on
+(table().select().eq().in_().or_().not_.is_().order().limit(),
+insert/upsert/update/delete, rpc) and the storage bucket calls
+(upload, create_signed_url(s), get_public_url, remove, list).
+
+Every execute() and storage call counts as one round trip and can sleep for
+a configurable latency. AsyncFakeSupabase exposes the same data the way
+supabase's AsyncClient does, with awaitable execute() and storage calls. The database triggers from supabase/migrations are
+emulated so ETags, delta sync, meeting attendees and budget totals behave
+as they do against a real project.
+"""
+
+import asyncio
+import contextvars
+import re
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+
+class FakeResponse:
+    def __init__(self, data=None, error=None):
+        self.data = data
+        self.error = error
+
+
+# ----- PostgREST filter helpers -----
+
+def _coerce(row_value, value):
+    """Convert a filter value to the type of the stored value"""
+    if value is None or row_value is None:
+        return value
+    if isinstance(row_value, bool):
+        return str(value).lower() == 'true' if not isinstance(value, bool) else value
+    try:
+        if isinstance(row_value, int):
+            return int(value)
+        if isinstance(row_value, float):
+            return float(value)
+    except (TypeError, ValueError):
+        return str(value)
+    return str(value) if not isinstance(value, str) else value
+
+
+def _compare(row_value, op, value):
+    if op == 'is':
+        target = {'null': None, 'true': True, 'false': False}.get(str(value).lower(), value)
+        return row_value is target if target is None else row_value == target
+    if op == 'in':
+        return str(row_value) in {str(v) for v in value}
+    if op in ('like', 'ilike'):
+        if row_value is None:
+            return False
+        return _like_regex(str(value), op == 'ilike').fullmatch(str(row_value)) is not None
+    if row_value is None:
+        return False
+    value = _coerce(row_value, value)
+    try:
+        if op == 'eq':
+            return row_value == value
+        if op == 'neq':
+            return row_value != value
+        if op == 'gt':
+            return row_value > value
+        if op == 'gte':
+            return row_value >= value
+        if op == 'lt':
+            return row_value < value
+        if op == 'lte':
+            return row_value <= value
+    except TypeError:
+        return False
+    raise ValueError(f'Unsupported operator {op}')
+
+
+def _like_regex(pattern, ignore_case):
+    out, escaped = [], False
+    for ch in pattern:
+        if escaped:
+            out.append(re.escape(ch))
+            escaped = False
+        elif ch == '\\':
+            escaped = True
+        elif ch in '%*':
+            out.append('.*')
+        elif ch == '_':
+            out.append('.')
+        else:
+            out.append(re.escape(ch))
+    return re.compile(''.join(out), re.IGNORECASE | re.DOTALL if ignore_case else re.DOTALL)
+
+
+def _split_top_level(text):
+    parts, depth, quoted, escaped, current = [], 0, False, False, []
+    for ch in text:
+        if escaped:
+            current.append(ch)
+            escaped = False
+            continue
+        if ch == '\\' and quoted:
+            current.append(ch)
+            escaped = True
+            continue
+        if ch == '"':
+            quoted = not quoted
+        elif not quoted and ch == '(':
+            depth += 1
+        elif not quoted and ch == ')':
+            depth -= 1
+        elif not quoted and depth == 0 and ch == ',':
+            parts.append(''.join(current))
+            current = []
+            continue
+        current.append(ch)
+    if current:
+        parts.append(''.join(current))
+    return parts
+
+
+def _unquote(value):
+    if len(value) >= 2 and value[0] == value[-1] == '"':
+        return re.sub(r'\\(.)', r'\1', value[1:-1])
+    return value
+
+
+def parse_logic_tree(text, combine=any):
+    """Compile a PostgREST or/and filter string into a row predicate"""
+    terms = []
+    for part in _split_top_level(text):
+        part = part.strip()
+        for name, fn in (('and(', all), ('or(', any)):
+            if part.startswith(name) and part.endswith(')'):
+                terms.append(parse_logic_tree(part[len(name):-1], fn))
+                break
+        else:
+            column, rest = part.split('.', 1)
+            negate = rest.startswith('not.')
+            if negate:
+                rest = rest[4:]
+            op, value = rest.split('.', 1)
+            value = _unquote(value)
+            if op == 'in':
+                value = [_unquote(v) for v in _split_top_level(value.strip('()'))]
+            terms.append(_column_predicate(column, op, value, negate))
+    return lambda row: combine(term(row) for term in terms)
+
+
+def _column_predicate(column, op, value, negate=False):
+    def predicate(row):
+        result = _compare(row.get(column), op, value)
+        return not result if negate else result
+    return predicate
+
+
+# ----- Query builder -----
+
+class _Negated:
+    """`query.not_` proxy: negates the next filter"""
+
+    def __init__(self, query):
+        self._query = query
+
+    def __getattr__(self, name):
+        method = getattr(self._query, name)
+
+        def negated(*args, **kwargs):
+            self._query.negate_next = True
+            return method(*args, **kwargs)
+        return negated
+
+
+class FakeQuery:
+    def __init__(self, client, table):
+        self.client = client
+        self.table = table
+        self.action = 'select'
+        self.payload = None
+        self.filters = []
+        self.embedded = {}
+        self.orders = []
+        self.row_limit = None
+        self.row_offset = 0
+        self.on_conflict = 'id'
+        self.negate_next = False
+
+    # ----- actions -----
+
+    def select(self, columns='*', *more, **kwargs):
+        self.action = 'select' if self.action == 'select' else self.action
+        for relation, join in re.findall(r'(\w+)(!inner)?\(', columns):
+            self.embedded[relation] = bool(join)
+        return self
+
+    def insert(self, rows, **kwargs):
+        self.action, self.payload = 'insert', rows
+        return self
+
+    def upsert(self, rows, on_conflict='id', **kwargs):
+        self.action, self.payload, self.on_conflict = 'upsert', rows, on_conflict
+        return self
+
+    def update(self, patch, **kwargs):
+        self.action, self.payload = 'update', patch
+        return self
+
+    def delete(self, **kwargs):
+        self.action = 'delete'
+        return self
+
+    # ----- filters -----
+
+    @property
+    def not_(self):
+        return _Negated(self)
+
+    def _filter(self, column, op, value):
+        negate, self.negate_next = self.negate_next, False
+        if '.' in column:
+            relation, column = column.split('.', 1)
+            self.filters.append(self._embedded_predicate(relation, column, op, value, negate))
+        else:
+            self.filters.append(_column_predicate(column, op, value, negate))
+        return self
+
+    def _embedded_predicate(self, relation, column, op, value, negate):
+        # Inner-joined embed: keep rows with a related row matching the filter
+        foreign_key = f"{self.table.rstrip('s')}_id"
+
+        def predicate(row):
+            related = self.client.tables.get(relation, [])
+            hit = any(
+                str(r.get(foreign_key)) == str(row.get('id')) and _compare(r.get(column), op, value)
+                for r in related
+            )
+            return not hit if negate else hit
+        return predicate
+
+    def eq(self, column, value):
+        return self._filter(column, 'eq', value)
+
+    def neq(self, column, value):
+        return self._filter(column, 'neq', value)
+
+    def gt(self, column, value):
+        return self._filter(column, 'gt', value)
+
+    def gte(self, column, value):
+        return self._filter(column, 'gte', value)
+
+    def lt(self, column, value):
+        return self._filter(column, 'lt', value)
+
+    def lte(self, column, value):
+        return self._filter(column, 'lte', value)
+
+    def like(self, column, pattern):
+        return self._filter(column, 'like', pattern)
+
+    def ilike(self, column, pattern):
+        return self._filter(column, 'ilike', pattern)
+
+    def is_(self, column, value):
+        return self._filter(column, 'is', value)
+
+    def in_(self, column, values):
+        return self._filter(column, 'in', list(values))
+
+    def or_(self, filters, **kwargs):
+        negate, self.negate_next = self.negate_next, False
+        predicate = parse_logic_tree(filters)
+        self.filters.append((lambda row: not predicate(row)) if negate else predicate)
+        return self
+
+    def order(self, column, desc=False, nullsfirst=None, **kwargs):
+        self.orders.append((column, desc, desc if nullsfirst is None else nullsfirst))
+        return self
+
+    def limit(self, count, **kwargs):
+        self.row_limit = count
+        return self
+
+    def range(self, start, end, **kwargs):
+        self.row_offset, self.row_limit = start, end - start + 1
+        return self
+
+    # ----- execution -----
+
+    def execute(self):
+        self.client.round_trip()
+        with self.client.lock:
+            return FakeResponse(self._run())
+
+    def _run(self):
+        client = self.client
+        rows = client.tables.setdefault(self.table, [])
+
+        if self.action in ('insert', 'upsert'):
+            new_rows = self.payload if isinstance(self.payload, list) else [self.payload]
+            created, updated = [], []
+            for values in new_rows:
+                existing = None
+                if self.action == 'upsert' and values.get(self.on_conflict) is not None:
+                    existing = next((r for r in rows if str(r.get(self.on_conflict)) == str(values[self.on_conflict])), None)
+                if existing is not None:
+                    old = dict(existing)
+                    existing.update(values)
+                    generate_columns(self.table, existing)
+                    updated.append((old, existing))
+                else:
+                    row = client.new_row(self.table, values)
+                    rows.append(row)
+                    created.append(row)
+            client.fire('INSERT', self.table, [(None, r) for r in created])
+            client.fire('UPDATE', self.table, updated)
+            return [dict(r) for r in created] + [dict(r) for _, r in updated]
+
+        matched = [r for r in rows if all(f(r) for f in self.filters)]
+
+        if self.action == 'update':
+            changes = []
+            for r in matched:
+                old = dict(r)
+                r.update(self.payload)
+                generate_columns(self.table, r)
+                changes.append((old, r))
+            client.fire('UPDATE', self.table, changes)
+            return [dict(r) for r in matched]
+
+        if self.action == 'delete':
+            ids = {id(r) for r in matched}
+            rows[:] = [r for r in rows if id(r) not in ids]
+            client.fire('DELETE', self.table, [(r, None) for r in matched])
+            return [dict(r) for r in matched]
+
+        for column, desc, nulls_first in reversed(self.orders):
+            present = [r for r in matched if r.get(column) is not None]
+            missing = [r for r in matched if r.get(column) is None]
+            present.sort(key=lambda r: r.get(column), reverse=desc)
+            matched = missing + present if nulls_first else present + missing
+
+        end = None if self.row_limit is None else self.row_offset + self.row_limit
+        matched = matched[self.row_offset:end]
+        return [self._with_embeds(r) for r in matched]
+
+    def _with_embeds(self, row):
+        out = dict(row)
+        foreign_key = f"{self.table.rstrip('s')}_id"
+        for relation in self.embedded:
+            out[relation] = [
+                dict(r) for r in self.client.tables.get(relation, [])
+                if str(r.get(foreign_key)) == str(row.get('id'))
+            ]
+        return out
+
+
+class FakeRpc:
+    def __init__(self, client, name, params):
+        self.client = client
+        self.name = name
+        self.params = params or {}
+
+    def execute(self):
+        self.client.round_trip()
+        with self.client.lock:
+            return FakeResponse(self.client.rpc_functions[self.name](self.client, **self.params))
+
+
+# ----- Storage -----
+
+class FakeBucket:
+    def __init__(self, client, name):
+        self.client = client
+        self.name = name
+        self.objects = client.buckets.setdefault(name, {})
+
+    def upload(self, path, file, file_options=None):
+        self.client.round_trip(storage=True)
+        upsert = str((file_options or {}).get('upsert', 'false')).lower() == 'true'
+        if path in self.objects and not upsert:
+            raise Exception({'statusCode': 409, 'error': 'Duplicate', 'message': 'The resource already exists'})
+        if isinstance(file, bytes):
+            chunks = [file]
+        else:
+            # Consume file objects in chunks, as httpx does for a multipart body
+            chunks = iter(lambda: file.read(64 * 1024), b'')
+        data = bytearray()
+        for chunk in chunks:
+            self.client.add_uploaded_bytes(len(chunk))
+            if self.client.keep_objects:
+                data += chunk
+        self.objects[path] = bytes(data)
+        self.client.object_times.setdefault(self.name, {})[path] = datetime.now(timezone.utc).isoformat()
+        return {'Key': f'{self.name}/{path}'}
+
+    def create_signed_url(self, path, expires_in, options=None):
+        self.client.round_trip(storage=True)
+        return {'signedURL': self._signed(path, expires_in)}
+
+    def create_signed_urls(self, paths, expires_in, options=None):
+        self.client.round_trip(storage=True)
+        return [{'path': p, 'signedURL': self._signed(p, expires_in), 'error': None} for p in paths]
+
+    def get_public_url(self, path, options=None):
+        return f'https://fake.supabase.co/storage/v1/object/public/{self.name}/{path}'
+
+    def remove(self, paths):
+        self.client.round_trip(storage=True)
+        return [{'name': p} for p in paths if self.objects.pop(p, None) is not None]
+
+    def list(self, path=None, options=None):
+        self.client.round_trip(storage=True)
+        options = options or {}
+        names = sorted(self.objects)
+        offset = options.get('offset', 0)
+        limit = options.get('limit', 100)
+        times = self.client.object_times.get(self.name, {})
+        # Seeded objects have no upload time and are listed as long-lived
+        return [{'name': n, 'id': n, 'created_at': times.get(n, '2026-01-01T00:00:00+00:00'),
+                 'metadata': {'size': len(self.objects[n])}} for n in names[offset:offset + limit]]
+
+    def _signed(self, path, expires_in):
+        return f'https://fake.supabase.co/storage/v1/object/sign/{self.name}/{path}?token={uuid.uuid4().hex}&expires={expires_in}'
+
+
+class FakeStorage:
+    def __init__(self, client):
+        self.client = client
+
+    def from_(self, bucket):
+        return FakeBucket(self.client, bucket)
+
+
+# ----- Emulated database triggers and functions -----
+
+PRIORITY_RANK = {'high': 0, 'low': 2}
+
+
+def generate_columns(table, row):
+    """Stored generated columns from the migrations"""
+    if table == 'tasks':
+        row['priority_rank'] = PRIORITY_RANK.get(row.get('priority'), 1)
+    return row
+
+
+VERSIONED_TABLES = {'tasks', 'meetings', 'budget_categories', 'budget_transactions', 'users'}
+LOGGED_TABLES = {'tasks', 'meetings', 'budget_transactions', 'budget_categories'}
+
+
+def _bump_version(client, op, table, changes):
+    if table not in VERSIONED_TABLES or not changes:
+        return
+    versions = client.tables.setdefault('collection_versions', [])
+    row = next((r for r in versions if r['name'] == table), None)
+    if row is None:
+        versions.append({'name': table, 'version': 1})
+    else:
+        row['version'] += 1
+
+
+def _log_change(client, op, table, changes):
+    if table not in LOGGED_TABLES:
+        return
+    log = client.tables.setdefault('change_log', [])
+    # One statement is one transaction here, and transactions commit in order
+    client.last_txid += 1
+    for old, new in changes:
+        row = new if new is not None else old
+        log.append(client.new_row('change_log', {
+            'table_name': table, 'row_id': str(row['id']), 'op': op[0], 'txid': client.last_txid,
+        }))
+
+
+def _sync_attendees(client, op, table, changes):
+    if table != 'meetings':
+        return
+    import json
+    attendees = client.tables.setdefault('meeting_attendees', [])
+    for old, new in changes:
+        meeting_id = (new or old)['id']
+        attendees[:] = [a for a in attendees if a['meeting_id'] != meeting_id]
+        if new is None:
+            continue
+        try:
+            items = json.loads(new.get('attendees') or '[]')
+        except ValueError:
+            items = []
+        emails = set()
+        for item in items if isinstance(items, list) else []:
+            email = item.get('email') if isinstance(item, dict) else item
+            if isinstance(email, str):
+                email = email.strip().lower()
+                if email == 'all' or '@' in email:
+                    emails.add(email)
+        attendees.extend({'meeting_id': meeting_id, 'email': e} for e in emails)
+
+
+def _track_budget_totals(client, op, table, changes):
+    if table != 'budget_transactions':
+        return
+    for old, new in changes:
+        if old is not None:
+            _apply_budget_delta(client, old, -1)
+        if new is not None:
+            _apply_budget_delta(client, new, 1)
+
+
+def _apply_budget_delta(client, row, sign):
+    if row.get('category') is None:
+        return
+    totals = client.tables.setdefault('budget_category_totals', [])
+    entry = next((t for t in totals if t['category'] == row['category']), None)
+    if entry is None:
+        entry = {'category': row['category'], 'spent': 0.0, 'income': 0.0, 'tx_count': 0}
+        totals.append(entry)
+    amount = float(row.get('amount') or 0)
+    if row.get('type') == 'expense':
+        entry['spent'] += sign * amount
+    elif row.get('type') == 'income':
+        entry['income'] += sign * amount
+    entry['tx_count'] += sign
+
+
+def rpc_task_stats(client, p_now=None):
+    now = datetime.now(timezone.utc)
+    week_start = (now - timedelta(days=now.weekday())).replace(hour=0, minute=0, second=0, microsecond=0)
+    week_end = week_start + timedelta(days=7)
+    stats = {'total': 0, 'completed': 0, 'pending': 0, 'overdue': 0, 'due_this_week': 0,
+             'by_status': {}, 'by_priority': {}, 'by_type': {}}
+    progress = []
+    for t in client.tables.get('tasks', []):
+        done = bool(t.get('completed'))
+        stats['total'] += 1
+        stats['completed' if done else 'pending'] += 1
+        for key, column, default in (('by_status', 'status', 'pending'),
+                                     ('by_priority', 'priority', 'medium'),
+                                     ('by_type', 'type', 'assignment')):
+            value = t.get(column) or default
+            stats[key][value] = stats[key].get(value, 0) + 1
+        if t.get('progress') is not None:
+            progress.append(t['progress'])
+        due = _parse_time(t.get('due'))
+        if due and not done:
+            if due < now:
+                stats['overdue'] += 1
+            if week_start <= due < week_end:
+                stats['due_this_week'] += 1
+    stats['average_progress'] = round(sum(progress) / len(progress), 1) if progress else 0
+    return stats
+
+
+def rpc_reconcile_budget_totals(client, repair=True):
+    stored = {t['category']: t for t in client.tables.get('budget_category_totals', [])}
+    saved = client.tables.get('budget_category_totals', [])
+    client.tables['budget_category_totals'] = []
+    for tx in client.tables.get('budget_transactions', []):
+        _apply_budget_delta(client, tx, 1)
+    actual = {t['category']: t for t in client.tables['budget_category_totals']}
+    drift = []
+    for category in set(stored) | set(actual):
+        s, a = stored.get(category, {}), actual.get(category, {})
+        if any(round(s.get(k, 0), 2) != round(a.get(k, 0), 2) for k in ('spent', 'income', 'tx_count')):
+            drift.append({'category': category,
+                          'stored_spent': s.get('spent', 0), 'actual_spent': a.get('spent', 0),
+                          'stored_income': s.get('income', 0), 'actual_income': a.get('income', 0),
+                          'stored_count': s.get('tx_count', 0), 'actual_count': a.get('tx_count', 0)})
+    if not repair:
+        client.tables['budget_category_totals'] = saved
+    return drift
+
+
+def rpc_sync_changes(client, p_after_txid=None, p_after_id=0, p_limit=0):
+    after = None if p_after_txid is None else (int(p_after_txid), p_after_id)
+    changes = sorted(
+        (c for c in client.tables.get('change_log', []) if after is not None and (c['txid'], c['id']) > after),
+        key=lambda c: (c['txid'], c['id'])
+    )[:p_limit]
+    return {
+        'horizon': str(client.last_txid + 1),
+        'pruned_through': None,
+        'changes': [{'id': c['id'], 'table_name': c['table_name'], 'row_id': c['row_id'], 'op': c['op'],
+                     'txid': str(c['txid'])} for c in changes],
+    }
+
+
+def _parse_time(value):
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+    except ValueError:
+        return None
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+class FakeSupabase:
+    """Client stand-in: `table()` builders over in-memory lists of dicts"""
+
+    def __init__(self, latency=0.0, storage_latency=None, keep_objects=True):
+        self.latency = latency
+        self.storage_latency = latency if storage_latency is None else storage_latency
+        # keep_objects=False records uploads by name only, for memory benchmarks
+        self.keep_objects = keep_objects
+        self.uploaded_bytes = 0
+        self.object_times = {}
+        self.tables = {}
+        self.buckets = {}
+        self.lock = threading.RLock()
+        self.round_trips = 0
+        self._ids = {}
+        self.last_txid = 0
+        self.triggers = [_bump_version, _log_change, _sync_attendees, _track_budget_totals]
+        self.rpc_functions = {
+            'task_stats': rpc_task_stats,
+            'reconcile_budget_category_totals': rpc_reconcile_budget_totals,
+            'sync_changes': rpc_sync_changes,
+        }
+        self.storage = FakeStorage(self)
+
+    def add_uploaded_bytes(self, count):
+        with self.lock:
+            self.uploaded_bytes += count
+
+    def round_trip(self, storage=False):
+        with self.lock:
+            self.round_trips += 1
+        latency = self.storage_latency if storage else self.latency
+        # AsyncFakeSupabase has already awaited the latency
+        if latency and not _in_async_call.get():
+            time.sleep(latency)
+
+    def new_row(self, table, values):
+        last = self._ids.get(table, 0)
+        if isinstance(values.get('id'), int):
+            # Keep the sequence ahead of explicitly seeded ids
+            self._ids[table] = max(last, values['id'])
+            row = {'created_at': datetime.now(timezone.utc).isoformat()}
+        else:
+            self._ids[table] = last + 1
+            row = {'id': last + 1, 'created_at': datetime.now(timezone.utc).isoformat()}
+        row.update(values)
+        return generate_columns(table, row)
+
+    def fire(self, op, table, changes):
+        if changes:
+            for trigger in self.triggers:
+                trigger(self, op, table, changes)
+
+    def seed(self, table, rows):
+        """Bulk-load rows, running the emulated triggers once per table"""
+        with self.lock:
+            created = [self.new_row(table, r) for r in rows]
+            self.tables.setdefault(table, []).extend(created)
+            self.fire('INSERT', table, [(None, r) for r in created])
+
+    def table(self, name):
+        return FakeQuery(self, name)
+
+    def rpc(self, name, params=None):
+        return FakeRpc(self, name, params)
+
+
+# ----- Async client -----
+
+_in_async_call = contextvars.ContextVar('in_async_call', default=False)
+
+
+class _AsyncProxy:
+    """Wraps a builder or bucket so execute() and storage calls are awaitable"""
+
+    AWAITABLE = {'execute', 'upload', 'create_signed_url', 'create_signed_urls', 'remove', 'list'}
+    WRAPPED = (FakeQuery, FakeRpc, _Negated, FakeBucket)
+
+    def __init__(self, client, target):
+        self._client = client
+        self._target = target
+
+    def _wrap(self, value):
+        return _AsyncProxy(self._client, value) if isinstance(value, self.WRAPPED) else value
+
+    def __getattr__(self, name):
+        attr = getattr(self._target, name)
+        if name in self.AWAITABLE:
+            storage = isinstance(self._target, FakeBucket)
+
+            async def awaitable(*args, **kwargs):
+                await self._client.round_trip(storage=storage)
+                token = _in_async_call.set(True)
+                try:
+                    return attr(*args, **kwargs)
+                finally:
+                    _in_async_call.reset(token)
+            return awaitable
+        if not callable(attr) or isinstance(attr, _Negated):
+            return self._wrap(attr)
+
+        def call(*args, **kwargs):
+            return self._wrap(attr(*args, **kwargs))
+        return call
+
+
+class AsyncFakeSupabase:
+    """Awaitable view of a FakeSupabase; tracks how many calls are in flight"""
+
+    def __init__(self, client):
+        self.client = client
+        self.storage = _AsyncProxy(self, client.storage)
+        self.in_flight = 0
+        self.peak_in_flight = 0
+
+    async def round_trip(self, storage=False):
+        latency = self.client.storage_latency if storage else self.client.latency
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        try:
+            if latency:
+                await asyncio.sleep(latency)
+        finally:
+            self.in_flight -= 1
+
+    def table(self, name):
+        return _AsyncProxy(self, self.client.table(name))
+
+    def rpc(self, name, params=None):
+        return _AsyncProxy(self, self.client.rpc(name, params))
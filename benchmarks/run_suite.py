@@ -0,0 +1,237 @@
+"""
+Offline benchmark suite for every API route.
+
+Seeds the in-memory Supabase stand-in with realistic volumes and drives each
+route through the Flask test client, first sequentially and then from
+concurrent threads. Reports p50/p95/p99 latency and throughput per route.
+No Supabase project or network access is needed.
+
+    python benchmarks/run_suite.py
+    python benchmarks/run_suite.py --latency 0.015 --iterations 100 --concurrency 16
+    python benchmarks/run_suite.py --routes 'tasks|budget' --scale 0.1 --json results.json
+"""
+
+import argparse
+import io
+import json
+import os
+import re
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import app  # noqa: E402
+import datasets  # noqa: E402
+from fake_supabase import FakeSupabase  # noqa: E402
+
+
+def _png():
+    from PIL import Image
+    output = io.BytesIO()
+    Image.new('RGB', (1200, 900), (5, 150, 105)).save(output, format='PNG')
+    return output.getvalue()
+
+
+def build_scenarios(admin, student):
+    """(name, rule, method, auth, request factory) for every route"""
+    png = _png()
+    receipts = [t['receipt'] for t in app.get_supabase().tables['budget_transactions'] if t.get('receipt')]
+    counters = {}
+    lock = threading.Lock()
+
+    def nth(key):
+        # Distinct row per iteration for destructive routes
+        with lock:
+            counters[key] = counters.get(key, 0) + 1
+            return counters[key]
+
+    return [
+        ('login', '/api/login', 'POST', None,
+         lambda: {'json': {'email': datasets.ADMIN_EMAIL, 'password': datasets.PASSWORD}}),
+        ('signup', '/api/signup', 'POST', None,
+         lambda: {'json': {'first_name': 'New', 'last_name': 'Student', 'email': f'new{uuid.uuid4().hex[:12]}@gmail.com',
+                           'password': datasets.PASSWORD, 'confirmPassword': datasets.PASSWORD}}),
+        ('logout', '/api/logout', 'POST', None, lambda: {}),
+        ('2fa send', '/api/2fa/send', 'POST', None,
+         lambda: {'json': {'email': f'otp{uuid.uuid4().hex[:12]}@gmail.com'}}),
+        ('2fa resend', '/api/2fa/resend', 'POST', None,
+         lambda: {'json': {'email': f'otp{uuid.uuid4().hex[:12]}@gmail.com'}}),
+        ('2fa verify', '/api/2fa/verify', 'POST', None,
+         lambda: {'json': {'email': datasets.STUDENT_EMAIL, 'code': 'ZZZZZZ'}}),
+        ('2fa status', '/api/2fa/status/<delivery_id>', 'GET', None,
+         lambda: {'path': f'/api/2fa/status/{uuid.uuid4().hex}'}),
+        ('profile get', '/api/profile', 'GET', student, lambda: {}),
+        ('profile patch', '/api/profile', 'PATCH', student,
+         lambda: {'json': {'section': 'academic', 'fields': {'school': 'Likhayag NHS'}}}),
+        ('profile picture', '/api/profile/picture', 'POST', student,
+         lambda: {'data': {'profile_picture': (io.BytesIO(png), 'me.png')}, 'content_type': 'multipart/form-data'}),
+        ('tasks list', '/api/tasks', 'GET', student, lambda: {}),
+        ('tasks page', '/api/tasks', 'GET', student,
+         lambda: {'query_string': {'filter': 'pending', 'sort': 'priority', 'limit': 50}}),
+        ('tasks search', '/api/tasks', 'GET', student,
+         lambda: {'query_string': {'search': 'review', 'limit': 50}}),
+        ('tasks create', '/api/tasks', 'POST', student, lambda: {'json': {'title': 'Benchmark task'}}),
+        ('tasks stats', '/api/tasks/stats', 'GET', student, lambda: {}),
+        ('tasks batch', '/api/tasks/batch', 'POST', student,
+         lambda: {'json': {'operations': [{'op': 'create', 'data': {'title': f'Batch {i}'}} for i in range(20)]}}),
+        ('task get', '/api/tasks/<task_id>', 'GET', student, lambda: {'path': f'/api/tasks/{nth("task_get")}'}),
+        ('task patch', '/api/tasks/<task_id>', 'PATCH', student,
+         lambda: {'path': f'/api/tasks/{nth("task_patch")}', 'json': {'progress': 50}}),
+        ('task delete', '/api/tasks/<task_id>', 'DELETE', student,
+         lambda: {'path': f'/api/tasks/{nth("task_delete")}'}),
+        ('meetings admin', '/api/meetings', 'GET', admin, lambda: {}),
+        ('meetings student', '/api/meetings', 'GET', student, lambda: {}),
+        ('meeting create', '/api/meetings', 'POST', admin,
+         lambda: {'json': {'title': 'Bench meeting', 'datetime': '2026-11-20T09:00',
+                           'attendees': [datasets.STUDENT_EMAIL]}}),
+        ('meeting get', '/api/meetings/<meeting_id>', 'GET', admin,
+         lambda: {'path': f'/api/meetings/{nth("meeting_get")}'}),
+        ('meeting patch', '/api/meetings/<meeting_id>', 'PATCH', admin,
+         lambda: {'path': f'/api/meetings/{nth("meeting_patch")}', 'json': {'status': 'Ongoing'}}),
+        ('meeting delete', '/api/meetings/<meeting_id>', 'DELETE', admin,
+         lambda: {'path': f'/api/meetings/{nth("meeting_delete")}'}),
+        ('budget', '/api/budget', 'GET', admin, lambda: {}),
+        ('budget signed', '/api/budget', 'GET', admin, lambda: {'query_string': {'sign_receipts': 1}}),
+        ('budget summary', '/api/budget/summary', 'GET', admin, lambda: {}),
+        ('budget reconcile', '/api/budget/summary/reconcile', 'POST', admin, lambda: {'json': {'repair': False}}),
+        ('receipt url', '/api/budget/receipts/<path:filename>/url', 'GET', admin,
+         lambda: {'path': f'/api/budget/receipts/{receipts[nth("receipt") % len(receipts)]}/url'}),
+        ('transaction create', '/api/budget/transactions', 'POST', admin,
+         lambda: {'json': {'category': 'Supplies', 'amount': 125.5, 'type': 'expense', 'date': '2026-10-17'}}),
+        ('students', '/api/students', 'GET', admin, lambda: {}),
+        ('sync snapshot', '/api/sync', 'GET', student, lambda: {}),
+        ('sync delta', '/api/sync', 'GET', student,
+         lambda: {'query_string': {'since': app.encode_cursor({'txid': '1', 'change': 0})}}),
+        ('health', '/health', 'GET', None, lambda: {}),
+        ('config', '/api/config', 'GET', None, lambda: {}),
+        ('stats', '/api/stats', 'GET', admin, lambda: {}),
+        ('metrics', '/metrics', 'GET', admin, lambda: {}),
+    ]
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(pct / 100 * len(sorted_values) + 0.5) - 1))
+    return sorted_values[index]
+
+
+def issue(client, method, rule, token, factory):
+    kwargs = factory()
+    path = kwargs.pop('path', rule)
+    headers = {'Authorization': f'Bearer {token}'} if token else {}
+    start = time.perf_counter()
+    response = client.open(path, method=method, headers=headers, **kwargs)
+    elapsed = time.perf_counter() - start
+    return elapsed, response.status_code
+
+
+def run_sequential(scenario, iterations):
+    name, rule, method, token, factory = scenario
+    client = app.app.test_client()
+    latencies, statuses = [], {}
+    start = time.perf_counter()
+    for _ in range(iterations):
+        elapsed, status = issue(client, method, rule, token, factory)
+        latencies.append(elapsed)
+        statuses[status] = statuses.get(status, 0) + 1
+    return summarize(latencies, time.perf_counter() - start, statuses)
+
+
+def run_concurrent(scenario, iterations, concurrency):
+    name, rule, method, token, factory = scenario
+    local = threading.local()
+
+    def one(_):
+        if not hasattr(local, 'client'):
+            local.client = app.app.test_client()
+        return issue(local.client, method, rule, token, factory)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(one, range(iterations)))
+    wall = time.perf_counter() - start
+    statuses = {}
+    for _, status in results:
+        statuses[status] = statuses.get(status, 0) + 1
+    return summarize([r[0] for r in results], wall, statuses)
+
+
+def summarize(latencies, wall, statuses):
+    ordered = sorted(latencies)
+    return {
+        'requests': len(latencies),
+        'p50_ms': percentile(ordered, 50) * 1000,
+        'p95_ms': percentile(ordered, 95) * 1000,
+        'p99_ms': percentile(ordered, 99) * 1000,
+        'throughput_rps': len(latencies) / wall if wall else 0.0,
+        'statuses': statuses,
+    }
+
+
+def uncovered_routes(scenarios):
+    covered = {(rule, method) for _, rule, method, _, _ in scenarios}
+    missing = []
+    for rule in app.app.url_map.iter_rules():
+        if rule.endpoint == 'static':
+            continue
+        for method in sorted(rule.methods - {'HEAD', 'OPTIONS'}):
+            if (rule.rule, method) not in covered:
+                missing.append(f'{method} {rule.rule}')
+    return missing
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--latency', type=float, default=0.005, help='seconds per database round trip')
+    parser.add_argument('--storage-latency', type=float, default=None, help='seconds per storage call')
+    parser.add_argument('--scale', type=float, default=1.0, help='multiplier for the seeded data volumes')
+    parser.add_argument('--iterations', type=int, default=50, help='requests per route and mode')
+    parser.add_argument('--concurrency', type=int, default=8, help='threads for the concurrent run')
+    parser.add_argument('--routes', default='', help='regex selecting scenarios by name')
+    parser.add_argument('--json', dest='json_path', help='write results to this file')
+    args = parser.parse_args()
+
+    fake = FakeSupabase(latency=args.latency, storage_latency=args.storage_latency)
+    volumes = datasets.seed(fake, scale=args.scale)
+    app._supabase_client = fake
+
+    admin = app.create_token(1, datasets.ADMIN_EMAIL, 'admin')
+    student = app.create_token(2, datasets.STUDENT_EMAIL, 'user')
+    scenarios = build_scenarios(admin, student)
+
+    missing = uncovered_routes(scenarios)
+    if missing:
+        print(f'⚠️  routes without a scenario: {", ".join(missing)}')
+
+    selected = [s for s in scenarios if re.search(args.routes, s[0])]
+    print(f'data: {volumes}, db latency {args.latency * 1000:.1f} ms, '
+          f'{args.iterations} requests per route, concurrency {args.concurrency}')
+    header = f'{"route":<20} {"mode":<11} {"p50 ms":>9} {"p95 ms":>9} {"p99 ms":>9} {"req/s":>9}  status'
+    print(header)
+    print('-' * len(header))
+
+    results = {}
+    for scenario in selected:
+        name = scenario[0]
+        results[name] = {
+            'sequential': run_sequential(scenario, args.iterations),
+            'concurrent': run_concurrent(scenario, args.iterations, args.concurrency),
+        }
+        for mode, r in results[name].items():
+            statuses = ','.join(f'{code}x{n}' for code, n in sorted(r['statuses'].items()))
+            print(f'{name:<20} {mode:<11} {r["p50_ms"]:>9.2f} {r["p95_ms"]:>9.2f} '
+                  f'{r["p99_ms"]:>9.2f} {r["throughput_rps"]:>9.1f}  {statuses}')
+
+    if args.json_path:
+        with open(args.json_path, 'w') as f:
+            json.dump({'config': vars(args), 'volumes': volumes, 'results': results}, f, indent=2)
+        print(f'results written to {args.json_path}')
+
+
+if __name__ == '__main__':
+    main()
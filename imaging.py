@@ -0,0 +1,89 @@
+"""
+================================================================================
+LIKHAYAG MOBILE API - Image Rendering
+================================================================================
+The functions the image process pool runs. The pool uses spawn, so every
+worker imports the module a task's function lives in; keeping them here
+means a worker loads this file and Pillow, not the whole of app.py with
+Flask, Supabase and its configuration. Nothing here reads the environment:
+app.py passes its configured sizes and limits with every task.
+================================================================================
+"""
+
+import io
+
+PROFILE_SIZES = (800, 256, 64)
+MAX_PIXELS = 40_000_000
+
+
+def render_profile_images(data, sizes=PROFILE_SIZES, max_pixels=MAX_PIXELS):
+    """Decode an uploaded picture once and encode a JPEG for every size.
+
+    Runs inside the image process pool. JPEGs are decoded with draft() at
+    the smallest DCT scale that still covers the largest requested size,
+    and each smaller size is resized from the previous one.
+    """
+    from PIL import Image
+    Image.MAX_IMAGE_PIXELS = max_pixels
+    image = Image.open(io.BytesIO(data))
+    
+    if image.width * image.height > max_pixels:
+        raise ValueError('Image dimensions too large')
+    
+    largest = max(sizes)
+    image.draft('RGB', (largest, largest))
+    
+    if image.mode in ('RGBA', 'LA', 'P'):
+        image = image.convert('RGBA')
+        background = Image.new('RGB', image.size, (255, 255, 255))
+        background.paste(image, mask=image.split()[-1])
+        image = background
+    elif image.mode != 'RGB':
+        image = image.convert('RGB')
+    
+    outputs = {}
+    for size in sorted(sizes, reverse=True):
+        image.thumbnail((size, size), Image.Resampling.LANCZOS)
+        output = io.BytesIO()
+        image.save(output, format='JPEG', quality=85, optimize=True)
+        outputs[size] = output.getvalue()
+    return outputs
+
+
+def normalize_receipt_image(source, image_format='webp', quality=80, max_edge=1600, preview_edge=320,
+                            max_pixels=MAX_PIXELS):
+    """Re-encode a receipt photo and render its preview.
+
+    Runs inside the image process pool; source is a file path or bytes.
+    EXIF orientation is applied before the metadata is dropped, and the
+    longest edge is capped at max_edge. Returns (image bytes, preview bytes).
+    """
+    from PIL import Image, ImageOps
+    Image.MAX_IMAGE_PIXELS = max_pixels
+    image = Image.open(source if isinstance(source, str) else io.BytesIO(source))
+    
+    if image.width * image.height > max_pixels:
+        raise ValueError('Image dimensions too large')
+    
+    image.draft('RGB', (max_edge, max_edge))
+    image = ImageOps.exif_transpose(image)
+    
+    if image.mode in ('RGBA', 'LA', 'P'):
+        image = image.convert('RGBA')
+        background = Image.new('RGB', image.size, (255, 255, 255))
+        background.paste(image, mask=image.split()[-1])
+        image = background
+    elif image.mode != 'RGB':
+        image = image.convert('RGB')
+    
+    outputs = []
+    for edge, edge_quality in ((max_edge, quality), (preview_edge, min(quality, 70))):
+        image.thumbnail((edge, edge), Image.Resampling.LANCZOS)
+        output = io.BytesIO()
+        # No exif= or icc_profile=: the encoded copy carries no metadata
+        if image_format == 'webp':
+            image.save(output, format='WEBP', quality=edge_quality, method=4)
+        else:
+            image.save(output, format='JPEG', quality=edge_quality, optimize=True, progressive=True)
+        outputs.append(output.getvalue())
+    return outputs[0], outputs[1]
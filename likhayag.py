@@ -0,0 +1,175 @@
+"""
+================================================================================
+LIKHAYAG MOBILE API - Production Launcher
+================================================================================
+    python -m likhayag serve                     # WSGI, preforked gthread workers
+    python -m likhayag serve --asgi              # asgi.py under uvicorn workers
+    python -m likhayag serve --workers 4 --threads 16 --port 8000
+    python -m likhayag check                     # configuration + Supabase check
+
+Built on gunicorn. The master imports the app once and checks the
+configuration before it forks anything. Each worker drops the state it
+must not share (HTTP connection pools, executors) and warms up before it
+accepts its first connection: the Supabase client is created and queried,
+and the password hash, image pool and routing paths are run once. SIGTERM
+stops accepting, lets in-flight requests finish within --graceful-timeout,
+then drains the email outbox and worker pools.
+================================================================================
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+
+# ==================== OPTIONAL IMPORTS ====================
+try:
+    from gunicorn.app.base import BaseApplication
+    GUNICORN_AVAILABLE = True
+except ImportError:
+    GUNICORN_AVAILABLE = False
+    BaseApplication = object
+
+
+# ================================================================================
+# SECTION 1: CONFIGURATION
+# ================================================================================
+
+SERVER_HOST = os.getenv('FLASK_HOST', '0.0.0.0')
+SERVER_PORT = int(os.getenv('FLASK_PORT', '5000'))
+SERVER_WORKERS = int(os.getenv('SERVER_WORKERS', os.cpu_count() or 2))
+SERVER_THREADS = int(os.getenv('SERVER_THREADS', 8))
+SERVER_TIMEOUT = int(os.getenv('SERVER_TIMEOUT', 60))
+SERVER_GRACEFUL_TIMEOUT = int(os.getenv('SERVER_GRACEFUL_TIMEOUT', 30))
+SERVER_KEEPALIVE = int(os.getenv('SERVER_KEEPALIVE', 5))
+SERVER_MAX_REQUESTS = int(os.getenv('SERVER_MAX_REQUESTS', 0))
+SERVER_ASGI = os.getenv('SERVER_ASGI', '0').lower() in ('true', '1')
+
+
+# ================================================================================
+# SECTION 2: WORKER HOOKS
+# ================================================================================
+
+def on_starting(server):
+    """Master, before forking: refuse to start with a broken configuration"""
+    import app
+    app.logger.info('=' * 80)
+    app.logger.info('LIKHAYAG MOBILE API - Starting...')
+    app.logger.info('=' * 80)
+    if not app.startup_checks():
+        sys.exit(1)
+    # Snapshots left by a previous run would count twice
+    app.metrics.clear()
+
+
+def post_fork(server, worker):
+    import app
+    app.reset_after_fork()
+
+
+def post_worker_init(worker):
+    """Runs in the worker before it accepts connections"""
+    import app
+    app.warm_up()
+
+
+def worker_exit(server, worker):
+    import app
+    app.shutdown()
+
+
+# ================================================================================
+# SECTION 3: SERVER
+# ================================================================================
+
+class LikhayagServer(BaseApplication):
+    """gunicorn application with the app preloaded in the master"""
+
+    def __init__(self, options, use_asgi=False):
+        self.options = options
+        self.use_asgi = use_asgi
+        super().__init__()
+
+    def load_config(self):
+        for key, value in self.options.items():
+            self.cfg.set(key, value)
+
+    def load(self):
+        if self.use_asgi:
+            import asgi
+            return asgi.application
+        import app
+        return app.app
+
+
+def server_options(args):
+    """gunicorn settings for the parsed command line"""
+    options = {
+        'bind': f'{args.host}:{args.port}',
+        'workers': args.workers,
+        'preload_app': True,
+        'timeout': args.timeout,
+        'graceful_timeout': args.graceful_timeout,
+        'keepalive': SERVER_KEEPALIVE,
+        'max_requests': SERVER_MAX_REQUESTS,
+        'max_requests_jitter': SERVER_MAX_REQUESTS // 10,
+        # The app writes its own structured access log
+        'accesslog': None,
+        'errorlog': '-',
+        'on_starting': on_starting,
+        'post_fork': post_fork,
+        'post_worker_init': post_worker_init,
+        'worker_exit': worker_exit,
+    }
+    if args.asgi:
+        options['worker_class'] = 'uvicorn.workers.UvicornWorker'
+    else:
+        options['worker_class'] = 'gthread'
+        options['threads'] = args.threads
+    return options
+
+
+def serve(args):
+    if not GUNICORN_AVAILABLE:
+        print('❌ gunicorn not installed. Run: pip install gunicorn' + (' uvicorn' if args.asgi else ''))
+        return 1
+    # Preforked workers must share rate limits, or each allows the full limit
+    os.environ.setdefault('RATE_LIMIT_BACKEND', 'sqlite')
+    # Any worker may answer a scrape: let /metrics merge all of them
+    os.environ.setdefault('METRICS_MULTIPROC_DIR',
+                          os.path.join(tempfile.gettempdir(), f'likhayag-metrics-{args.port}'))
+    LikhayagServer(server_options(args), use_asgi=args.asgi).run()
+    return 0
+
+
+def check(args):
+    import app
+    return 0 if app.startup_checks() else 1
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m likhayag', description='Likhayag API server')
+    commands = parser.add_subparsers(dest='command')
+
+    serve_parser = commands.add_parser('serve', help='run the production server')
+    serve_parser.add_argument('--host', default=SERVER_HOST)
+    serve_parser.add_argument('--port', type=int, default=SERVER_PORT)
+    serve_parser.add_argument('--workers', type=int, default=SERVER_WORKERS, help='worker processes')
+    serve_parser.add_argument('--threads', type=int, default=SERVER_THREADS, help='threads per WSGI worker')
+    serve_parser.add_argument('--asgi', action='store_true', default=SERVER_ASGI, help='serve asgi.py')
+    serve_parser.add_argument('--timeout', type=int, default=SERVER_TIMEOUT)
+    serve_parser.add_argument('--graceful-timeout', type=int, default=SERVER_GRACEFUL_TIMEOUT)
+    serve_parser.set_defaults(handler=serve)
+
+    check_parser = commands.add_parser('check', help='validate configuration and the Supabase connection')
+    check_parser.set_defaults(handler=check)
+
+    args = parser.parse_args(argv)
+    if not args.command:
+        parser.print_help()
+        return 2
+    return args.handler(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
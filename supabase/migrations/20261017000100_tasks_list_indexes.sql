@@ -0,0 +1,22 @@
+-- GET /api/tasks: filtering, ordering and keyset pagination run in Postgres.
+
+-- Priority ordering (high, medium, low) as a sortable column.
+alter table public.tasks
+    add column if not exists priority_rank smallint
+    generated always as (
+        case priority when 'high' then 0 when 'low' then 2 else 1 end
+    ) stored;
+
+-- One index per sort mode, with id as the keyset tie-breaker.
+create index if not exists tasks_due_id_idx on public.tasks (due asc nulls last, id);
+create index if not exists tasks_priority_rank_id_idx on public.tasks (priority_rank, id);
+create index if not exists tasks_created_at_id_idx on public.tasks (created_at desc, id desc);
+
+-- Filters.
+create index if not exists tasks_completed_idx on public.tasks (completed);
+create index if not exists tasks_priority_idx on public.tasks (priority);
+
+-- Substring search (ilike '%term%') on title and notes.
+create extension if not exists pg_trgm;
+create index if not exists tasks_title_trgm_idx on public.tasks using gin (title gin_trgm_ops);
+create index if not exists tasks_notes_trgm_idx on public.tasks using gin (notes gin_trgm_ops);
@@ -0,0 +1,76 @@
+-- Normalized, indexed meeting attendees.
+--
+-- meetings.attendees keeps the JSON list the clients send (emails, objects
+-- with an "email" key, or "all"). meeting_attendees mirrors it as one row per
+-- invited email ('all' for open meetings) so a student's meeting list is an
+-- indexed join instead of a scan over every meeting.
+
+create table if not exists public.meeting_attendees (
+    meeting_id bigint not null references public.meetings (id) on delete cascade,
+    email text not null,
+    primary key (meeting_id, email)
+);
+
+create index if not exists meeting_attendees_email_idx on public.meeting_attendees (email);
+
+-- Emails in an attendees string. Like the Python check it replaces, a value
+-- that is not a JSON array (legacy free text, malformed JSON) has no
+-- attendees instead of failing the backfill or the meeting's writes.
+create or replace function public.meeting_attendee_emails(attendees text)
+returns setof text
+language plpgsql
+immutable
+as $$
+declare
+    parsed jsonb;
+begin
+    if attendees is null or btrim(attendees) = '' then
+        return;
+    end if;
+    begin
+        parsed := attendees::jsonb;
+    exception when invalid_text_representation then
+        return;
+    end;
+    if jsonb_typeof(parsed) <> 'array' then
+        return;
+    end if;
+    return query
+    select distinct lower(trim(
+        case jsonb_typeof(item)
+            when 'object' then item ->> 'email'
+            when 'string' then item #>> '{}'
+        end
+    ))
+    from jsonb_array_elements(parsed) as item
+    where jsonb_typeof(item) in ('object', 'string');
+end;
+$$;
+
+create or replace function public.sync_meeting_attendees()
+returns trigger
+language plpgsql
+as $$
+begin
+    delete from public.meeting_attendees where meeting_id = new.id;
+    insert into public.meeting_attendees (meeting_id, email)
+    select new.id, email
+    from public.meeting_attendee_emails(new.attendees) as email
+    where email = 'all' or email like '%@%'
+    on conflict do nothing;
+    return new;
+end;
+$$;
+
+drop trigger if exists meetings_sync_attendees on public.meetings;
+create trigger meetings_sync_attendees
+    after insert or update of attendees on public.meetings
+    for each row execute function public.sync_meeting_attendees();
+
+-- Backfill from the existing JSON strings; malformed ones contribute nothing.
+insert into public.meeting_attendees (meeting_id, email)
+select m.id, a.email
+from public.meetings m
+cross join lateral public.meeting_attendee_emails(m.attendees) as a(email)
+where a.email = 'all' or a.email like '%@%'
+on conflict do nothing;
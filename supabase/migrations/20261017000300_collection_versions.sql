@@ -0,0 +1,41 @@
+-- Per-collection change counters backing ETag / If-None-Match on list endpoints.
+--
+-- Every insert, update or delete statement on a tracked table bumps that
+-- table's version once, so the API can tell whether a collection changed
+-- with a single primary-key lookup.
+
+create table if not exists public.collection_versions (
+    name text primary key,
+    version bigint not null default 0,
+    updated_at timestamptz not null default now()
+);
+
+create or replace function public.bump_collection_version()
+returns trigger
+language plpgsql
+as $$
+begin
+    insert into public.collection_versions as cv (name, version, updated_at)
+    values (tg_table_name, 1, now())
+    on conflict (name) do update
+        set version = cv.version + 1, updated_at = now();
+    return null;
+end;
+$$;
+
+do $$
+declare
+    t text;
+begin
+    foreach t in array array['tasks', 'meetings', 'budget_categories', 'budget_transactions', 'users']
+    loop
+        execute format('drop trigger if exists %I on public.%I', t || '_bump_version', t);
+        execute format(
+            'create trigger %I after insert or update or delete or truncate on public.%I '
+            'for each statement execute function public.bump_collection_version()',
+            t || '_bump_version', t
+        );
+        insert into public.collection_versions (name) values (t) on conflict do nothing;
+    end loop;
+end;
+$$;
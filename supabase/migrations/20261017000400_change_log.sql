@@ -0,0 +1,50 @@
+-- Row-level change tracking for GET /api/sync.
+--
+-- Every insert, update and delete on a synced table appends one row here.
+-- Sync cursors are change_log ids; clients ask for everything after theirs.
+
+create table if not exists public.change_log (
+    id bigserial primary key,
+    table_name text not null,
+    row_id text not null,
+    op char(1) not null check (op in ('I', 'U', 'D')),
+    changed_at timestamptz not null default now()
+);
+
+create index if not exists change_log_changed_at_idx on public.change_log (changed_at);
+
+create or replace function public.log_row_change()
+returns trigger
+language plpgsql
+as $$
+begin
+    if tg_op = 'DELETE' then
+        insert into public.change_log (table_name, row_id, op)
+        values (tg_table_name, old.id::text, 'D');
+        return old;
+    end if;
+    insert into public.change_log (table_name, row_id, op)
+    values (tg_table_name, new.id::text, case tg_op when 'INSERT' then 'I' else 'U' end);
+    return new;
+end;
+$$;
+
+do $$
+declare
+    t text;
+begin
+    foreach t in array array['tasks', 'meetings', 'budget_transactions', 'budget_categories']
+    loop
+        execute format('drop trigger if exists %I on public.%I', t || '_log_change', t);
+        execute format(
+            'create trigger %I after insert or update or delete on public.%I '
+            'for each row execute function public.log_row_change()',
+            t || '_log_change', t
+        );
+    end loop;
+end;
+$$;
+
+-- Retention: cursors older than the oldest retained id get a full snapshot.
+-- Schedule this with pg_cron (or any scheduler) where available:
+--   delete from public.change_log where changed_at < now() - interval '30 days';
@@ -0,0 +1,108 @@
+-- Running per-category totals backing GET /api/budget/summary.
+--
+-- A row trigger on budget_transactions applies each insert, update and
+-- delete as a delta, so the summary reads one row per category no matter
+-- how many transactions exist. reconcile_budget_category_totals() checks
+-- the running totals against a full recomputation.
+
+create table if not exists public.budget_category_totals (
+    category text primary key,
+    spent numeric not null default 0,
+    income numeric not null default 0,
+    tx_count bigint not null default 0,
+    updated_at timestamptz not null default now()
+);
+
+create or replace function public.apply_budget_total_delta(
+    p_category text, p_type text, p_amount numeric, p_sign integer
+)
+returns void
+language sql
+as $$
+    insert into public.budget_category_totals as t (category, spent, income, tx_count, updated_at)
+    values (
+        p_category,
+        case when p_type = 'expense' then p_sign * coalesce(p_amount, 0) else 0 end,
+        case when p_type = 'income' then p_sign * coalesce(p_amount, 0) else 0 end,
+        p_sign,
+        now()
+    )
+    on conflict (category) do update set
+        spent = t.spent + excluded.spent,
+        income = t.income + excluded.income,
+        tx_count = t.tx_count + excluded.tx_count,
+        updated_at = now();
+$$;
+
+create or replace function public.track_budget_totals()
+returns trigger
+language plpgsql
+as $$
+begin
+    if tg_op in ('UPDATE', 'DELETE') and old.category is not null then
+        perform public.apply_budget_total_delta(old.category, old.type, old.amount, -1);
+    end if;
+    if tg_op in ('INSERT', 'UPDATE') and new.category is not null then
+        perform public.apply_budget_total_delta(new.category, new.type, new.amount, 1);
+    end if;
+    return null;
+end;
+$$;
+
+drop trigger if exists budget_transactions_track_totals on public.budget_transactions;
+create trigger budget_transactions_track_totals
+    after insert or update or delete on public.budget_transactions
+    for each row execute function public.track_budget_totals();
+
+-- Compare running totals with a full recomputation; optionally repair them.
+create or replace function public.reconcile_budget_category_totals(repair boolean default true)
+returns table (
+    category text,
+    stored_spent numeric,
+    actual_spent numeric,
+    stored_income numeric,
+    actual_income numeric,
+    stored_count bigint,
+    actual_count bigint
+)
+language plpgsql
+as $$
+#variable_conflict use_column
+begin
+    return query
+    with actual as (
+        select bt.category,
+               coalesce(sum(bt.amount) filter (where bt.type = 'expense'), 0) as spent,
+               coalesce(sum(bt.amount) filter (where bt.type = 'income'), 0) as income,
+               count(*) as tx_count
+        from public.budget_transactions bt
+        where bt.category is not null
+        group by bt.category
+    )
+    select coalesce(a.category, t.category),
+           coalesce(t.spent, 0), coalesce(a.spent, 0),
+           coalesce(t.income, 0), coalesce(a.income, 0),
+           coalesce(t.tx_count, 0), coalesce(a.tx_count, 0)
+    from actual a
+    full join public.budget_category_totals t on t.category = a.category
+    where coalesce(t.spent, 0) <> coalesce(a.spent, 0)
+       or coalesce(t.income, 0) <> coalesce(a.income, 0)
+       or coalesce(t.tx_count, 0) <> coalesce(a.tx_count, 0);
+
+    if repair then
+        lock table public.budget_category_totals in exclusive mode;
+        delete from public.budget_category_totals where true;
+        insert into public.budget_category_totals (category, spent, income, tx_count)
+        select bt.category,
+               coalesce(sum(bt.amount) filter (where bt.type = 'expense'), 0),
+               coalesce(sum(bt.amount) filter (where bt.type = 'income'), 0),
+               count(*)
+        from public.budget_transactions bt
+        where bt.category is not null
+        group by bt.category;
+    end if;
+end;
+$$;
+
+-- Backfill.
+select public.reconcile_budget_category_totals(true);
@@ -0,0 +1,38 @@
+-- Aggregate task statistics for GET /api/tasks/stats, computed in one query.
+
+create or replace function public.task_stats(p_now timestamptz default now())
+returns jsonb
+language sql
+stable
+as $$
+    with t as (
+        select coalesce(status, 'pending') as status,
+               coalesce(priority, 'medium') as priority,
+               coalesce(type, 'assignment') as type,
+               coalesce(completed, false) as completed,
+               progress,
+               due::timestamptz as due
+        from public.tasks
+    )
+    select jsonb_build_object(
+        'total', (select count(*) from t),
+        'completed', (select count(*) from t where completed),
+        'pending', (select count(*) from t where not completed),
+        'overdue', (select count(*) from t where not completed and due < p_now),
+        'due_this_week', (
+            select count(*) from t
+            where not completed
+              and due >= date_trunc('week', p_now)
+              and due < date_trunc('week', p_now) + interval '7 days'
+        ),
+        'average_progress', (select coalesce(round(avg(progress)::numeric, 1), 0) from t),
+        'by_status', (select coalesce(jsonb_object_agg(status, n), '{}'::jsonb)
+                      from (select status, count(*) as n from t group by status) s),
+        'by_priority', (select coalesce(jsonb_object_agg(priority, n), '{}'::jsonb)
+                        from (select priority, count(*) as n from t group by priority) p),
+        'by_type', (select coalesce(jsonb_object_agg(type, n), '{}'::jsonb)
+                    from (select type, count(*) as n from t group by type) y)
+    );
+$$;
+
+create index if not exists tasks_due_idx on public.tasks (due) where not coalesce(completed, false);
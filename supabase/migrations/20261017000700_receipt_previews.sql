@@ -0,0 +1,9 @@
+-- Preview thumbnail of a normalized receipt image.
+--
+-- Set by the background receipt processor once the preview is stored, so
+-- a non-null value always names an object in the receipts bucket. Rows
+-- whose receipt was never normalized (PDFs, failed or pending images) keep
+-- it null.
+
+alter table public.budget_transactions
+    add column if not exists receipt_preview text;
@@ -0,0 +1,84 @@
+-- Commit-ordered sync cursors and change_log pruning.
+--
+-- change_log ids are handed out at insert time, but a row only becomes
+-- visible when its transaction commits, so ids can appear out of order and
+-- a cursor that has passed id N+1 would never see a late-committing N.
+-- Each change now records the id of the transaction that wrote it, and
+-- sync_changes() only returns changes from transactions below the current
+-- snapshot's xmin: every one of those has already committed or aborted,
+-- so nothing can appear behind a cursor later. Cursors are (txid, id).
+-- A long-running transaction holds the horizon back; sync then lags
+-- behind it, but loses nothing.
+
+alter table public.change_log
+    add column if not exists txid xid8 not null default pg_current_xact_id();
+
+create index if not exists change_log_txid_idx on public.change_log (txid, id);
+
+create table if not exists public.change_log_state (
+    key text primary key,
+    txid xid8 not null
+);
+
+-- One page of changes after (p_after_txid, p_after_id), in commit-safe
+-- order. With p_limit 0 it only reports the horizon, which is the cursor
+-- position a full snapshot taken afterwards is consistent with.
+create or replace function public.sync_changes(p_after_txid text, p_after_id bigint, p_limit integer)
+returns jsonb
+language sql
+stable
+as $$
+    with horizon as (
+        select pg_snapshot_xmin(pg_current_snapshot()) as xmin
+    ),
+    page as (
+        select c.id, c.table_name, c.row_id, c.op, c.txid
+        from public.change_log c, horizon h
+        where c.txid < h.xmin
+          and p_after_txid is not null
+          and (c.txid > p_after_txid::xid8 or (c.txid = p_after_txid::xid8 and c.id > p_after_id))
+        order by c.txid, c.id
+        limit p_limit
+    )
+    select jsonb_build_object(
+        'horizon', (select xmin::text from horizon),
+        'pruned_through', (select txid::text from public.change_log_state where key = 'pruned_through'),
+        'changes', coalesce(
+            (select jsonb_agg(jsonb_build_object(
+                'id', id, 'table_name', table_name, 'row_id', row_id, 'op', op, 'txid', txid::text
+            ) order by txid, id) from page),
+            '[]'::jsonb
+        )
+    );
+$$;
+
+-- Retention: delete changes older than p_keep and remember the newest
+-- transaction removed. Cursors at or below it get a full snapshot.
+-- Run it from a scheduler (flask prune-change-log, or pg_cron).
+create or replace function public.prune_change_log(p_keep interval default interval '30 days')
+returns bigint
+language plpgsql
+as $$
+declare
+    v_through xid8;
+    v_deleted bigint;
+begin
+    select txid into v_through
+    from public.change_log
+    where changed_at < now() - p_keep
+    order by txid desc
+    limit 1;
+
+    if v_through is null then
+        return 0;
+    end if;
+
+    insert into public.change_log_state as s (key, txid)
+    values ('pruned_through', v_through)
+    on conflict (key) do update set txid = greatest(s.txid, excluded.txid);
+
+    delete from public.change_log where txid <= v_through;
+    get diagnostics v_deleted = row_count;
+    return v_deleted;
+end;
+$$;
@@ -0,0 +1,51 @@
+"""
+Shared fixtures: the Flask app wired to the in-memory Supabase stand-in
+from benchmarks/fake_supabase.py.
+
+    pip install flask flask-cors pyjwt pillow pytest
+    python -m pytest tests
+"""
+
+import os
+import sys
+import tempfile
+
+ROOT = os.path.join(os.path.dirname(__file__), '..')
+sys.path[:0] = [ROOT, os.path.join(ROOT, 'benchmarks')]
+
+# Local stores (rate limits, cleanup queue, uploads) go to a scratch directory
+os.environ.setdefault('UPLOAD_FOLDER', tempfile.mkdtemp(prefix='likhayag-tests-'))
+
+import pytest  # noqa: E402
+
+import app as app_module  # noqa: E402
+from fake_supabase import FakeSupabase  # noqa: E402
+
+ADMIN_EMAIL = 'admin@admin.com'
+STUDENT_EMAIL = 'student1@gmail.com'
+
+
+@pytest.fixture
+def fake(monkeypatch):
+    """An empty stand-in installed as the app's Supabase client"""
+    client = FakeSupabase(latency=0)
+    monkeypatch.setattr(app_module, '_supabase_client', client)
+    with app_module._user_cache_lock:
+        app_module._user_cache.clear()
+    app_module.invalidate_task_stats()
+    return client
+
+
+@pytest.fixture
+def client(fake):
+    return app_module.app.test_client()
+
+
+@pytest.fixture
+def admin_headers():
+    return {'Authorization': f'Bearer {app_module.create_token(1, ADMIN_EMAIL, "admin")}'}
+
+
+@pytest.fixture
+def student_headers():
+    return {'Authorization': f'Bearer {app_module.create_token(2, STUDENT_EMAIL, "user")}'}
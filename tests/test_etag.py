@@ -0,0 +1,62 @@
+"""ETag / If-None-Match on the list endpoints, with and without compression"""
+
+import gzip
+import json
+
+import pytest
+
+
+@pytest.fixture
+def tasks(fake):
+    # Large enough to be compressed (COMPRESS_MIN_BYTES)
+    fake.seed('tasks', [{'title': f'Task {i}', 'notes': 'Answer the exercises', 'priority': 'medium',
+                         'completed': False, 'due': '2026-11-01'} for i in range(40)])
+
+
+def test_matching_etag_gets_304(client, student_headers, tasks):
+    first = client.get('/api/tasks', headers=student_headers)
+    assert first.status_code == 200
+    etag = first.headers['ETag']
+
+    second = client.get('/api/tasks', headers=dict(student_headers, **{'If-None-Match': etag}))
+    assert second.status_code == 304
+    assert second.headers['ETag'] == etag
+    assert second.get_data() == b''
+
+
+def test_gzip_etag_gets_304(client, student_headers, tasks):
+    headers = dict(student_headers, **{'Accept-Encoding': 'gzip'})
+    first = client.get('/api/tasks', headers=headers)
+    assert first.headers['Content-Encoding'] == 'gzip'
+    etag = first.headers['ETag']
+    assert etag.endswith('-gzip"')
+    assert len(json.loads(gzip.decompress(first.get_data()))) == 40
+
+    second = client.get('/api/tasks', headers=dict(headers, **{'If-None-Match': etag}))
+    assert second.status_code == 304
+    assert second.headers['ETag'] == etag
+    assert 'Content-Encoding' not in second.headers
+
+
+def test_etag_changes_after_write(client, student_headers, tasks):
+    etag = client.get('/api/tasks', headers=student_headers).headers['ETag']
+    client.post('/api/tasks', json={'title': 'New task'}, headers=student_headers)
+
+    response = client.get('/api/tasks', headers=dict(student_headers, **{'If-None-Match': etag}))
+    assert response.status_code == 200
+    assert response.headers['ETag'] != etag
+
+
+def test_etag_covers_query_string(client, student_headers, tasks):
+    etag = client.get('/api/tasks', headers=student_headers).headers['ETag']
+    response = client.get('/api/tasks', query_string={'sort': 'priority'},
+                          headers=dict(student_headers, **{'If-None-Match': etag}))
+    assert response.status_code == 200
+
+
+def test_etag_varies_by_user(client, admin_headers, student_headers, fake):
+    fake.seed('meetings', [{'title': 'Assembly', 'datetime': '2026-11-20T09:00', 'attendees': '[]'}])
+    etag = client.get('/api/meetings', headers=admin_headers).headers['ETag']
+    response = client.get('/api/meetings', headers=dict(student_headers, **{'If-None-Match': etag}))
+    assert response.status_code == 200
+    assert response.headers['ETag'] != etag
@@ -0,0 +1,79 @@
+"""GCRA rate limiting and its memory, SQLite and Redis backends"""
+
+import pytest
+
+import app as app_module
+from check_rate_limit_backends import LIMIT, WINDOW, concurrent, redis_backend, sequential
+
+INTERVAL = WINDOW / LIMIT
+
+
+def test_gcra_allows_a_burst_then_one_hit_per_interval():
+    tat, results = None, []
+    for _ in range(LIMIT + 1):
+        allowed, tat, retry_after = app_module.gcra(tat, 0.0, LIMIT, WINDOW)
+        results.append((allowed, retry_after))
+    assert results == [(True, 0.0)] * LIMIT + [(False, INTERVAL)]
+
+    assert app_module.gcra(tat, INTERVAL - 0.1, LIMIT, WINDOW)[0] is False
+    allowed, tat, _ = app_module.gcra(tat, INTERVAL, LIMIT, WINDOW)
+    assert allowed is True
+    assert app_module.gcra(tat, INTERVAL, LIMIT, WINDOW)[0] is False
+
+
+def test_gcra_state_lapses_after_the_window():
+    tat = None
+    for _ in range(LIMIT):
+        _, tat, _ = app_module.gcra(tat, 0.0, LIMIT, WINDOW)
+    for _ in range(LIMIT):
+        allowed, tat, _ = app_module.gcra(tat, WINDOW, LIMIT, WINDOW)
+        assert allowed is True
+
+
+@pytest.fixture(params=['memory', 'sqlite', 'redis'])
+def backend(request, tmp_path):
+    if request.param == 'memory':
+        return app_module.MemoryRateLimitBackend()
+    if request.param == 'sqlite':
+        return app_module.SQLiteRateLimitBackend(path=str(tmp_path / 'rate_limits.db'))
+    pytest.importorskip('fakeredis')
+    pytest.importorskip('lupa')
+    return redis_backend(None)
+
+
+def test_backend_matches_reference(backend):
+    reference = sequential(app_module.MemoryRateLimitBackend(), LIMIT + 3)
+    results = sequential(backend, LIMIT + 3)
+    assert [allowed for allowed, _ in results] == [allowed for allowed, _ in reference]
+    for (_, retry), (_, want) in zip(results, reference):
+        assert retry == pytest.approx(want, abs=0.5)
+
+
+def test_backend_is_atomic_under_concurrency(backend):
+    assert concurrent(backend, 32) == LIMIT
+
+
+def test_sqlite_backend_is_shared_between_instances(tmp_path):
+    path = str(tmp_path / 'rate_limits.db')
+    first = app_module.SQLiteRateLimitBackend(path=path)
+    second = app_module.SQLiteRateLimitBackend(path=path)
+    for _ in range(LIMIT):
+        assert first.hit('shared', LIMIT, WINDOW)[0] is True
+    assert second.hit('shared', LIMIT, WINDOW)[0] is False
+
+
+def test_limiter_namespaces_keys():
+    backend = app_module.MemoryRateLimitBackend()
+    send = app_module.RateLimiter('send', 1, WINDOW, backend=backend)
+    verify = app_module.RateLimiter('verify', 1, WINDOW, backend=backend)
+    assert send.hit('a@gmail.com')[0] is True
+    assert verify.hit('a@gmail.com')[0] is True
+    assert send.hit('a@gmail.com')[0] is False
+
+
+def test_limiter_fails_open():
+    class Broken:
+        def hit(self, key, limit, window):
+            raise OSError('store unavailable')
+
+    assert app_module.RateLimiter('broken', 1, WINDOW, backend=Broken()).hit('a') == (True, 0.0)
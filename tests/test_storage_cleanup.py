@@ -0,0 +1,98 @@
+"""StorageCleanupQueue: batched removal, leases, retries and cancellation"""
+
+import pytest
+
+import app as app_module
+import fake_supabase
+
+BUCKET = app_module.SUPABASE_PROFILE_BUCKET
+
+
+def make_queue(path, batch_size=10):
+    queue = app_module.StorageCleanupQueue(path=str(path), batch_size=batch_size, reconcile_interval=0)
+    queue.start = lambda: None  # drained by the test, not the background thread
+    return queue
+
+
+@pytest.fixture
+def queue(tmp_path, fake):
+    return make_queue(tmp_path / 'cleanup.db')
+
+
+def fill(fake, bucket_name, names):
+    fake.buckets.setdefault(bucket_name, {}).update((name, b'x') for name in names)
+
+
+def test_drain_removes_in_batches(queue, fake):
+    names = [f'profile_{i}.jpg' for i in range(25)]
+    fill(fake, BUCKET, names)
+    queue.enqueue(BUCKET, names)
+
+    fake.round_trips = 0
+    assert queue.drain() == 25
+    assert fake.buckets[BUCKET] == {}
+    # One remove() call per batch of 10
+    assert fake.round_trips == 3
+    assert queue.stats()['pending'] == 0
+
+
+def test_claimed_rows_are_leased(tmp_path, fake):
+    fill(fake, BUCKET, ['a.jpg', 'b.jpg'])
+    first = make_queue(tmp_path / 'cleanup.db')
+    second = make_queue(tmp_path / 'cleanup.db')
+    first.enqueue(BUCKET, ['a.jpg', 'b.jpg'])
+
+    assert len(first._claim()) == 2
+    # Another worker on the same host sees nothing due while the lease holds
+    assert second.drain_once() == (0, 0)
+    assert set(fake.buckets[BUCKET]) == {'a.jpg', 'b.jpg'}
+
+
+def test_lapsed_lease_is_taken_over(tmp_path, fake, monkeypatch):
+    monkeypatch.setattr(app_module, 'STORAGE_CLEANUP_LEASE', 0)
+    fill(fake, BUCKET, ['a.jpg'])
+    crashed = make_queue(tmp_path / 'cleanup.db')
+    survivor = make_queue(tmp_path / 'cleanup.db')
+    crashed.enqueue(BUCKET, ['a.jpg'])
+
+    assert len(crashed._claim()) == 1
+    assert survivor.drain() == 1
+    assert fake.buckets[BUCKET] == {}
+
+
+def test_failed_removal_backs_off(queue, fake, monkeypatch):
+    def remove(self, paths):
+        raise OSError('storage unavailable')
+
+    fill(fake, BUCKET, ['a.jpg'])
+    queue.enqueue(BUCKET, ['a.jpg'])
+    with monkeypatch.context() as patch:
+        patch.setattr(fake_supabase.FakeBucket, 'remove', remove)
+        assert queue.drain() == 0
+
+    stats = queue.stats()
+    assert stats['pending'] == 1
+    assert stats['retrying'] == 1
+    # Not due again until the backoff has passed
+    assert queue.drain_once() == (0, 0)
+    assert 'a.jpg' in fake.buckets[BUCKET]
+
+
+def test_cancelled_rows_are_kept(queue, fake):
+    fill(fake, BUCKET, ['a.jpg', 'b.jpg'])
+    queue.enqueue(BUCKET, ['a.jpg', 'b.jpg'])
+    queue.cancel(BUCKET, ['a.jpg'])
+
+    assert queue.drain() == 1
+    assert set(fake.buckets[BUCKET]) == {'a.jpg'}
+
+
+def test_referenced_receipts_are_kept(queue, fake):
+    bucket_name = app_module.SUPABASE_RECEIPT_BUCKET
+    fill(fake, bucket_name, ['used.webp', 'unused.webp'])
+    fake.seed('budget_transactions', [{'amount': 10.0, 'receipt': 'used.webp'}])
+    queue.enqueue(bucket_name, ['used.webp', 'unused.webp'])
+
+    assert queue.drain() == 1
+    assert set(fake.buckets[bucket_name]) == {'used.webp'}
+    assert queue.stats()['pending'] == 0
@@ -0,0 +1,87 @@
+"""GET /api/sync: snapshots, deltas with tombstones, and cursor paging"""
+
+import pytest
+
+import app as app_module
+
+
+@pytest.fixture
+def data(fake):
+    fake.seed('tasks', [{'title': f'Task {i}', 'priority': 'medium', 'completed': False} for i in range(1, 6)])
+    fake.seed('budget_categories', [{'name': 'Supplies', 'budget': 5000.0}])
+    fake.seed('budget_transactions', [{'type': 'expense', 'category': 'Supplies', 'amount': 120.0,
+                                       'date': '2026-10-01', 'receipt': 'a.jpg', 'added_by': 1}])
+
+
+def sync(client, headers, **params):
+    response = client.get('/api/sync', query_string=params, headers=headers)
+    assert response.status_code == 200
+    return response.get_json()
+
+
+def test_snapshot_without_cursor(client, student_headers, data):
+    body = sync(client, student_headers)
+    assert body['reset'] is True
+    assert body['has_more'] is False
+    assert len(body['tasks']['upserted']) == 5
+    assert len(body['categories']['upserted']) == 1
+    assert body['cursor']
+
+
+def test_delta_has_one_upsert_and_one_tombstone(client, student_headers, data):
+    cursor = sync(client, student_headers)['cursor']
+    created = client.post('/api/tasks', json={'title': 'New task'}, headers=student_headers).get_json()['task']
+    client.delete('/api/tasks/2', headers=student_headers)
+
+    body = sync(client, student_headers, since=cursor)
+    assert body['reset'] is False
+    assert [t['id'] for t in body['tasks']['upserted']] == [created['id']]
+    assert body['tasks']['deleted'] == ['2']
+    assert body['transactions'] == {'upserted': [], 'deleted': []}
+
+    again = sync(client, student_headers, since=body['cursor'])
+    assert again['tasks'] == {'upserted': [], 'deleted': []}
+    assert again['cursor'] == body['cursor']
+
+
+def test_row_changed_then_deleted_is_only_a_tombstone(client, student_headers, data):
+    cursor = sync(client, student_headers)['cursor']
+    client.patch('/api/tasks/3', json={'progress': 50}, headers=student_headers)
+    client.delete('/api/tasks/3', headers=student_headers)
+
+    body = sync(client, student_headers, since=cursor)
+    assert body['tasks'] == {'upserted': [], 'deleted': ['3']}
+
+
+def test_delta_pages_with_has_more(client, student_headers, data):
+    cursor = sync(client, student_headers)['cursor']
+    for task_id in range(1, 6):
+        client.patch(f'/api/tasks/{task_id}', json={'progress': 10}, headers=student_headers)
+
+    seen, pages = [], 0
+    while True:
+        body = sync(client, student_headers, since=cursor, limit=2)
+        seen.extend(t['id'] for t in body['tasks']['upserted'])
+        cursor, pages = body['cursor'], pages + 1
+        if not body['has_more']:
+            break
+    assert sorted(seen) == ['1', '2', '3', '4', '5']
+    assert pages == 3
+
+
+def test_receipt_urls_only_when_asked(client, admin_headers, data):
+    plain = sync(client, admin_headers)
+    assert plain['transactions']['upserted'][0]['receipt_url'] is None
+
+    signed = sync(client, admin_headers, sign_receipts=1)
+    assert signed['transactions']['upserted'][0]['receipt_url'].startswith('https://')
+
+
+def test_cursor_without_txid_falls_back_to_snapshot(client, student_headers, data):
+    body = sync(client, student_headers, since=app_module.encode_cursor({'change': 3}))
+    assert body['reset'] is True
+
+
+def test_malformed_cursor_is_rejected(client, student_headers, data):
+    response = client.get('/api/sync', query_string={'since': 'not-a-cursor'}, headers=student_headers)
+    assert response.status_code == 400
@@ -0,0 +1,90 @@
+"""POST /api/tasks/batch: request order, statement grouping and validation"""
+
+import pytest
+
+import app as app_module
+
+
+@pytest.fixture
+def tasks(fake):
+    fake.seed('tasks', [{'title': f'Task {i}', 'priority': 'medium', 'progress': 0, 'completed': False}
+                        for i in range(1, 6)])
+    return fake.tables['tasks']
+
+
+def batch(client, headers, operations):
+    response = client.post('/api/tasks/batch', json={'operations': operations}, headers=headers)
+    assert response.status_code == 200
+    return response.get_json()
+
+
+def by_id(rows):
+    return {str(r['id']): r for r in rows}
+
+
+def test_results_follow_request_order(client, student_headers, tasks):
+    body = batch(client, student_headers, [
+        {'op': 'delete', 'id': '1'},
+        {'op': 'create', 'data': {'title': 'A'}},
+        {'op': 'update', 'id': '2', 'data': {'progress': 40}},
+        {'op': 'create', 'data': {'title': 'B'}},
+        {'op': 'delete', 'id': '999'},
+    ])
+    assert [(r['index'], r['op'], r['success']) for r in body['results']] == [
+        (0, 'delete', True), (1, 'create', True), (2, 'update', True), (3, 'create', True), (4, 'delete', False),
+    ]
+    assert body['succeeded'] == 4
+    assert body['failed'] == 1
+    assert body['results'][4]['error'] == 'Not found'
+
+
+def test_operations_apply_in_order(client, student_headers, tasks):
+    batch(client, student_headers, [
+        {'op': 'update', 'id': '3', 'data': {'progress': 10}},
+        {'op': 'update', 'id': '3', 'data': {'progress': 20}},
+        {'op': 'delete', 'id': '4'},
+        {'op': 'update', 'id': '4', 'data': {'progress': 30}},
+    ])
+    rows = by_id(tasks)
+    assert rows['3']['progress'] == 20
+    assert '4' not in rows
+
+
+def test_runs_share_statements(client, fake, student_headers, tasks):
+    operations = ([{'op': 'create', 'data': {'title': f'New {i}'}} for i in range(10)]
+                  + [{'op': 'update', 'id': str(i), 'data': {'completed': True}} for i in range(1, 6)]
+                  + [{'op': 'delete', 'id': str(i)} for i in range(1, 4)])
+    fake.round_trips = 0
+    body = batch(client, student_headers, operations)
+    assert body['failed'] == 0
+    # Auth and stats invalidation add no queries: one insert, one update, one delete
+    assert fake.round_trips == 3
+
+
+@pytest.mark.parametrize('operation, error', [
+    ({'op': 'create', 'data': {'title': 'A', 'progress': 'x'}}, 'Invalid progress'),
+    ({'op': 'create', 'data': {'title': ''}}, 'Title required'),
+    ({'op': 'create', 'data': {'title': ['A']}}, 'Title required'),
+    ({'op': 'create', 'data': {'title': 'A', 'priority': 1}}, 'Invalid priority'),
+    ({'op': 'create', 'data': 'A'}, 'Data must be an object'),
+    ({'op': 'update', 'id': '1', 'data': {'progress': None}}, 'Invalid progress'),
+    ({'op': 'update', 'id': '1', 'data': {'unknown': 1}}, 'Id and fields to update required'),
+    ({'op': 'delete'}, 'Id required'),
+    ({'op': 'rename', 'id': '1'}, 'Unknown op'),
+])
+def test_invalid_operations_get_fixed_messages(client, student_headers, tasks, operation, error):
+    body = batch(client, student_headers, [operation, {'op': 'create', 'data': {'title': 'Valid'}}])
+    assert body['results'][0] == {'index': 0, 'op': operation.get('op'), 'success': False, 'error': error}
+    assert body['results'][1]['success'] is True
+
+
+def test_single_task_post_rejects_invalid_progress(client, student_headers, tasks):
+    response = client.post('/api/tasks', json={'title': 'A', 'progress': 'x'}, headers=student_headers)
+    assert response.status_code == 400
+    assert response.get_json()['message'] == 'Invalid progress'
+
+
+def test_batch_size_is_capped(client, student_headers, tasks):
+    operations = [{'op': 'delete', 'id': '1'}] * (app_module.TASK_BATCH_MAX + 1)
+    response = client.post('/api/tasks/batch', json={'operations': operations}, headers=student_headers)
+    assert response.status_code == 400
@@ -0,0 +1,97 @@
+"""GET /api/tasks: filters, sort orders and keyset pagination"""
+
+import random
+
+import pytest
+
+SORTS = ['due', 'priority', 'created_at']
+FILTERS = ['all', 'pending', 'completed', 'high']
+PRIORITY_RANK = {'high': 0, 'medium': 1, 'low': 2}
+
+
+@pytest.fixture
+def tasks(fake):
+    """Tasks with repeated sort values and null due dates, so ties and nulls cross page edges"""
+    rnd = random.Random(3)
+    rows = [{
+        'id': i,
+        'title': f'{rnd.choice(["Read", "Review", "Submit"])} task {i}',
+        'notes': rnd.choice(['', 'review the notes', '100% done_ish']),
+        'priority': rnd.choice(['high', 'medium', 'low']),
+        'completed': rnd.random() < 0.4,
+        'due': None if rnd.random() < 0.2 else f'2026-11-{rnd.randint(1, 4):02d}',
+        'created_at': f'2026-10-{rnd.randint(1, 3):02d}T08:00:00+00:00',
+    } for i in range(1, 61)]
+    fake.seed('tasks', rows)
+    return fake.tables['tasks']
+
+
+def expected_ids(rows, sort_by, filter_by, search=''):
+    """Reference result computed directly from the rows"""
+    if filter_by == 'pending':
+        rows = [r for r in rows if not r['completed']]
+    elif filter_by == 'completed':
+        rows = [r for r in rows if r['completed']]
+    elif filter_by == 'high':
+        rows = [r for r in rows if r['priority'] == 'high']
+    if search:
+        rows = [r for r in rows if search.lower() in (r['title'] + '\n' + r['notes']).lower()]
+
+    if sort_by == 'due':
+        # Postgres ascending order puts nulls last
+        rows = sorted(rows, key=lambda r: (r['due'] is None, r['due'] or '', r['id']))
+    elif sort_by == 'priority':
+        rows = sorted(rows, key=lambda r: (PRIORITY_RANK[r['priority']], r['id']))
+    else:
+        rows = sorted(rows, key=lambda r: (r['created_at'], r['id']), reverse=True)
+    return [str(r['id']) for r in rows]
+
+
+def walk_pages(client, headers, limit, **params):
+    ids, cursor, pages = [], None, 0
+    while True:
+        query = dict(params, limit=limit)
+        if cursor:
+            query['cursor'] = cursor
+        response = client.get('/api/tasks', query_string=query, headers=headers)
+        assert response.status_code == 200
+        body = response.get_json()
+        assert len(body['tasks']) <= limit
+        ids.extend(t['id'] for t in body['tasks'])
+        pages += 1
+        cursor = body['next_cursor']
+        if not cursor:
+            return ids, pages
+
+
+@pytest.mark.parametrize('filter_by', FILTERS)
+@pytest.mark.parametrize('sort_by', SORTS)
+def test_unpaginated_list_is_filtered_and_sorted(client, student_headers, tasks, sort_by, filter_by):
+    response = client.get('/api/tasks', query_string={'sort': sort_by, 'filter': filter_by},
+                          headers=student_headers)
+    assert response.status_code == 200
+    assert [t['id'] for t in response.get_json()] == expected_ids(tasks, sort_by, filter_by)
+
+
+@pytest.mark.parametrize('search', ['', 'review', '100%', 'done_'])
+@pytest.mark.parametrize('filter_by', FILTERS)
+@pytest.mark.parametrize('sort_by', SORTS)
+def test_keyset_pages_cover_every_row_once(client, student_headers, tasks, sort_by, filter_by, search):
+    want = expected_ids(tasks, sort_by, filter_by, search)
+    ids, pages = walk_pages(client, student_headers, 7, sort=sort_by, filter=filter_by, search=search)
+    assert ids == want
+    assert pages == max(1, -(-len(want) // 7))
+
+
+def test_cursor_for_another_sort_is_rejected(client, student_headers, tasks):
+    first = client.get('/api/tasks', query_string={'sort': 'due', 'limit': 5}, headers=student_headers)
+    cursor = first.get_json()['next_cursor']
+    response = client.get('/api/tasks', query_string={'sort': 'priority', 'limit': 5, 'cursor': cursor},
+                          headers=student_headers)
+    assert response.status_code == 400
+    assert response.get_json()['message'] == 'Invalid cursor'
+
+
+def test_invalid_limit_is_rejected(client, student_headers, tasks):
+    response = client.get('/api/tasks', query_string={'limit': 'x'}, headers=student_headers)
+    assert response.status_code == 400